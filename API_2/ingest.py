@@ -0,0 +1,348 @@
+"""ISBN listelerini veya CSV dosyalarını toplu olarak kütüphaneye ekleyen asenkron boru hattı.
+
+- Girdi dosyası akış halinde okunur; sınırlı bir kuyruk sayesinde okuyucu,
+  istekler yetişemediğinde bekler (geri basınç).
+- ISBN'ler çok-bibkey'li parçalar halinde, en fazla `concurrency` eşzamanlı
+  istekle ve bir jeton kovası hız sınırı altında Open Library'den çekilir.
+- Geçici hatalar (bağlantı hataları, 429 ve 5xx yanıtları) üstel geri
+  çekilmeyle yeniden denenir.
+- Kitaplar kütüphaneye partiler halinde yazılır; her partiden sonra günlük
+  diske yazılır ve kontrol noktası dosyası güncellenir. Yarıda kalan bir
+  aktarım aynı komutla kaldığı yerden devam eder.
+- İlerleme, saniyedeki kitap sayısı ve istek gecikmesinin p50/p95/p99
+  değerleri düzenli aralıklarla yazdırılır.
+
+Kullanım:
+    python ingest.py isbns.txt [--library library.json] [--rate 5] [--concurrency 8]
+    python ingest.py books.csv --column isbn
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import time
+from typing import Iterator
+
+import httpx
+
+import sharedpath  # noqa: F401  (shared paketi için)
+from main import Library
+from shared.normalize import canonical_isbn
+
+API_URL = "https://openlibrary.org/api/books"
+# Kontrol noktasına "tamamlandı" olarak yazılan durumlar; "error" sonraki çalıştırmada tekrar denenir
+DONE_STATUSES = ("added", "exists", "not_found", "invalid")
+
+
+def iter_isbns(path: str, column: str = "isbn") -> Iterator[str]:
+    """Dosyadaki ISBN'leri bellek kullanımı sabit kalacak şekilde sırayla üretir.
+
+    `.csv` uzantılı dosyalarda `column` sütunu okunur; başlık satırında bu
+    sütun yoksa ilk sütun kullanılır ve ilk satır da veri sayılır. Diğer
+    dosyalarda her satır bir ISBN'dir; boş satırlar ve `#` ile başlayan
+    satırlar atlanır.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if not path.lower().endswith(".csv"):
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+            return
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        if column in header:
+            index = header.index(column)
+        else:
+            index = 0
+            reader = itertools.chain([header], reader)
+        for row in reader:
+            if len(row) > index and row[index].strip():
+                yield row[index].strip()
+
+
+class TokenBucket:
+    """Saniyede `rate` jeton üreten, en fazla `burst` jeton biriktiren hız sınırlayıcı."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Bir jeton alınana kadar bekler."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Checkpoint:
+    """İşlenen ISBN'leri ve sonuçlarını JSON satırları olarak tutan kontrol noktası dosyası."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Yarım kalmış son satır
+                    if record.get("status") in DONE_STATUSES:
+                        self.done.add(record["isbn"])
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __contains__(self, isbn: str) -> bool:
+        return isbn in self.done
+
+    def record(self, results: dict[str, str]):
+        """Bir partinin sonuçlarını dosyaya ekler ve diske yazar."""
+        for isbn, status in results.items():
+            self._file.write(json.dumps({"isbn": isbn, "status": status}) + "\n")
+            if status in DONE_STATUSES:
+                self.done.add(isbn)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Sıralı listede `q` (0-100) yüzdelik değerini döndürür (en yakın sıra yöntemi)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class IngestStats:
+    """Aktarım sayaçları, istek gecikmeleri ve verim hesabı."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.statuses: dict[str, int] = {}
+        self.skipped = 0
+        self.requests = 0
+        self.retries = 0
+        self.latencies: list[float] = []
+
+    @property
+    def processed(self) -> int:
+        return sum(self.statuses.values())
+
+    def count(self, results: dict[str, str]):
+        for status in results.values():
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def summary(self) -> dict:
+        """Anlık durum: işlenen kitap sayısı, kitap/sn ve gecikme yüzdelikleri (ms)."""
+        elapsed = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "statuses": dict(self.statuses),
+            "requests": self.requests,
+            "retries": self.retries,
+            "elapsed_seconds": elapsed,
+            "books_per_second": self.processed / elapsed if elapsed else 0.0,
+            "latency_ms": {f"p{q}": percentile(latencies, q) * 1000 for q in (50, 95, 99)},
+        }
+
+    def report(self) -> str:
+        s = self.summary()
+        latency = s["latency_ms"]
+        return (f"İşlenen: {s['processed']} (eklenen {s['statuses'].get('added', 0)}, "
+                f"atlanan {s['skipped']}), {s['books_per_second']:.1f} kitap/sn, "
+                f"istek gecikmesi p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, "
+                f"p99 {latency['p99']:.0f} ms, yeniden deneme {s['retries']}")
+
+
+class IngestPipeline:
+    """Bir ISBN akışını hız sınırlı, yeniden denemeli ve partili olarak kütüphaneye aktarır."""
+
+    def __init__(self, library: Library, rate: float = 5.0, burst: int = 5, concurrency: int = 8,
+                 chunk_size: int = 50, batch_size: int = 500, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0, report_every: float = 5.0,
+                 checkpoint: Checkpoint | None = None):
+        self.library = library
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.report_every = report_every
+        self.checkpoint = checkpoint
+        self.stats = IngestStats()
+
+    def _backoff(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Yeniden denemeden önce beklenecek süre: Retry-After veya jitter'lı üstel artış."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.max_delay, float(retry_after))
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _fetch(self, client: httpx.AsyncClient, bucket: TokenBucket, chunk: list[str]) -> dict:
+        """Bir ISBN parçasını getirir; geçici hatalarda yeniden dener.
+
+        Her ISBN için kitap verisi, bulunamadıysa None, kalıcı hatada ise
+        istisna döner.
+        """
+        bibkeys = ",".join(f"ISBN:{isbn}" for isbn in chunk)
+        api_url = f"{API_URL}?bibkeys={bibkeys}&format=json&jscmd=data"
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            start = time.monotonic()
+            response = None
+            try:
+                response = await client.get(api_url)
+                response.raise_for_status()
+                data = response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+                self.stats.latencies.append(time.monotonic() - start)
+                self.stats.requests += 1
+                status_code = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else None
+                retryable = status_code is None or status_code == 429 or status_code >= 500
+                if not retryable or attempt == self.max_retries:
+                    return {isbn: exc for isbn in chunk}
+                self.stats.retries += 1
+                await asyncio.sleep(self._backoff(attempt, response))
+                attempt += 1
+                continue
+            except json.JSONDecodeError as exc:
+                return {isbn: exc for isbn in chunk}
+            self.stats.latencies.append(time.monotonic() - start)
+            self.stats.requests += 1
+            return {isbn: data.get(f"ISBN:{isbn}") for isbn in chunk}
+
+    def _write_batch(self, fetched: dict) -> dict[str, str]:
+        """Getirilen kitapları kütüphaneye ekler ve kontrol noktasını günceller."""
+        return self._record(self.library.add_fetched_books(fetched))
+
+    def _record(self, results: dict[str, str]) -> dict[str, str]:
+        """Sonuçları kontrol noktasına ve istatistiklere işler."""
+        if self.checkpoint is not None:
+            self.checkpoint.record(results)
+        self.stats.count(results)
+        return results
+
+    async def run(self, isbns: Iterator[str]) -> dict:
+        """ISBN akışını sonuna kadar işler ve özet istatistikleri döndürür."""
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        bucket = TokenBucket(self.rate, self.burst)
+
+        async def read():
+            chunk: list[str] = []
+            for isbn in isbns:
+                # Kitaplar ve kontrol noktası kanonik ISBN-13 ile tutulur; geçersizler olduğu gibi
+                canonical = canonical_isbn(isbn)
+                isbn = canonical or isbn
+                if self.library.find_book(isbn) is not None or (self.checkpoint is not None and isbn in self.checkpoint):
+                    self.stats.skipped += 1
+                    continue
+                if canonical is None:
+                    self._record({isbn: "invalid"})  # Open Library'ye sorulmaz
+                    continue
+                chunk.append(isbn)
+                if len(chunk) == self.chunk_size:
+                    await chunks.put(chunk)  # Kuyruk doluysa bekler (geri basınç)
+                    chunk = []
+            if chunk:
+                await chunks.put(chunk)
+            for _ in range(self.concurrency):
+                await chunks.put(None)
+
+        async def fetch(client: httpx.AsyncClient):
+            while (chunk := await chunks.get()) is not None:
+                await fetched.put(await self._fetch(client, bucket, chunk))
+            await fetched.put(None)
+
+        async def write():
+            batch: dict = {}
+            finished = 0
+            last_report = time.monotonic()
+            while finished < self.concurrency:
+                result = await fetched.get()
+                if result is None:
+                    finished += 1
+                    continue
+                batch.update(result)
+                if len(batch) >= self.batch_size:
+                    self._write_batch(batch)
+                    batch = {}
+                if self.report_every and time.monotonic() - last_report >= self.report_every:
+                    print(self.stats.report())
+                    last_report = time.monotonic()
+            if batch:
+                self._write_batch(batch)
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+            await asyncio.gather(read(), write(), *(fetch(client) for _ in range(self.concurrency)))
+        print(self.stats.report())
+        return self.stats.summary()
+
+
+def ingest(library: Library, path: str, column: str = "isbn", checkpoint_path: str | None = None,
+           **options) -> dict:
+    """`path` dosyasındaki ISBN'leri kütüphaneye aktarır ve özet istatistikleri döndürür.
+
+    Kontrol noktası varsayılan olarak `<path>.checkpoint` dosyasıdır.
+    Diğer seçenekler `IngestPipeline`'a aktarılır.
+    """
+    checkpoint = Checkpoint(checkpoint_path or path + ".checkpoint")
+    try:
+        pipeline = IngestPipeline(library, checkpoint=checkpoint, **options)
+        return asyncio.run(pipeline.run(iter_isbns(path, column)))
+    finally:
+        checkpoint.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="ISBN listesi (satır başına bir ISBN) veya CSV dosyası")
+    parser.add_argument("--library", default="library.json")
+    parser.add_argument("--column", default="isbn", help="CSV dosyasındaki ISBN sütunu")
+    parser.add_argument("--checkpoint", help="Kontrol noktası dosyası (varsayılan: <source>.checkpoint)")
+    parser.add_argument("--rate", type=float, default=5.0, help="Saniyedeki en fazla istek")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=50, help="İstek başına ISBN sayısı")
+    parser.add_argument("--batch-size", type=int, default=500, help="Tek seferde kütüphaneye yazılan kitap")
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--report-every", type=float, default=5.0, help="İlerleme raporu aralığı (sn)")
+    args = parser.parse_args()
+
+    library = Library(filename=args.library)
+    try:
+        ingest(library, args.source, column=args.column, checkpoint_path=args.checkpoint,
+               rate=args.rate, burst=args.burst, concurrency=args.concurrency,
+               chunk_size=args.chunk_size, batch_size=args.batch_size, max_retries=args.retries,
+               report_every=args.report_every)
+    finally:
+        library.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,69 @@
+import importlib.util
 import json
 import os
-import httpx
+import sys
+import threading
+import time
+
+import sharedpath  # noqa: F401  (shared paketi için)
+from shared.binsnap import BinarySnapshot, write_binary
+from shared.changefeed import in_reset_page, make_batch, reset_page, squash
+from shared.columnar import ColumnarTable
+from shared.concurrency import KeyedLock, VersionLock
+from shared.journal import LibraryJournal, apply_record, write_snapshot
+from shared.jsonstream import LazyTable
+from shared.metrics import REGISTRY, write_textfile
+from shared.normalize import canonical_isbn, canonical_key, normalize_record, normalize_records
+from shared.storage import BookStore
+
+
+def _lazy_import(name: str):
+    """Modülü hemen döndürür ama ilk öznitelik erişimine kadar yüklemez (`importlib.util.LazyLoader`).
+
+    Menü açılırken ağ ve asenkron kütüphanelerinin yüklenmesi beklenmez;
+    yalnızca ISBN ile ekleme gibi onları kullanan komutlar bedelini öder.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+asyncio = _lazy_import("asyncio")
+httpx = _lazy_import("httpx")
+
+OPENLIBRARY_LATENCY = REGISTRY.histogram(
+    "openlibrary_request_duration_seconds", "Open Library /api/books isteklerinin süresi (sn)", ("outcome",))
+OPENLIBRARY_ERRORS = REGISTRY.counter(
+    "openlibrary_errors_total", "Başarısız Open Library istekleri", ("kind",))
+PERSISTENCE_LATENCY = REGISTRY.histogram(
+    "library_persistence_duration_seconds", "Kütüphanenin diske yazılma/diskten okunma süresi (sn)", ("operation",))
+LIBRARY_BOOKS = REGISTRY.gauge("library_books", "Kütüphanedeki kitap sayısı")
+
+
+def _observe_upstream(start: float, error: Exception | None = None):
+    """Open Library isteğinin süresini ve varsa hata türünü metriklere işler."""
+    if error is None:
+        outcome = "ok"
+    elif isinstance(error, httpx.HTTPStatusError):
+        outcome = "server_error" if error.response.status_code >= 500 else "client_error"
+    elif isinstance(error, httpx.RequestError):
+        outcome = "network_error"
+    else:
+        outcome = "invalid_response"
+    OPENLIBRARY_LATENCY.observe(time.perf_counter() - start, outcome=outcome)
+    if error is not None:
+        OPENLIBRARY_ERRORS.inc(kind=outcome)
 
 class Book:
     """Her bir kitabı temsil eden sınıf."""
+    # __dict__ yerine sabit alanlar: kitap başına daha az bellek
+    __slots__ = ("title", "author", "isbn", "publication_year")
+
     def __init__(self, title: str, author: str, isbn: str, publication_year: int | None = None):
         self.title = title
         self.author = author
@@ -24,33 +84,185 @@ class Book:
         }
 
 class Library:
-    """Kütüphane operasyonlarını yöneten sınıf."""
-    def __init__(self, filename: str = "library.json"):
+    """Kütüphane operasyonlarını yöneten sınıf.
+
+    Birden çok iş parçacığından kullanılabilir: ekleme ve silmeler tek bir
+    yazar kilidiyle sıraya girer, okumalar kilit almaz (`VersionLock`).
+    Aynı ISBN için eşzamanlı eklemeler ISBN kilidiyle sıraya girer, yani
+    Open Library'ye bir kez gidilir; farklı ISBN'ler birbirini beklemez.
+    Listeleme ve kaydetme, değişiklik olana kadar paylaşılan değişmez bir
+    kopya üzerinden yapılır; kaydetme sırasında yazarlar beklemez.
+    """
+    def __init__(self, filename: str = "library.json", compact: bool = False, lazy: bool = False,
+                 binary: bool = False, metrics_file: str | None = None, background: bool = False):
         self.filename = filename
-        self.books = []
-        self.load_books()
+        # Kapanışta metriklerin Prometheus metin biçiminde yazılacağı dosya (isteğe bağlı)
+        self.metrics_file = metrics_file
+        # compact=True: kitaplar nesne yerine sütunlu tabloda tutulur (büyük kataloglar için)
+        self.compact = compact
+        # lazy=True: yalnızca ISBN -> dosya konumu indeksi tutulur, kitaplar erişildikçe okunur
+        self.lazy = lazy
+        # binary=True: anlık görüntü JSON yerine belleğe eşlenen ikili biçimde (shared/binsnap.py) tutulur
+        self.binary = binary
+        self._lock = VersionLock()
+        self._isbn_locks = KeyedLock()
+        self.store = self._new_store()
+        self.journal = LibraryJournal(filename, writer=write_binary if binary else write_snapshot)
+        # background=True: katalog ayrı bir iş parçacığında okunur, açılış beklemez;
+        # kataloğa erişmeden önce `wait_ready()` çağrılmalıdır
+        self.ready = threading.Event()
+        self._load_error: BaseException | None = None
+        if background:
+            threading.Thread(target=self._load_in_background, name="library-load", daemon=True).start()
+        else:
+            self.load_books()
+            self.ready.set()
+
+    @property
+    def books(self) -> list[Book]:
+        """Kütüphanedeki kitapların eklenme sırasına göre listesi."""
+        return list(self._snapshot())
+
+    def _snapshot(self) -> tuple[Book, ...]:
+        """Kitapların değişmez kopyası; bir sonraki değişikliğe kadar okuyucular arasında paylaşılır."""
+        return self._lock.snapshot(lambda: tuple(self.store))
+
+    def _indexed_read(self, query):
+        """Yazar/yıl/metin sorgusunu kilitsiz yapar; tembel indeksler gerekirse önce kilit altında kurulur."""
+        if not self.store.indexed:
+            with self._lock.write():
+                self.store.ensure_indexes()
+        return self._lock.read(query)
+
+    def _new_store(self, books=()) -> BookStore:
+        """Kütüphanenin kipine göre (nesne veya sütunlu) boş/dolu bir depo oluşturur."""
+        table = ColumnarTable(Book, fields=("title", "author", "isbn", "publication_year")) if self.compact else None
+        return BookStore(books, table=table)
 
     def load_books(self):
-        """JSON dosyasından kitapları yükler."""
-        if os.path.exists(self.filename):
+        """JSON dosyasından kitapları yükler ve değişiklik günlüğünü üzerine uygular.
+
+        Dosya akış halinde, parça parça çözülür; bellek kullanımı dosya
+        boyutuyla değil kitap sayısıyla büyür. Tembel kipte kitaplar hiç
+        oluşturulmaz, yalnızca dosyadaki konumları indekslenir. İkili kipte
+        dosya yalnızca belleğe eşlenir; açılış süresi kitap sayısından
+        bağımsızdır.
+        """
+        if not self.journal.exists():
+            print(f"Bilgi: {self.filename} bulunamadı. Yeni bir kütüphane oluşturuluyor.")
+            return
+        with self._lock.write():
             try:
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    books_data = json.load(f)
-                    self.books = [Book(**data) for data in books_data]
-                    print(f"{len(self.books)} kitap {self.filename} dosyasından yüklendi.")
-            except (json.JSONDecodeError, TypeError):
+                with PERSISTENCE_LATENCY.time(operation="load"):
+                    self.store = self._load_store()
+            except (ValueError, TypeError, KeyError):  # JSONDecodeError ve UnicodeDecodeError da ValueError
                 print(f"Uyarı: {self.filename} dosyası okunamadı veya formatı bozuk.")
-                self.books = []
+                self.store = self._new_store()
+                return
+        if self.journal.recovering:
+            # Önceki sıkıştırma tamamlanamamış; şimdi bitir
+            self.save_books()
+        print(f"{len(self.store)} kitap {self.filename} dosyasından yüklendi.")
+
+    def _load_in_background(self):
+        try:
+            self.load_books()
+        except BaseException as exc:
+            self._load_error = exc
+        finally:
+            self.ready.set()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Arka planda yüklenen katalog hazır olana kadar bekler; zaman aşımında False döner.
+
+        Yükleme hata verdiyse hata burada yeniden fırlatılır; boş katalog
+        üzerinde çalışılıp dosyanın üzerine yazılmaz.
+        """
+        if not self.ready.wait(timeout):
+            return False
+        if self._load_error is not None:
+            raise self._load_error
+        return True
+
+    def _load_store(self) -> BookStore:
+        """Anlık görüntüyü ve günlüğü okuyarak yeni bir depo kurar."""
+        if self.binary:
+            # İkili anlık görüntü çözülmeden eşlenir; aramalar dosyadaki indeksten yapılır
+            table = BinarySnapshot(self.filename, Book) if os.path.exists(self.filename) else None
+            if table is not None:
+                self._canonicalize_keys(table)
+            store = BookStore(table=table, lazy_indexes=True)
+        elif self.lazy:
+            table = LazyTable(Book)
+            if os.path.exists(self.filename):
+                table.load(self.filename)
+            self._canonicalize_keys(table)
+            store = BookStore(table=table, lazy_indexes=True)
         else:
-            print(f"Bilgi: {self.filename} bulunamadı. Yeni bir kütüphane oluşturuluyor.")
+            store = self._new_store(Book(**{**data, "isbn": canonical_key(data["isbn"])})
+                                    for _, _, data in self.journal.iter_snapshot())
+        for record in self.journal.replay():
+            apply_record(store, record, Book, key=canonical_key)
+        return store
+
+    @staticmethod
+    def _canonicalize_keys(table):
+        """Kanonikleştirmeden önce yazılmış anlık görüntüdeki ISBN anahtarlarını kanonik biçime taşır.
+
+        Yalnızca kanonik olmayan anahtarların kitapları oluşturulur; kanonik
+        biçimi zaten olan bir kitabın eski kopyası atılır.
+        """
+        for isbn in [isbn for isbn in table.keys() if canonical_key(isbn) != isbn]:
+            book = table.pop(isbn)
+            book.isbn = canonical_key(isbn)
+            if book.isbn not in table:
+                table[book.isbn] = book
 
     def save_books(self):
-        """Kütüphanedeki kitapları JSON dosyasına kaydeder."""
-        with open(self.filename, 'w', encoding='utf-8') as f:
-            json.dump([book.to_dict() for book in self.books], f, indent=4, ensure_ascii=False)
+        """Kütüphanedeki tüm kitapları JSON dosyasına kaydeder ve günlüğü sıfırlar.
+
+        Dosya geçici bir dosyaya yazılıp atomik olarak değiştirilir; yazarlar
+        kaydetme boyunca yeni günlüğe yazmaya devam eder.
+        """
+        with PERSISTENCE_LATENCY.time(operation="save"):
+            self.journal.snapshot(lambda: [book.to_dict() for book in self._snapshot()])
+
+    def _log_change(self, record: dict):
+        """Tek bir değişikliği günlüğe ekler; günlük büyüdüyse arka planda sıkıştırır.
+
+        Yazar kilidi altında çağrılmalıdır.
+        """
+        self.journal.append(record)
+        if self.journal.needs_compaction:
+            self.journal.compact_in_background(list(self.store))
+
+    def close(self):
+        """Bekleyen değişiklikleri diske yazar, tembel kipteki dosya eşlemesini kapatır ve metrikleri kaydeder."""
+        self.ready.wait()  # Arka plandaki yükleme bitmeden depo kapatılmaz
+        with self._lock.write():
+            with PERSISTENCE_LATENCY.time(operation="close"):
+                self.journal.close()
+            LIBRARY_BOOKS.set(len(self.store))
+            self.store.close()
+        if self.metrics_file:
+            write_textfile(self.metrics_file)
 
     def add_book_by_isbn(self, isbn: str):
-        """Open Library API'sini kullanarak ISBN ile kitap bulur ve kütüphaneye ekler."""
+        """Open Library API'sini kullanarak ISBN ile kitap bulur ve kütüphaneye ekler.
+
+        Kitap kanonik ISBN-13 ile saklanır; ISBN'in farklı yazımları aynı
+        kitaptır. Kontrol hanesi hatalı ISBN reddedilir.
+        """
+        canonical = canonical_isbn(isbn)
+        if canonical is None:
+            print(f"Hata: {isbn} geçerli bir ISBN numarası değil.")
+            return
+        isbn = canonical
+        # Aynı ISBN için eşzamanlı çağrılar sıraya girer; sonrakiler kitabı eklenmiş bulur
+        with self._isbn_locks.hold(isbn):
+            self._add_book_by_isbn(isbn)
+
+    def _add_book_by_isbn(self, isbn: str):
         if self.find_book(isbn):
             print(f"Hata: {isbn} ISBN numaralı kitap zaten kütüphanede mevcut.")
             return
@@ -58,67 +270,229 @@ class Library:
         api_url = f"https://openlibrary.org/api/books?bibkeys=ISBN:{isbn}&format=json&jscmd=data"
         print(f"{isbn} için Open Library'den bilgi alınıyor...")
 
+        start = time.perf_counter()
         try:
             response = httpx.get(api_url)
             response.raise_for_status() # HTTP 4xx/5xx hatalarında exception fırlatır
             data = response.json()
         except httpx.RequestError as exc:
+            _observe_upstream(start, exc)
             print(f"API isteği sırasında bir hata oluştu: {exc}")
             return
-        except json.JSONDecodeError:
+        except json.JSONDecodeError as exc:
+            _observe_upstream(start, exc)
             print("API'den gelen yanıt JSON formatında değil.")
             return
+        except httpx.HTTPStatusError as exc:
+            _observe_upstream(start, exc)
+            raise
+        _observe_upstream(start)
 
         book_data = data.get(f"ISBN:{isbn}")
         if not book_data:
             print(f"Hata: {isbn} ISBN numarası ile Open Library'de kitap bulunamadı.")
             return
 
-        title = book_data.get("title", "N/A")
-        authors = [author["name"] for author in book_data.get("authors", [])]
-        author_str = ", ".join(authors) if authors else "N/A"
-        
-        # Yayınlanma yılını al ve sadece yıl kısmını sakla
-        publish_date = book_data.get("publish_date")
-        publication_year = None
-        if publish_date:
-            try:
-                # Genellikle 'July 2006' gibi formatlarda gelir, son kelimeyi alırız
-                publication_year = int(publish_date.split()[-1])
-            except (ValueError, IndexError):
-                publication_year = None # Sayıya çevrilemezse None bırak
-
-        new_book = Book(title, author_str, isbn, publication_year)
-        self.books.append(new_book)
-        self.save_books()
+        new_book = self._book_from_data(isbn, book_data)
+        with self._lock.write():
+            added = self.store.add(new_book)
+            if added:
+                self._log_change({"op": "add", "book": new_book.to_dict()})
+        if not added:
+            # ISBN kilidi olmadan eklenmiş olabilir (ör. toplu ekleme)
+            print(f"Hata: {isbn} ISBN numaralı kitap zaten kütüphanede mevcut.")
+            return
         print(f"Başarıyla eklendi: {new_book}")
 
+    def add_books_by_isbn(self, isbns: list[str], chunk_size: int = 50, concurrency: int = 8) -> dict[str, str]:
+        """Birden çok ISBN'i Open Library'den toplu olarak çekip kütüphaneye ekler.
+
+        ISBN'ler çok-bibkey'li parçalara bölünür, parçalar en fazla `concurrency`
+        eşzamanlı istekle getirilir ve günlük yalnızca bir kez diske yazılır. ISBN'ler
+        kanonik ISBN-13 biçimine çevrilir; sonuçlar bu biçimle döner: "added",
+        "exists", "not_found", "error" veya geçersiz ISBN için "invalid".
+        """
+        # Sırayı koruyarak tekrarları at; geçersiz ISBN'ler olduğu gibi kalır
+        isbns = list(dict.fromkeys(canonical_isbn(isbn) or isbn for isbn in isbns))
+        results = {isbn: "invalid" for isbn in isbns if canonical_isbn(isbn) is None}
+        results.update({isbn: "exists" for isbn in isbns if isbn not in results and isbn in self.store})
+        pending = [isbn for isbn in isbns if isbn not in results]
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        print(f"{len(pending)} ISBN için Open Library'den {len(chunks)} istekte bilgi alınıyor...")
+
+        fetched = asyncio.run(self._fetch_chunks(chunks, concurrency)) if chunks else {}
+        results.update(self.add_fetched_books({isbn: fetched.get(isbn) for isbn in pending}))
+
+        added = sum(1 for status in results.values() if status == "added")
+        print(f"{added} kitap eklendi, {len(results) - added} ISBN eklenmedi.")
+        return {isbn: results[isbn] for isbn in isbns}
+
+    def add_fetched_books(self, fetched: dict) -> dict[str, str]:
+        """Open Library'den getirilmiş ISBN -> veri eşlemesini kütüphaneye tek partide yazar.
+
+        Değer kitap verisi, bulunamadıysa None, istek başarısızsa istisnadır.
+        Kitaplar kanonik ISBN-13 ile saklanır. Günlük parti sonunda bir kez
+        diske yazılır. Her ISBN için "added", "exists", "not_found", "error"
+        veya "invalid" döner.
+        """
+        results = {}
+        found = []
+        for isbn, book_data in fetched.items():
+            if canonical_isbn(isbn) is None:
+                results[isbn] = "invalid"
+            elif isinstance(book_data, Exception):
+                results[isbn] = "error"
+            elif not book_data:
+                results[isbn] = "not_found"
+            else:
+                found.append((isbn, book_data))
+        # Kayıtlar kilit dışında, tek geçişte normalleştirilir
+        new_books = [Book(**record) for record in normalize_records(found)]
+        with self._lock.write():
+            for (isbn, _), new_book in zip(found, new_books):
+                if self.store.add(new_book):
+                    self._log_change({"op": "add", "book": new_book.to_dict()})
+                    results[isbn] = "added"
+                else:
+                    results[isbn] = "exists"
+        self.journal.sync()
+        return {isbn: results[isbn] for isbn in fetched}
+
+    @staticmethod
+    async def _fetch_chunks(chunks: list[list[str]], concurrency: int) -> dict:
+        """ISBN parçalarını tek bir istemciyle, sınırlı eşzamanlılıkla getirir."""
+        semaphore = asyncio.Semaphore(concurrency)
+        results = {}
+
+        async def fetch_chunk(client: httpx.AsyncClient, chunk: list[str]):
+            bibkeys = ",".join(f"ISBN:{isbn}" for isbn in chunk)
+            api_url = f"https://openlibrary.org/api/books?bibkeys={bibkeys}&format=json&jscmd=data"
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(api_url)
+                    response.raise_for_status()
+                    data = response.json()
+                except (httpx.HTTPError, json.JSONDecodeError) as exc:
+                    _observe_upstream(start, exc)
+                    print(f"API isteği sırasında bir hata oluştu: {exc}")
+                    for isbn in chunk:
+                        results[isbn] = exc
+                    return
+                _observe_upstream(start)
+            for isbn in chunk:
+                results[isbn] = data.get(f"ISBN:{isbn}")
+
+        async with httpx.AsyncClient() as client:
+            await asyncio.gather(*(fetch_chunk(client, chunk) for chunk in chunks))
+        return results
+
+    @staticmethod
+    def _book_from_data(isbn: str, book_data: dict) -> Book:
+        """Open Library'den gelen veriden Book nesnesini oluşturur (bkz. normalize.py)."""
+        return Book(**normalize_record(isbn, book_data))
+
     def remove_book(self, isbn: str):
         """ISBN'e göre bir kitabı siler."""
-        book_to_remove = self.find_book(isbn)
-        if book_to_remove:
-            self.books.remove(book_to_remove)
-            self.save_books()
+        isbn = canonical_key(isbn)
+        with self._lock.write():
+            removed = self.store.remove(isbn) is not None
+            if removed:
+                self._log_change({"op": "remove", "isbn": isbn})
+        if removed:
             print(f"{isbn} ISBN numaralı kitap silindi.")
         else:
             print(f"Hata: {isbn} ISBN numaralı kitap bulunamadı.")
 
+    def changes_since(self, since: int = 0, limit: int | None = None, cursor: str | None = None) -> dict:
+        """`since` sıra numarasından sonraki ekleme ve silmeleri bir değişiklik partisi olarak döndürür.
+
+        Parti başka bir kütüphanenin `apply_changes` metoduna verilir; dosya
+        veya ağ üzerinden `changefeed.encode_batch` ile sıkıştırılarak taşınır.
+        İstenen değişiklikler artık tutulmuyorsa veya `since` negatifse parti
+        tüm kataloğu içerir ve `reset` True olur. Tam katalog ISBN sırasıyla
+        en fazla `limit` kitaplık sayfalara bölünür; sonraki sayfa partinin
+        `sequence` ve `cursor` değerleriyle istenir.
+        """
+        latest = self.journal.sequence
+        if cursor is None and 0 <= since <= latest:
+            changes, oldest = self.journal.changes_since(since, limit)
+            if since >= oldest - 1:
+                return make_batch(since, latest, changes)
+        # Katalog sıra numarasından sonra okunur; arada gelen değişiklikler sonraki partide tekrar gelir
+        books, next_cursor = reset_page(self._snapshot(), cursor, limit)
+        return make_batch(since, latest, [{"op": "add", "book": book.to_dict()} for book in books], reset=True,
+                          after=cursor, cursor=next_cursor)
+
+    def apply_changes(self, batch: dict) -> int:
+        """Başka bir kütüphaneden alınan değişiklik partisini uygular.
+
+        Değişiklikler ISBN bazında idempotenttir; aynı parti tekrar
+        uygulanabilir. Eklenen kitap farklı bilgilerle zaten varsa yenisiyle
+        değiştirilir, tam katalog partisinde (`reset`) sayfanın ISBN aralığında
+        olup partide olmayan kitaplar silinir. Değişiklikler bu kütüphanenin günlüğüne kendi sıra
+        numaralarıyla yazılır. Durumu değiştiren değişiklik sayısını döndürür.
+        """
+        fields = set(Book.__slots__)
+        applied = 0
+        with self._lock.write():
+            if batch.get("reset"):
+                keep = {change["book"]["isbn"] for change in batch["changes"] if change["op"] == "add"}
+                for book in list(self.store):
+                    if book.isbn not in keep and in_reset_page(batch, book.isbn):
+                        applied += self._apply_remove(book.isbn)
+            for change in squash(batch["changes"]):
+                if change["op"] == "add":
+                    data = {key: value for key, value in change["book"].items() if key in fields}
+                    applied += self._apply_add(Book(**data))
+                elif change["op"] == "remove":
+                    applied += self._apply_remove(change["isbn"])
+        self.journal.sync()
+        return applied
+
+    def _apply_add(self, book: Book) -> bool:
+        existing = self.store.get(book.isbn)
+        if existing is not None:
+            if existing.to_dict() == book.to_dict():
+                return False
+            self._apply_remove(book.isbn)
+        self.store.add(book)
+        self._log_change({"op": "add", "book": book.to_dict()})
+        return True
+
+    def _apply_remove(self, isbn: str) -> bool:
+        if self.store.remove(isbn) is None:
+            return False
+        self._log_change({"op": "remove", "isbn": isbn})
+        return True
+
     def list_books(self):
         """Kütüphanedeki tüm kitapları listeler."""
-        if not self.books:
+        books = self._snapshot()
+        if not books:
             print("Kütüphanede hiç kitap yok.")
             return
         print("--- Kütüphanedeki Kitaplar ---")
-        for book in self.books:
+        for book in books:
             print(book)
         print("---------------------------")
 
     def find_book(self, isbn: str) -> Book | None:
-        """ISBN'e göre bir kitabı bulur."""
-        for book in self.books:
-            if book.isbn == isbn:
-                return book
-        return None
+        """ISBN'e (tireli veya ISBN-10 olabilir) göre bir kitabı bulur."""
+        isbn = canonical_key(isbn)
+        return self._lock.read(lambda: self.store.get(isbn))
+
+    def find_books_by_author(self, author: str) -> list[Book]:
+        """Yazar adına göre (harf duyarsız) kitapları bulur."""
+        return self._indexed_read(lambda: self.store.find_by_author(author))
+
+    def search_books(self, query: str, limit: int = 10) -> list[Book]:
+        """Başlık ve yazarda tam metin araması yapar (harf ve Türkçe karakter duyarsız)."""
+        return self._indexed_read(lambda: self.store.search(query, limit=limit))
+
+    def find_books_by_year(self, start: int | None = None, end: int | None = None) -> list[Book]:
+        """Yayın yılı verilen aralıkta (iki uç dahil) olan kitapları bulur."""
+        return self._indexed_read(lambda: self.store.find_by_year_range(start, end))
 
 def main_menu(library: Library):
     """Kullanıcıya ana menüyü sunar ve işlemleri yönetir."""
@@ -128,9 +502,13 @@ def main_menu(library: Library):
         print("2. Kitap Sil")
         print("3. Kitapları Listele")
         print("4. Kitap Ara")
-        print("5. Çıkış")
+        print("5. Başlık/Yazar ile Ara")
+        print("6. Çıkış")
 
-        choice = input("Seçiminiz (1-5): ")
+        choice = input("Seçiminiz (1-6): ")
+        if not library.ready.is_set():
+            print("Katalog yükleniyor, lütfen bekleyin...")
+        library.wait_ready()
 
         if choice == '1':
             isbn = input("Eklenecek kitabın ISBN'i: ")
@@ -152,11 +530,25 @@ def main_menu(library: Library):
             else:
                 print("Bu ISBN ile bir kitap bulunamadı.")
         elif choice == '5':
+            query = input("Aranacak başlık veya yazar: ")
+            books = library.search_books(query)
+            if books:
+                print(f"{len(books)} kitap bulundu:")
+                for book in books:
+                    print(book)
+            else:
+                print("Aramanızla eşleşen bir kitap bulunamadı.")
+        elif choice == '6':
             print("Çıkış yapılıyor...")
             break
         else:
-            print("Geçersiz seçim. Lütfen 1-5 arasında bir numara girin.")
+            print("Geçersiz seçim. Lütfen 1-6 arasında bir numara girin.")
 
 if __name__ == "__main__":
-    my_library = Library()
-    main_menu(my_library)
+    # LIBRARY_FAST_START=1: menü katalog yüklenmeden gösterilir, katalog arka planda okunur
+    my_library = Library(metrics_file=os.environ.get("LIBRARY_METRICS_FILE"),
+                         background=os.environ.get("LIBRARY_FAST_START", "").lower() in ("1", "true", "yes"))
+    try:
+        main_menu(my_library)
+    finally:
+        my_library.close()
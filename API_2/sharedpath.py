@@ -0,0 +1,12 @@
+"""Depo kökündeki ortak `shared` paketini import yoluna ekler.
+
+Aşamalar kendi dizinlerinden çalıştırıldığı için (`python main.py`,
+`uvicorn api:app`) depo kökü import yolunda değildir; `shared`'dan import
+eden modüller önce bu modülü yükler.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
@@ -1,30 +1,40 @@
 import pytest
 import os
-from unittest.mock import patch, Mock
-from main import Library
+from unittest.mock import patch, Mock, AsyncMock
+from main import Book, Library
+
+def remove_library_files(filename: str):
+    """Kütüphane dosyasını, günlüğünü ve geçici dosyalarını siler."""
+    for path in (filename, filename + ".journal", filename + ".journal.old", filename + ".changes", filename + ".tmp"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def _isbn(n: int) -> str:
+    """Testlerde kullanılan, kontrol hanesi doğru n'inci ISBN-13."""
+    core = f"978{n:09d}"
+    return core + str(-sum(int(digit) * (3 if index % 2 else 1) for index, digit in enumerate(core)) % 10)
 
 @pytest.fixture
 def library_fixture():
     """Her test için temiz bir Library nesnesi ve test dosyası oluşturur."""
     test_filename = "test_library_stage2.json"
-    if os.path.exists(test_filename):
-        os.remove(test_filename)
+    remove_library_files(test_filename)
     
     library = Library(filename=test_filename)
     
     yield library
     
-    if os.path.exists(test_filename):
-        os.remove(test_filename)
+    library.close()
+    remove_library_files(test_filename)
 
 @patch('main.httpx.get')
 def test_add_book_by_isbn_success(mock_get, library_fixture: Library):
     """API'den başarılı bir yanıt geldiğinde kitabın eklenmesini test eder."""
-    isbn = "978-0321765723" # The C++ Programming Language
+    isbn = "978-0321563842" # The C++ Programming Language
     mock_response = Mock()
     mock_response.status_code = 200
     mock_response.json.return_value = {
-        f"ISBN:{isbn}": {
+        "ISBN:9780321563842": {
             "title": "The C++ Programming Language",
             "authors": [{"name": "Bjarne Stroustrup"}],
             "publish_date": "May 2013"
@@ -40,11 +50,19 @@ def test_add_book_by_isbn_success(mock_get, library_fixture: Library):
     assert added_book.title == "The C++ Programming Language"
     assert added_book.author == "Bjarne Stroustrup"
     assert added_book.publication_year == 2013
+    # Kitap kanonik ISBN-13 ile saklanır; ISBN-10 yazımı aynı kitabı bulur
+    assert added_book.isbn == "9780321563842"
+    assert library_fixture.find_book("0-321-56384-0") is added_book
+
+    library_fixture.add_book_by_isbn("0321563840")
+    library_fixture.add_book_by_isbn("978-0321563843")  # Hatalı kontrol hanesi
+    assert len(library_fixture.books) == 1
+    assert mock_get.call_count == 1
 
 @patch('main.httpx.get')
 def test_add_book_by_isbn_not_found(mock_get, library_fixture: Library):
     """API'de kitap bulunamadığında (404) ne olduğunu test eder."""
-    isbn = "0000000000000"
+    isbn = _isbn(0)
     mock_response = Mock()
     mock_response.status_code = 200 # API 404 dönmüyor, boş data dönüyor
     mock_response.json.return_value = {}
@@ -57,10 +75,354 @@ def test_add_book_by_isbn_not_found(mock_get, library_fixture: Library):
 @patch('main.httpx.get')
 def test_add_book_api_error(mock_get, library_fixture: Library):
     """API isteği başarısız olduğunda ne olduğunu test eder."""
-    isbn = "1111111111111"
+    isbn = _isbn(1111)
     # httpx.RequestError fırlatmasını simüle et
     mock_get.side_effect = pytest.importorskip("httpx").RequestError("Network error")
 
     library_fixture.add_book_by_isbn(isbn)
 
     assert len(library_fixture.books) == 0 # Kitap eklenmemeli
+
+@patch('main.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_add_books_by_isbn_batch(mock_get, library_fixture: Library):
+    """Toplu eklemede ISBN'lerin parçalar halinde çekilmesini test eder."""
+    def chunk_response(url, *args, **kwargs):
+        bibkeys = url.split("bibkeys=")[1].split("&")[0].split(",")
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            key: {"title": f"Title {key}", "authors": [{"name": "Author"}], "publish_date": "2001"}
+            for key in bibkeys if key != f"ISBN:{_isbn(404)}"
+        }
+        return mock_response
+    mock_get.side_effect = chunk_response
+    library_fixture.store.add(Book("Existing", "Author", _isbn(5)))
+
+    results = library_fixture.add_books_by_isbn(
+        [_isbn(1), _isbn(2), _isbn(404), f"978-{_isbn(1)[3:]}", _isbn(5), "12345", _isbn(3)], chunk_size=2)
+
+    assert results == {_isbn(1): "added", _isbn(2): "added", _isbn(404): "not_found", _isbn(5): "exists",
+                       "12345": "invalid", _isbn(3): "added"}
+    assert mock_get.await_count == 2
+    assert len(library_fixture.books) == 4
+    assert library_fixture.find_book(_isbn(3)).publication_year == 2001
+
+    # Eklenen kitaplar günlüğe de yazılmış olmalı (_isbn(5) yalnızca bellekteydi)
+    reloaded = Library(filename=library_fixture.filename)
+    assert [book.isbn for book in reloaded.books] == [_isbn(1), _isbn(2), _isbn(3)]
+    reloaded.close()
+
+def test_find_books_by_year(library_fixture: Library):
+    """Yayın yılı aralığı sorgularının indeks üzerinden çalışmasını test eder."""
+    for isbn, year in [("1", 1999), ("2", 2005), ("3", None), ("4", 2005), ("5", 2013)]:
+        library_fixture.store.add(Book(f"Title {isbn}", "Author", isbn, year))
+
+    assert [book.isbn for book in library_fixture.find_books_by_year(2000, 2010)] == ["2", "4"]
+    assert [book.isbn for book in library_fixture.find_books_by_year(start=2005)] == ["2", "4", "5"]
+    assert [book.isbn for book in library_fixture.find_books_by_year(end=1999)] == ["1"]
+
+    library_fixture.remove_book("2")
+    library_fixture.remove_book("4")
+    assert [book.isbn for book in library_fixture.find_books_by_year(2000, 2010)] == []
+    assert len(library_fixture.find_books_by_author("author")) == 3
+
+def test_columnar_table_reuses_rows_and_compacts():
+    """Sütunlu tablonun silinen satırları yeniden kullandığını ve başlık yığınını sıkıştırdığını test eder."""
+    from shared.columnar import ColumnarTable
+
+    table = ColumnarTable(Book)
+    for i in range(4):
+        table[str(i)] = Book(f"Title {i}", "Shared Author", str(i), 2000 + i if i % 2 else None)
+    assert table["1"].publication_year == 2001
+    assert table["2"].publication_year is None
+    assert len(table._authors) == 1  # Yazar tekilleştirilmiş olmalı
+
+    table.pop("0")
+    table.pop("1")
+    table.pop("2")  # Çöp yarıyı geçti, yığın sıkıştırılmalı
+    assert table._title_heap == bytearray(b"Title 3")
+
+    table["4"] = Book("Title 4", "Other", "4", 1999)
+    assert len(table._isbns) == 4  # Boşalan satır yeniden kullanılmalı
+    assert [(book.isbn, book.title, book.publication_year) for book in table.values()] == [
+        ("3", "Title 3", 2003), ("4", "Title 4", 1999)
+    ]
+
+def test_streaming_parser_matches_json_load(tmp_path):
+    """Akış halindeki ayrıştırıcının küçük parçalarla da json.load ile aynı sonucu verdiğini test eder."""
+    import json
+    from shared.jsonstream import iter_array
+
+    records = [{"title": f"Kitap {i} – ğüşıöç", "author": "Yazar", "isbn": str(i), "publication_year": 1990 + i}
+               for i in range(20)]
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(records, indent=4, ensure_ascii=False), encoding="utf-8")
+    raw = path.read_bytes()
+
+    with open(path, "rb") as f:
+        items = list(iter_array(f, chunk_size=7))
+    assert [value for _, _, value in items] == records
+    # Ofsetler her kaydın dosyadaki bayt aralığını göstermeli
+    assert all(json.loads(raw[offset:offset + length]) == value for offset, length, value in items)
+
+    path.write_bytes(raw[:-20])  # Yarım kalmış dosya
+    with open(path, "rb") as f, pytest.raises(json.JSONDecodeError):
+        list(iter_array(f, chunk_size=7))
+
+def test_lazy_library(library_fixture: Library):
+    """Tembel kipte kitapların yalnızca erişildiğinde oluşturulduğunu ve günlüğün uygulandığını test eder."""
+    for isbn, year in [("1", 1999), ("2", 2005), ("3", 2013)]:
+        library_fixture.store.add(Book(f"Title {isbn}", "Author", isbn, year))
+    library_fixture.save_books()
+    library_fixture.remove_book("3")
+    library_fixture.close()
+
+    lazy = Library(filename=library_fixture.filename, lazy=True)
+    table = lazy.store._by_isbn
+    assert len(lazy.store) == 2 and "3" not in lazy.store
+    assert table.materialized == 0
+    assert lazy.find_book("2").publication_year == 2005
+
+    lazy.store.add(Book("Title 4", "Other", "4", 2020))
+    assert table.materialized == 1
+    assert [book.isbn for book in lazy.find_books_by_year(2000, 2030)] == ["2", "4"]
+    assert [book.isbn for book in lazy.search_books("title 1")] == ["1"]
+
+    lazy.save_books()  # Eşlenen dosya değiştirilse de eski kayıtlar okunabilmeli
+    assert [book.title for book in lazy.books] == ["Title 1", "Title 2", "Title 4"]
+    lazy.close()
+
+def test_binary_snapshot(library_fixture: Library, tmp_path):
+    """İkili anlık görüntünün yazılıp eşlenerek okunduğunu ve JSON ile karşılıklı çevrildiğini test eder."""
+    from shared.binsnap import BinarySnapshot, binary_to_json, json_to_binary
+
+    for isbn, year in [("3", 2013), ("1", None), ("2", 2005)]:
+        library_fixture.store.add(Book(f"Başlık {isbn}", "Ortak Yazar", isbn, year))
+    library_fixture.save_books()
+
+    binary_path = str(tmp_path / "library.bin")
+    assert json_to_binary(library_fixture.filename, binary_path) == 3
+    library = Library(filename=binary_path, binary=True)
+    assert library.find_book("1").publication_year is None
+    assert library.find_book("2").title == "Başlık 2"
+    assert library.find_book("4") is None
+    assert [book.isbn for book in library.books] == ["3", "1", "2"]  # Eklenme sırası korunur
+
+    library.store.add(Book("Yeni", "Yazar", "0", 1999))
+    library.remove_book("3")
+    assert [book.isbn for book in library.find_books_by_year(1990, 2010)] == ["0", "2"]
+    library.close()
+
+    reopened = Library(filename=binary_path, binary=True)  # Günlük ikili görüntünün üzerine uygulanır
+    assert [book.isbn for book in reopened.books] == ["1", "2"]
+    reopened.save_books()
+    assert len(BinarySnapshot(binary_path, dict)) == 2
+    reopened.close()
+
+    json_path = str(tmp_path / "roundtrip.json")
+    assert binary_to_json(binary_path, json_path) == 2
+    assert [book.to_dict() for book in Library(filename=json_path).books] == [
+        {"title": "Başlık 1", "author": "Ortak Yazar", "isbn": "1", "publication_year": None},
+        {"title": "Başlık 2", "author": "Ortak Yazar", "isbn": "2", "publication_year": 2005},
+    ]
+
+@patch('main.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_ingest_retries_batches_and_resumes(mock_get, library_fixture: Library, tmp_path):
+    """Toplu aktarımın geçici hataları yeniden denediğini ve kontrol noktasından devam ettiğini test eder."""
+    import httpx
+    from ingest import ingest
+
+    calls = []
+    def respond(url, *args, **kwargs):
+        calls.append(url)
+        request = httpx.Request("GET", url)
+        if url.endswith(f"ISBN:{_isbn(1)},ISBN:{_isbn(2)}&format=json&jscmd=data") and calls.count(url) == 1:
+            return httpx.Response(503, request=request)  # Geçici hata: yeniden denenmeli
+        bibkeys = url.split("bibkeys=")[1].split("&")[0].split(",")
+        return httpx.Response(200, request=request, json={
+            key: {"title": f"Title {key}", "authors": [{"name": "Author"}], "publish_date": "2001"}
+            for key in bibkeys if key != f"ISBN:{_isbn(404)}"
+        })
+    mock_get.side_effect = respond
+
+    # Tireli yazım kanonik biçime çevrilir; geçersiz ISBN Open Library'ye sorulmaz
+    rows = f"title,isbn\nA,978-{_isbn(1)[3:]}\nB,{_isbn(2)}\nX,12345\nC,{_isbn(404)}\nD,{_isbn(3)}\n"
+    source = tmp_path / "books.csv"
+    source.write_text(rows, encoding="utf-8")
+    options = dict(rate=1000, burst=10, concurrency=2, chunk_size=2, batch_size=2, base_delay=0, report_every=0)
+
+    summary = ingest(library_fixture, str(source), **options)
+    assert summary["statuses"] == {"added": 3, "not_found": 1, "invalid": 1}
+    assert summary["retries"] == 1
+    assert sorted(book.isbn for book in library_fixture.books) == [_isbn(1), _isbn(2), _isbn(3)]
+    assert set(summary["latency_ms"]) == {"p50", "p95", "p99"}
+
+    # Aynı dosya tekrar işlendiğinde hiçbir istek yapılmamalı
+    calls.clear()
+    source.write_text(rows + f"E,{_isbn(4)}\n", encoding="utf-8")
+    summary = ingest(library_fixture, str(source), **options)
+    assert summary["skipped"] == 5
+    assert summary["statuses"] == {"added": 1}
+    assert len(calls) == 1 and f"ISBN:{_isbn(4)}" in calls[0]
+    os.remove(str(source) + ".checkpoint")
+
+@patch('main.httpx.get')
+def test_metrics_textfile(mock_get, tmp_path):
+    """Kapanışta Open Library ve kalıcılık metriklerinin Prometheus biçiminde yazıldığını test eder."""
+    import httpx
+    from shared.metrics import REGISTRY
+
+    upstream = REGISTRY.get("openlibrary_request_duration_seconds")
+    errors = REGISTRY.get("openlibrary_errors_total")
+    ok_before = upstream.count(outcome="ok")
+    errors_before = errors.value(kind="network_error")
+    mock_response = Mock()
+    mock_response.json.return_value = {f"ISBN:{_isbn(42)}": {"title": "Metrics", "authors": [{"name": "A"}], "publish_date": "2020"}}
+    mock_get.return_value = mock_response
+
+    filename = str(tmp_path / "library.json")
+    metrics_file = tmp_path / "library.prom"
+    library = Library(filename=filename, metrics_file=str(metrics_file))
+    library.add_book_by_isbn(_isbn(42))
+    mock_get.side_effect = httpx.ConnectError("connection refused")
+    library.add_book_by_isbn(_isbn(43))
+    library.save_books()
+    library.close()
+
+    assert upstream.count(outcome="ok") == ok_before + 1
+    assert errors.value(kind="network_error") == errors_before + 1
+    text = metrics_file.read_text(encoding="utf-8")
+    assert "# TYPE library_persistence_duration_seconds histogram" in text
+    assert 'library_persistence_duration_seconds_count{operation="save"}' in text
+    assert "library_books 1.0" in text
+
+@patch('main.httpx.get')
+def test_concurrent_adds_fetch_each_isbn_once(mock_get, library_fixture: Library):
+    """Aynı ISBN için eşzamanlı eklemelerde Open Library'ye bir kez gidildiğini test eder."""
+    import threading
+    import time
+
+    def respond(url):
+        time.sleep(0.01)  # İkinci çağrının birinciyle çakışması için
+        isbn = url.split("ISBN:")[1].split("&")[0]
+        response = Mock()
+        response.json.return_value = {f"ISBN:{isbn}": {"title": f"Book {isbn}", "authors": [{"name": "A"}]}}
+        return response
+
+    mock_get.side_effect = respond
+    threads = [threading.Thread(target=library_fixture.add_book_by_isbn, args=(isbn,))
+               for isbn in (_isbn(1), _isbn(2), _isbn(1), f"978-{_isbn(2)[3:]}", _isbn(1))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert mock_get.call_count == 2
+    assert sorted(book.isbn for book in library_fixture.books) == [_isbn(1), _isbn(2)]
+    assert library_fixture.journal.entries == 2
+
+def test_sync_pull_transfers_only_new_changes(library_fixture: Library, tmp_path):
+    """`sync.pull` ile yalnızca son alınan sıra numarasından sonraki değişikliklerin çekildiğini test eder."""
+    from shared.sync import pull
+
+    library_fixture.add_fetched_books({
+        _isbn(1): {"title": "Title 1", "authors": [{"name": "Author"}], "publish_date": "1998"},
+        _isbn(2): {"title": "Title 2", "authors": [{"name": "Author"}], "publish_date": "March 2005"},
+        _isbn(3): {"title": "Title 3", "authors": [{"name": "Author"}]},
+    })
+    requests = []
+
+    def fetch(url, since, limit, cursor):
+        requests.append(since if cursor is None else (since, cursor))
+        batch = library_fixture.changes_since(since, limit, cursor)
+        batch["source"] = source
+        return batch
+
+    source = "a"
+    replica = Library(filename=str(tmp_path / "replica.json"))
+    state = str(tmp_path / "replica.json.sync")
+    assert pull(replica, "http://source", state, limit=2, fetch=fetch) == 3
+    assert requests == [0, 2]
+    assert replica.find_book(_isbn(2)).publication_year == 2005
+
+    library_fixture.remove_book(_isbn(1))
+    requests.clear()
+    assert pull(replica, "http://source", state, limit=2, fetch=fetch) == 1
+    assert requests == [3]
+    assert sorted(book.isbn for book in replica.books) == [_isbn(2), _isbn(3)]
+
+    # Kaynak değişince tam katalog istenir; katalog sayfa sayfa gelir ve
+    # her sayfa yalnızca kendi ISBN aralığındaki fazlalıkları siler
+    source = "b"
+    requests.clear()
+    replica.apply_changes({"changes": [{"op": "add", "book": {"isbn": _isbn(1), "title": "Eski", "author": "A"}},
+                                       {"op": "add", "book": {"isbn": _isbn(9), "title": "Eski", "author": "A"}}]})
+    assert pull(replica, "http://source", state, limit=1, fetch=fetch) == 2
+    assert requests == [4, -1, (4, _isbn(2))]
+    assert sorted(book.isbn for book in replica.books) == [_isbn(2), _isbn(3)]
+    replica.close()
+
+    first = library_fixture.changes_since(-1, limit=1)
+    assert (first["reset"], first["sequence"], first["cursor"]) == (True, 4, _isbn(2))
+    last = library_fixture.changes_since(first["sequence"], limit=1, cursor=first["cursor"])
+    assert (last["sequence"], last["after"], last["cursor"]) == (4, _isbn(2), None)
+    assert [change["book"]["isbn"] for change in last["changes"]] == [_isbn(3)]
+
+def test_book_from_data_normalizes_dates_and_authors():
+    """Farklı tarih biçimlerinden yılın çıkarıldığını ve yazarların sadeleştirildiğini test eder."""
+    for publish_date, year in (("July 2006", 2006), ("2005-03-01", 2005), ("c1999", 1999), ("[1985?]", 1985),
+                               ("n.d.", None), ("", None)):
+        assert Library._book_from_data(_isbn(1), {"title": "T", "publish_date": publish_date}).publication_year == year
+    book = Library._book_from_data(_isbn(1), {"title": "  İnce   Memed ", "authors": [{"name": "Yaşar Kemal"}, {"name": "yaşar  kemal"}, {}]})
+    assert (book.title, book.author) == ("İnce Memed", "Yaşar Kemal")
+    assert Library._book_from_data(_isbn(1), {}).to_dict() == {"title": "N/A", "author": "N/A", "isbn": _isbn(1), "publication_year": None}
+
+def test_fast_start_defers_imports_and_catalog(library_fixture: Library):
+    """Menü için httpx/asyncio yüklenmemeli; katalog arka planda okunmalı."""
+    import subprocess
+    import sys
+
+    library_fixture.apply_changes({"changes": [{"op": "add", "book": {"isbn": "1", "title": "Kar", "author": "Orhan Pamuk"}}]})
+    library_fixture.save_books()
+    script = (
+        "import sys, main\n"
+        "print(type(sys.modules['httpx']).__name__)\n"
+        f"library = main.Library(filename={library_fixture.filename!r}, background=True)\n"
+        "library.wait_ready()\n"
+        "print([book.isbn for book in library.books])\n"
+        "library.close()\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    lines = result.stdout.splitlines()
+    assert lines[0] == "_LazyModule"
+    assert lines[-1] == "['1']"
+
+@patch('main.httpx.get')
+def test_legacy_hyphenated_isbns_are_canonicalized_on_load(mock_get, library_fixture: Library):
+    """Kanonikleştirmeden önce tireli yazılmış ISBN'lerin her iki biçimle bulunup silinebildiğini test eder."""
+    import json
+
+    library_fixture.close()
+    with open(library_fixture.filename, 'w', encoding='utf-8') as f:
+        json.dump([{"title": "Clean Architecture", "author": "Robert C. Martin", "isbn": "0-13-449416-4", "publication_year": 2017},
+                   {"title": "Eski", "author": "Yazar", "isbn": "1", "publication_year": None}], f)
+    with open(library_fixture.filename + ".journal", 'w', encoding='utf-8') as f:
+        f.write(json.dumps({"op": "add", "book": {"title": "Effective Java", "author": "Joshua Bloch",
+                                                  "isbn": "0-13-468599-7", "publication_year": 2018}}) + "\n")
+
+    for options in ({}, {"lazy": True}):
+        library = Library(filename=library_fixture.filename, **options)
+        assert library.find_book("9780134494166").title == "Clean Architecture"
+        assert library.find_book("0-13-449416-4").isbn == "9780134494166"
+        assert library.find_book("978-0134685991").title == "Effective Java"
+        assert library.find_book("1").title == "Eski"  # Geçersiz eski anahtarlar olduğu gibi kalır
+        library.close()
+
+    library = Library(filename=library_fixture.filename)
+    library.add_book_by_isbn("978-0-13-449416-6")  # Zaten var; Open Library'ye gidilmez, kopya oluşmaz
+    mock_get.assert_not_called()
+    library.remove_book("0134494164")
+    assert library.find_book("9780134494166") is None
+    library.remove_book("9780134685991")
+    assert [book.isbn for book in library.books] == ["1"]
+    library.close()
@@ -1,7 +1,28 @@
+import asyncio
 import httpx
-from fastapi import FastAPI, HTTPException, status
-from pydantic import BaseModel, Field
-from typing import List, Dict
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from typing import AsyncIterator, List, Dict, Literal
+
+import sharedpath  # noqa: F401  (shared paketi için)
+from cache import KeyedLock, SingleFlight
+from compression import CompressionMiddleware, CompressionSettings, encoded_headers
+from httpcache import accepts_encoding, content_etag, http_date, is_not_modified
+from instrumentation import MetricsMiddleware, RequestProfiler
+from jobs import Job, JobFailed, JobQueue
+from openlibrary import CircuitOpenError, OpenLibraryClient
+from repository import BookRepository, create_repository
+from serialization import BookEncoder
+from shared.changefeed import encode_batch, in_reset_page, make_batch, squash
+from shared.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from shared.normalize import canonical_isbn, canonical_key, normalize_isbn, normalize_record, normalize_records
+from shared.search import SearchIndex
+from versionfile import SharedVersion, create_shared_version
 
 # --- Pydantic Modelleri ---
 class Book(BaseModel):
@@ -11,97 +32,821 @@ class Book(BaseModel):
     author: str = Field(..., description="Yazar(lar)")
     publication_year: int | None = Field(default=None, description="Yayınlanma Yılı")
 
+class SearchResult(Book):
+    """Arama sonucunda dönen kitap ve ilgililik skoru."""
+    score: float = Field(..., description="BM25 ilgililik skoru")
+
 class IsbnModel(BaseModel):
-    """POST isteğinde alınacak ISBN verisi için model."""
+    """POST isteğinde alınacak ISBN verisi için model.
+
+    ISBN kontrol hanesiyle doğrulanır ve kanonik ISBN-13 biçimine çevrilir;
+    geçersiz ISBN 422 ile reddedilir.
+    """
+    isbn: str
+
+    @field_validator("isbn")
+    @classmethod
+    def _canonical(cls, value: str) -> str:
+        return normalize_isbn(value)
+
+class IsbnBatchModel(BaseModel):
+    """Toplu ekleme isteğinde alınacak ISBN listesi için model."""
+    isbns: List[str] = Field(..., description="Eklenecek kitapların ISBN numaraları")
+
+class BatchResult(BaseModel):
+    """Toplu eklemede tek bir ISBN'in sonucu."""
     isbn: str
+    status: Literal["added", "exists", "not_found", "error"]
+    book: Book | None = None
+    detail: str | None = None
+
+class JobModel(BaseModel):
+    """Arka planda çalışan bir kitap ekleme işinin durumu."""
+    id: str
+    isbn: str
+    status: Literal["queued", "running", "succeeded", "failed", "dead"]
+    attempts: int = Field(..., description="Şimdiye kadar yapılan deneme sayısı")
+    result: Book | None = Field(default=None, description="Başarıyla eklenen kitap")
+    error: str | None = None
+    status_code: int | None = Field(default=None, description="Kalıcı hatada eşzamanlı uç noktanın döneceği HTTP kodu")
+    created_at: float
+    updated_at: float
 
 # --- Kütüphane Mantığı ---
 
-# Veritabanı yerine geçecek basit bir in-memory sözlük
+# Tüm koleksiyonu response_model'den geçirmeden tek seferde JSON'a çevirmek için
+BOOK_LIST = TypeAdapter(List[Book])
+
+# Varsayılan (in-memory) arka ucun kullandığı sözlük
 # Key: ISBN, Value: Book modeli
 library_db: Dict[str, Book] = {}
 
 class Library:
     """Kütüphane işlemlerini yöneten sınıf."""
 
-    def get_all_books(self) -> List[Book]:
+    def __init__(self, client: OpenLibraryClient, repository: BookRepository, fast_json: bool = False,
+                 shared: SharedVersion | None = None, compression: CompressionSettings | None = None):
+        self.client = client
+        self.repository = repository
+        # fast_json açıkken yanıtlar önbellekli baytlar olarak, yeniden doğrulanmadan döner
+        self.fast_json = fast_json
+        self.encoder = BookEncoder()
+        # Başlık/yazar arama indeksi; ilk aramada depodan kurulur
+        self._search_index: SearchIndex | None = None
+        # Her ekleme/silmede artan koleksiyon sürümü; ETag ve Last-Modified bundan türetilir
+        self.version = 0
+        self.last_modified = time.time()
+        # Süreç başına ön ek: yeniden başlatmadan sonra aynı sürüm numarası eski ETag ile karışmaz
+        self._etag_prefix = uuid.uuid4().hex[:12]
+        # Katalog worker'lar arasında paylaşılıyorsa sürüm ve ETag ön eki ortak dosyadan gelir
+        self.shared = shared
+        if shared is not None:
+            self.version, self.last_modified = shared.read()
+            self._etag_prefix = shared.id
+        # Tüm koleksiyonun kodlanmış hali (sürüm, bayt); değişiklikte geçersiz olur
+        self._collection: tuple[int, bytes] | None = None
+        # Koleksiyonun sıkıştırılmış halleri, kodlamaya göre (sürüm, bayt)
+        self.compression = compression or CompressionSettings()
+        self._compressed: Dict[str, tuple[int, bytes]] = {}
+        self._single_flight = SingleFlight()
+        # Aynı ISBN için ekleme/silmeler sıraya girer; arama indeksi ve kodlayıcı depoyla tutarlı kalır
+        self._isbn_locks = KeyedLock()
+        # Açılıştaki ısınma bitti mi (GET /ready); ısınma başarısız olduysa hatası
+        self.ready = False
+        self.warm_up_error: Exception | None = None
+
+    @property
+    def etag(self) -> str:
+        """Koleksiyonun o anki sürümüne ait güçlü ETag."""
+        return f'"{self._etag_prefix}-{self.version}"'
+
+    def cache_headers(self) -> Dict[str, str]:
+        """Koleksiyon yanıtlarına eklenen doğrulayıcı başlıklar."""
+        self.refresh()
+        return {
+            "ETag": self.etag,
+            "Last-Modified": http_date(self.last_modified),
+            "Cache-Control": "no-cache",  # İstemci her seferinde koşullu istekle doğrulamalı
+        }
+
+    def _changed(self):
+        """Koleksiyon değişti: sürümü artırır ve kodlanmış koleksiyonu geçersiz kılar.
+
+        Paylaşımlı kipte sürüm ortak dosyada artırılır, böylece diğer worker'lar
+        da değişikliği görür.
+        """
+        if self.shared is None:
+            self.version += 1
+            self.last_modified = time.time()
+            self._collection = None
+            self._compressed.clear()
+            return
+        seen = self.version
+        previous, self.version, self.last_modified = self.shared.bump()
+        if previous != seen:
+            # Arada başka bir worker da değiştirmiş; yerel indeksler ona göre güncel değil
+            self._clear_caches()
+        self._collection = None
+        self._compressed.clear()
+
+    def _clear_caches(self):
+        self.encoder.clear()
+        self._search_index = None
+        self._collection = None
+        self._compressed.clear()
+
+    def invalidate_caches(self):
+        """Depo dışarıdan değiştiğinde süreç içi önbellekleri ve indeksleri sıfırlar."""
+        self._clear_caches()
+        self._changed()
+
+    def refresh(self):
+        """Paylaşımlı kipte başka bir worker kataloğu değiştirdiyse süreç içi önbellekleri sıfırlar.
+
+        Sürüm dosyası belleğe eşlendiğinden kontrol ucuzdur; her okuma isteğinde yapılır.
+        """
+        if self.shared is None:
+            return
+        version, modified = self.shared.read()
+        if version != self.version:
+            self._clear_caches()
+            self.version, self.last_modified = version, modified
+
+    async def get_collection_bytes(self) -> bytes:
+        """Tüm koleksiyonu JSON baytları olarak döndürür; sonuç bir sonraki değişikliğe kadar saklanır.
+
+        Önbellek boşken eşzamanlı gelen istekler tek bir kodlamayı paylaşır.
+        """
+        return (await self._versioned_collection())[1]
+
+    async def _versioned_collection(self) -> tuple[int, bytes]:
+        """Koleksiyonun JSON baytlarını, kodlamaya başlanırken okunan sürümle birlikte döndürür."""
+        self.refresh()
+        version = self.version
+        cached = self._collection
+        if cached is not None and cached[0] == version:
+            return cached
+
+        async def build() -> tuple[int, bytes]:
+            books = await self.get_books()
+            data = self.encoder.encode_books(books) if self.fast_json else BOOK_LIST.dump_json(books)
+            if self.version == version:  # Kodlama sürerken değişiklik olduysa saklama
+                self._collection = (version, data)
+            return version, data
+
+        return await self._single_flight.do(("collection", version), build)
+
+    async def get_compressed_collection(self, encoding: str) -> bytes:
+        """Koleksiyonun `encoding` ile sıkıştırılmış JSON baytlarını döndürür.
+
+        Sonuç koleksiyon sürümüyle birlikte saklanır; koleksiyon değişmedikçe
+        tekrarlanan büyük istekler yeniden sıkıştırılmaz. Sıkıştırma olay
+        döngüsünü bekletmemek için ayrı bir iş parçacığında yapılır (zlib ve
+        brotli GIL'i bırakır). Sıkıştırılan baytlar, kodlandıkları sürümle
+        saklanır; arada değişiklik olduysa hiç saklanmaz.
+        """
+        version, data = await self._versioned_collection()
+        cached = self._compressed.get(encoding)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        async def build() -> bytes:
+            compressed = await asyncio.to_thread(self.compression.compress, data, encoding)
+            if self.version == version:
+                self._compressed[encoding] = (version, compressed)
+            return compressed
+
+        return await self._single_flight.do(("compressed", version, encoding), build)
+
+    async def warm_up(self):
+        """Kataloğu okuyup tam listenin kodlanmış halini ve arama indeksini önceden kurar.
+
+        Açılışta arka planda çalışır; böylece sunucu hemen istek kabul eder
+        ve ilk istekler kataloğu okuma bedelini ödemez. Hata yeniden
+        fırlatılmaz (görev beklenmez); `warm_up_error`'da saklanır ve
+        GET /ready 503 ile bildirir.
+        """
+        try:
+            await self.get_collection_bytes()
+            await self._get_search_index()
+        except Exception as exc:
+            self.warm_up_error = exc
+            return
+        self.ready = True
+
+    def _index_book(self, book: Book):
+        if self._search_index is not None:
+            self._search_index.add(book.isbn, book.title, book.author)
+
+    async def _get_search_index(self) -> SearchIndex:
+        self.refresh()
+        if self._search_index is None:
+            version = self.version
+            index = SearchIndex()
+            async for book in self.iter_books():
+                index.add(book.isbn, book.title, book.author)
+            self.refresh()
+            if self.version != version:
+                return index  # Kurulum sürerken koleksiyon değişti; eksik olabilir, saklama
+            self._search_index = index
+        return self._search_index
+
+    async def search_books(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[SearchResult]:
+        """Başlık ve yazarda tam metin araması yapar; sonuçlar BM25 skoruna göre sıralıdır."""
+        index = await self._get_search_index()
+        results = []
+        for isbn, score in index.search(query, limit=limit, fuzzy=fuzzy):
+            book = await self.repository.get(isbn)
+            if book is not None:
+                results.append(SearchResult(**book.model_dump(), score=score))
+        return results
+
+    @staticmethod
+    def _book_from_data(isbn: str, book_data: dict) -> Book:
+        """Open Library'den gelen veriden Book modelini oluşturur (bkz. normalize.py)."""
+        return Book(**normalize_record(isbn, book_data, default_author=""))
+
+    async def get_all_books(self) -> List[Book]:
         """Kütüphanedeki tüm kitapları listeler."""
-        return list(library_db.values())
+        return await self.repository.list_all()
+
+    async def get_books(
+        self,
+        after: str | None = None,
+        limit: int | None = None,
+        author: str | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+    ) -> List[Book]:
+        """ISBN'e göre sıralı, filtrelenmiş bir kitap sayfası döndürür."""
+        return await self.repository.list_page(after, limit, author, year_from, year_to)
+
+    async def iter_books(self, after: str | None = None, page_size: int = 500, **filters) -> AsyncIterator[Book]:
+        """Filtrelenmiş kitapları sayfa sayfa çekerek tek tek üretir (bellek kullanımı sabit)."""
+        while True:
+            page = await self.repository.list_page(after, page_size, **filters)
+            for book in page:
+                yield book
+            if len(page) < page_size:
+                return
+            after = page[-1].isbn
 
-    def remove_book(self, isbn: str) -> bool:
+    async def get_book(self, isbn: str) -> Book | None:
+        """Verilen ISBN'e (tireli veya ISBN-10 olabilir) sahip kitabı döndürür, yoksa None."""
+        isbn = canonical_key(isbn)
+        self.refresh()
+        return await self.repository.get(isbn)
+
+    async def remove_book(self, isbn: str) -> bool:
         """Verilen ISBN'e sahip kitabı kütüphaneden siler."""
-        if isbn in library_db:
-            del library_db[isbn]
-            return True
-        return False
+        isbn = canonical_key(isbn)
+        async with self._isbn_locks.hold(isbn):
+            self.encoder.invalidate(isbn)
+            if self._search_index is not None:
+                self._search_index.remove(isbn)
+            removed = await self.repository.remove(isbn)
+            if removed:
+                self._changed()
+            return removed
 
     async def add_book_by_isbn(self, isbn: str) -> Book:
-        """Open Library API'sini kullanarak ISBN ile kitap bulur ve kütüphaneye ekler."""
-        if isbn in library_db:
+        """Open Library API'sini kullanarak ISBN ile kitap bulur ve kütüphaneye ekler.
+
+        Kitap kanonik ISBN-13 ile saklanır; ISBN'in farklı yazımları aynı
+        kitaptır. Kontrol hanesi hatalı ISBN 422 ile reddedilir.
+        """
+        try:
+            isbn = normalize_isbn(isbn)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+        # Aynı ISBN için eşzamanlı istekler sıraya girer; sonrakiler 409 alır
+        async with self._isbn_locks.hold(isbn):
+            return await self._add_book_by_isbn(isbn)
+
+    async def _add_book_by_isbn(self, isbn: str) -> Book:
+        if await self.repository.contains(isbn):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Book with ISBN {isbn} already exists."
             )
 
-        api_url = f"https://openlibrary.org/api/books?bibkeys=ISBN:{isbn}&format=json&jscmd=data"
-
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(api_url)
-                response.raise_for_status()  # HTTP 4xx/5xx hatalarında exception fırlatır
-                data = response.json()
-            except httpx.RequestError as exc:
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail=f"Error while requesting from Open Library: {exc}"
-                )
+        try:
+            book_data = await self.client.lookup_isbn(isbn)
+        except CircuitOpenError as exc:
+            # Open Library'ye istek gönderilmedi; ne zaman yeniden denenebileceğini bildir
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Open Library is temporarily unavailable: {exc}",
+                headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+            )
+        except httpx.HTTPError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Error while requesting from Open Library: {exc}"
+            )
 
-        book_data = data.get(f"ISBN:{isbn}")
         if not book_data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Book with ISBN {isbn} not found in Open Library."
             )
 
-        # Gelen veriden Book modelini oluştur
-        new_book = Book(
-            isbn=isbn,
-            title=book_data.get("title", "N/A"),
-            author=", ".join([author["name"] for author in book_data.get("authors", [])]),
-            publication_year=int(book_data.get("publish_date", "0").split()[-1]) if book_data.get("publish_date") else None
-        )
+        new_book = self._book_from_data(isbn, book_data)
 
-        # Kitabı veritabanına ekle
-        library_db[new_book.isbn] = new_book
+        # Kitabı veritabanına ekle. await sırasında aynı ISBN başka bir istek
+        # (veya başka bir worker) tarafından eklenmiş olabilir; ekleme atomiktir.
+        self.encoder.invalidate(isbn)
+        if not await self.repository.add(new_book):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Book with ISBN {isbn} already exists."
+            )
+        self._index_book(new_book)
+        self._changed()
         return new_book
 
+    async def changes_since(self, since: int, limit: int = 1000, cursor: str | None = None) -> dict:
+        """`since` sıra numarasından sonraki en fazla `limit` ekleme ve silmeyi bir değişiklik partisi olarak döndürür.
+
+        İstenen değişiklikler artık tutulmuyorsa, `since` akışın son sıra
+        numarasından büyükse (ör. yeniden başlatılmış bellek içi depo) veya
+        negatifse parti tüm kataloğu içerir ve `reset` True olur. Tam katalog
+        ISBN sırasıyla en fazla `limit` kitaplık sayfalara bölünür; sonraki
+        sayfa partinin `sequence` ve `cursor` değerleriyle istenir.
+        """
+        # Devam sayfasında değişikliklere gerek yok; yalnızca son sıra numarası okunur
+        changes, latest, oldest = await self.repository.changes_since(max(since, 0), 0 if cursor is not None else limit)
+        source = self.repository.source
+        if cursor is None and 0 <= since <= latest and since >= oldest - 1:
+            return make_batch(since, latest, changes, source=source)
+        # Katalog sıra numarasından sonra okunur; arada gelen değişiklikler sonraki partide tekrar gelir
+        books = await self.get_books(cursor, limit + 1)
+        next_cursor = books[limit - 1].isbn if len(books) > limit else None
+        return make_batch(since, latest, [{"op": "add", "book": book.model_dump()} for book in books[:limit]],
+                          reset=True, source=source, after=cursor, cursor=next_cursor)
+
+    async def apply_changes(self, batch: dict) -> int:
+        """Başka bir kütüphaneden (ör. `GET /changes`) alınan değişiklik partisini uygular.
+
+        Değişiklikler ISBN bazında idempotenttir; aynı parti tekrar
+        uygulanabilir. Eklenen kitap farklı bilgilerle zaten varsa yenisiyle
+        değiştirilir, tam katalog partisinde (`reset`) sayfanın ISBN aralığında
+        olup partide olmayan kitaplar silinir. Durumu değiştiren değişiklik
+        sayısını döndürür.
+        """
+        applied = 0
+        if batch.get("reset"):
+            keep = {change["book"]["isbn"] for change in batch["changes"] if change["op"] == "add"}
+            stale = []
+            async for book in self.iter_books(after=batch.get("after")):
+                if not in_reset_page(batch, book.isbn):
+                    break
+                if book.isbn not in keep:
+                    stale.append(book.isbn)
+            for isbn in stale:
+                applied += await self._apply_change(isbn, None)
+        for change in squash(batch["changes"]):
+            if change["op"] == "add":
+                data = {field: value for field, value in change["book"].items() if field in Book.model_fields}
+                applied += await self._apply_change(data["isbn"], Book(**data))
+            elif change["op"] == "remove":
+                applied += await self._apply_change(change["isbn"], None)
+        return applied
+
+    async def _apply_change(self, isbn: str, book: Book | None) -> bool:
+        """ISBN'in son durumunu `book` yapar (None: silinmiş); durum değiştiyse True döndürür."""
+        async with self._isbn_locks.hold(isbn):
+            existing = await self.repository.get(isbn)
+            if existing == book:
+                return False
+            self.encoder.invalidate(isbn)
+            if existing is not None:
+                if self._search_index is not None:
+                    self._search_index.remove(isbn)
+                await self.repository.remove(isbn)
+            if book is not None:
+                await self.repository.add(book)
+                self._index_book(book)
+            self._changed()
+            return True
+
+    async def add_books_by_isbn(self, isbns: List[str]) -> List[BatchResult]:
+        """Birden çok ISBN'i Open Library'den toplu olarak çekip kütüphaneye ekler.
+
+        ISBN'ler kanonik ISBN-13 biçimine çevrilip tekrarlar atılır; sonuçlar
+        bu biçimle döner. Geçersiz ISBN'ler "error" sonucu alır.
+        """
+        results: Dict[str, BatchResult] = {}
+        keys = []
+        for isbn in isbns:
+            canonical = canonical_isbn(isbn)
+            if canonical is None:
+                results[isbn] = BatchResult(isbn=isbn, status="error", detail=f"Invalid ISBN: {isbn!r}")
+            keys.append(canonical or isbn)
+        keys = list(dict.fromkeys(keys))
+        isbns = [isbn for isbn in keys if isbn not in results]
+        existing = {isbn for isbn in isbns if await self.repository.contains(isbn)}
+        lookups = await self.client.lookup_isbns([isbn for isbn in isbns if isbn not in existing])
+
+        found = []
+        for isbn in isbns:
+            book_data = lookups.get(isbn)
+            if isbn in existing:
+                results[isbn] = BatchResult(isbn=isbn, status="exists")
+            elif isinstance(book_data, Exception):
+                results[isbn] = BatchResult(
+                    isbn=isbn,
+                    status="error",
+                    detail=f"Error while requesting from Open Library: {book_data}"
+                )
+            elif not book_data:
+                results[isbn] = BatchResult(isbn=isbn, status="not_found")
+            else:
+                found.append((isbn, book_data))
+        new_books = [Book(**record) for record in normalize_records(found, default_author="")]
+
+        # Yeni kitapları tek işlemde ekle; arada başkası eklediyse "exists" say
+        for new_book in new_books:
+            self.encoder.invalidate(new_book.isbn)
+        for new_book, added in zip(new_books, await self.repository.add_many(new_books)):
+            results[new_book.isbn] = (
+                BatchResult(isbn=new_book.isbn, status="added", book=new_book)
+                if added else BatchResult(isbn=new_book.isbn, status="exists")
+            )
+            if added:
+                self._index_book(new_book)
+        if new_books:
+            self._changed()
+        return [results[isbn] for isbn in keys]
+
 # --- FastAPI Uygulaması ---
 
+# Tüm istekler tarafından paylaşılan, uzun ömürlü Open Library istemcisi
+open_library = OpenLibraryClient()
+# LIBRARY_BACKEND=sqlite ile worker'lar arasında paylaşılan kalıcı depo kullanılır
+repository = create_repository(Book, library_db)
+# sqlite arka ucunda worker'lar önbelleklerini ortak sürüm dosyasıyla geçersiz kılar
+shared_version = create_shared_version()
+# Yanıt sıkıştırması (LIBRARY_COMPRESSION*); ara katman ve koleksiyon önbelleği aynı ayarları kullanır
+compression = CompressionSettings.from_env()
+library = Library(open_library, repository, fast_json=os.environ.get("LIBRARY_FAST_JSON", "").lower() in ("1", "true", "yes"),
+                  shared=shared_version, compression=compression)
+
+async def _add_book_job(isbn: str) -> Book:
+    """Kuyruktaki ekleme işini çalıştırır; Open Library erişilemezse iş yeniden denenir."""
+    try:
+        return await library.add_book_by_isbn(isbn)
+    except HTTPException as exc:
+        if exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+            raise
+        raise JobFailed(exc.detail, exc.status_code)
+
+# POST /books?mode=async ile gelen eklemeleri işleyen arka plan kuyruğu
+jobs = JobQueue(
+    _add_book_job,
+    workers=int(os.environ.get("LIBRARY_JOB_WORKERS", "4")),
+    max_queue=int(os.environ.get("LIBRARY_JOB_QUEUE_SIZE", "1000")),
+    max_attempts=int(os.environ.get("LIBRARY_JOB_MAX_ATTEMPTS", "3")),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Paylaşılan HTTP istemcisini açılışta oluşturur; kapanışta iş kuyruğunu, istemciyi ve depoyu kapatır.
+
+    Katalog açılışı bekletmeden arka planda ısıtılır (LIBRARY_WARMUP=0 ile
+    kapatılır); bitene kadar GET /ready 503 döner.
+    """
+    await open_library.start()
+    warm_up = None
+    if os.environ.get("LIBRARY_WARMUP", "1").lower() in ("1", "true", "yes"):
+        warm_up = asyncio.create_task(library.warm_up())
+    else:
+        library.ready = True
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+    await jobs.aclose()
+    await open_library.aclose()
+    await repository.close()
+    if shared_version is not None:
+        shared_version.close()
+
 app = FastAPI(
     title="Kütüphane API",
     description="FastAPI ile Open Library entegrasyonlu basit kütüphane servisi.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-library = Library()
+# X-Profile başlıklı istekler LIBRARY_PROFILE_DIR ayarlıysa cProfile ile profillenir
+profiler = RequestProfiler(os.environ.get("LIBRARY_PROFILE_DIR") or None)
+# Sonra eklenen ara katman dışta çalışır: ölçülen süreye sıkıştırma da dahildir
+app.add_middleware(CompressionMiddleware, settings=compression)
+app.add_middleware(MetricsMiddleware, registry=REGISTRY, profiler=profiler)
+
+# Diğer bileşenlerin istatistiklerinden /metrics'e aktarılan ölçüler
+LIBRARY_BOOKS = REGISTRY.gauge("library_books", "Kütüphanedeki kitap sayısı")
+CACHE_LOOKUPS = REGISTRY.counter(
+    "openlibrary_cache_lookups_total", "ISBN önbelleği sorguları", ("result",))
+CACHE_HIT_RATIO = REGISTRY.gauge("openlibrary_cache_hit_ratio", "ISBN önbelleğinin isabet oranı")
+CACHE_SIZE = REGISTRY.gauge("openlibrary_cache_entries", "ISBN önbelleğindeki kayıt sayısı")
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge("openlibrary_requests_in_flight", "Süren Open Library istekleri")
+BREAKER_STATE = REGISTRY.gauge(
+    "openlibrary_circuit_state", "Devre kesici durumu (0 kapalı, 1 yarı açık, 2 açık)")
+BREAKER_REJECTED = REGISTRY.counter(
+    "openlibrary_circuit_rejected_total", "Devre açıkken gönderilmeden reddedilen istekler")
+STALE_SERVED = REGISTRY.counter(
+    "openlibrary_stale_served_total", "Yerel aynadan sunulan (eski olabilecek) kayıtlar")
+JOB_QUEUE = REGISTRY.gauge("library_jobs", "Arka plan işleri", ("state",))
+JOBS_COMPLETED = REGISTRY.counter("library_jobs_completed_total", "Tamamlanan arka plan işleri")
+
+def _collect_stats():
+    """Önbellek, devre kesici ve iş kuyruğu sayaçlarını metriklere aktarır."""
+    cache = open_library.cache.stats()
+    for result in ("hits", "negative_hits", "misses"):
+        CACHE_LOOKUPS.set_total(cache[result], result=result)
+    CACHE_HIT_RATIO.set(cache["hit_rate"])
+    CACHE_SIZE.set(cache["size"])
+    UPSTREAM_IN_FLIGHT.set(open_library.in_flight)
+    breaker = open_library.breaker.stats()
+    BREAKER_STATE.set(breaker["state_code"])
+    BREAKER_REJECTED.set_total(breaker["rejected"])
+    STALE_SERVED.set_total(open_library.stale_served)
+    job_stats = jobs.stats()
+    JOB_QUEUE.set(job_stats["queued"], state="queued")
+    JOB_QUEUE.set(job_stats["running"], state="running")
+    JOB_QUEUE.set(job_stats["dead_letter"], state="dead")
+    JOBS_COMPLETED.set_total(job_stats["completed"])
+
+REGISTRY.add_collector(_collect_stats)
+
+def _parse_fields(fields: str | None) -> set[str] | None:
+    """`fields` sorgu parametresini doğrulayıp alan kümesine çevirir."""
+    if not fields:
+        return None
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - set(Book.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return selected
+
+def _page_headers(request: Request, headers: Dict[str, str], books: List[Book], limit: int | None) -> Dict[str, str]:
+    """Sayfa dolduysa sonraki sayfanın imlecini `X-Next-Cursor` ve `Link` başlıklarıyla ekler."""
+    headers = dict(headers)
+    if limit is not None and len(books) == limit:
+        next_cursor = books[-1].isbn
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return headers
 
 @app.get("/books", response_model=List[Book])
-async def get_books():
-    """Kütüphanedeki tüm kitapların listesini döndürür."""
-    return library.get_all_books()
+async def get_books(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=1000, description="Sayfadaki en fazla kitap sayısı"),
+    cursor: str | None = Query(default=None, description="Önceki sayfanın X-Next-Cursor değeri"),
+    author: str | None = Query(default=None, description="Yazar adında geçen metin (harf duyarsız)"),
+    year_from: int | None = Query(default=None, description="En erken yayın yılı (dahil)"),
+    year_to: int | None = Query(default=None, description="En geç yayın yılı (dahil)"),
+    fields: str | None = Query(default=None, description="Döndürülecek alanlar, ör. isbn,title"),
+    format: Literal["json", "ndjson"] = Query(default="json", description="ndjson: kitapları satır satır akıtır"),
+):
+    """Kütüphanedeki kitapları ISBN sırasına göre listeler.
+
+    `limit` verilirse sonuç sayfalanır ve sonraki sayfa için imleç
+    `X-Next-Cursor` başlığında döner. `format=ndjson` tüm sonucu belleğe
+    almadan, her satırda bir kitap olacak şekilde akıtır; `limit` ile
+    birlikte verilirse yalnızca o sayfayı akıtır ve imleç yine başlıkta döner.
+
+    Yanıtlar koleksiyon sürümünden türetilen `ETag` ve `Last-Modified`
+    başlıklarını taşır; `If-None-Match` (veya `If-Modified-Since`) ile gelen
+    istek, koleksiyon değişmediyse gövdesiz `304 Not Modified` alır.
+    """
+    selected = _parse_fields(fields)
+    filters = {"author": author, "year_from": year_from, "year_to": year_to}
+    # Doğrulayıcılar veri okunmadan önce alınır: arada değişiklik olursa ETag eski kalır,
+    # bu da en kötü ihtimalle bir sonraki istekte gereksiz bir 200 demektir
+    validators = library.cache_headers()
+    if is_not_modified(request.headers, validators["ETag"], library.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+
+    if format == "ndjson":
+        def encode(book: Book) -> bytes | str:
+            if library.fast_json and selected is None:
+                return library.encoder.encode_book(book) + b"\n"
+            return book.model_dump_json(include=selected) + "\n"
+
+        if limit is not None:
+            # Sayfalı akış: yalnızca istenen sayfa gönderilir, sonraki sayfa imleci başlıkta döner
+            books = await library.get_books(cursor, limit, **filters)
+            return StreamingResponse((encode(book) for book in books), media_type="application/x-ndjson",
+                                     headers=_page_headers(request, validators, books, limit))
+
+        async def stream():
+            async for book in library.iter_books(after=cursor, **filters):
+                yield encode(book)
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers=validators)
+
+    if selected is None and limit is None and cursor is None and not any(filters.values()):
+        # Filtresiz tam liste: kodlanmış (ve sıkıştırılmış) hali bir sonraki değişikliğe kadar önbellekte
+        data = await library.get_collection_bytes()
+        encoding = library.compression.negotiate(request.headers)
+        if encoding is None or len(data) < library.compression.min_size:
+            return Response(data, media_type="application/json", headers=validators)
+        return Response(await library.get_compressed_collection(encoding), media_type="application/json",
+                        headers=encoded_headers(validators, encoding))
+
+    books = await library.get_books(cursor, limit, **filters)
+    headers = _page_headers(request, validators, books, limit)
+    if selected is not None:
+        # Projeksiyonlu yanıt Book şemasına uymadığı için doğrudan döndürülür
+        return JSONResponse([book.model_dump(include=selected) for book in books], headers=headers)
+    if library.fast_json:
+        return Response(library.encoder.encode_books(books), media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return books
+
+@app.get("/books/search", response_model=List[SearchResult])
+async def search_books(
+    q: str = Query(..., min_length=1, description="Başlık veya yazarda aranacak metin"),
+    limit: int = Query(default=10, ge=1, le=100),
+    fuzzy: bool = Query(default=True, description="Tek harf hatalı yazımları da eşleştir"),
+):
+    """Başlık ve yazarda tam metin araması yapar.
+
+    Büyük/küçük harf ve Türkçe karakter duyarsızdır; son kelimeler önek olarak
+    eşleşir ve sonuçlar BM25 skoruna göre sıralanır.
+    """
+    return await library.search_books(q, limit=limit, fuzzy=fuzzy)
+
+@app.get("/books/{isbn}", response_model=Book)
+async def get_book(isbn: str, request: Request):
+    """Belirtilen ISBN'e sahip kitabı döndürür.
 
-@app.post("/books", response_model=Book, status_code=status.HTTP_201_CREATED)
-async def create_book(isbn_model: IsbnModel):
-    """ISBN kullanarak Open Library'den bir kitabı kütüphaneye ekler."""
-    return await library.add_book_by_isbn(isbn_model.isbn)
+    Yanıt, kitabın JSON gövdesinin özetinden türetilen bir `ETag` taşır;
+    `If-None-Match` ile gelen istek kitap değişmediyse `304 Not Modified` alır.
+    """
+    book = await library.get_book(isbn)
+    if book is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with ISBN {isbn} not found."
+        )
+    data = library.encoder.encode_book(book)
+    headers = {"ETag": content_etag(data), "Cache-Control": "no-cache"}
+    if is_not_modified(request.headers, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(data, media_type="application/json", headers=headers)
+
+def _job_model(job: Job) -> JobModel:
+    data = job.to_dict()
+    return JobModel(isbn=data.pop("payload"), **data)
+
+def _job_response(job: Job, status_code: int = status.HTTP_200_OK) -> JSONResponse:
+    return JSONResponse(
+        _job_model(job).model_dump(mode="json"),
+        status_code=status_code,
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+@app.post(
+    "/books",
+    response_model=Book,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobModel, "description": "mode=async: iş kuyruğa alındı"}},
+)
+async def create_book(
+    isbn_model: IsbnModel,
+    mode: Literal["sync", "async"] = Query(default="sync", description="async: 202 ve iş kimliği döner, ekleme arka planda yapılır"),
+):
+    """ISBN kullanarak Open Library'den bir kitabı kütüphaneye ekler.
+
+    `mode=async` ile istek Open Library yanıtını beklemez; ekleme işi
+    kuyruğa alınır ve `202 Accepted` ile iş durumu döner. Sonuç
+    `GET /jobs/{id}` ile sorgulanır.
+    """
+    if mode == "async":
+        try:
+            job = jobs.submit(isbn_model.isbn, key=isbn_model.isbn)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Job queue is full, try again later.",
+                headers={"Retry-After": "1"},
+            )
+        return _job_response(job, status.HTTP_202_ACCEPTED)
+
+    book = await library.add_book_by_isbn(isbn_model.isbn)
+    if library.fast_json:
+        return Response(library.encoder.encode_book(book), status_code=status.HTTP_201_CREATED, media_type="application/json")
+    return book
+
+@app.post("/books/batch", response_model=List[BatchResult])
+async def create_books_batch(batch: IsbnBatchModel):
+    """Birden çok ISBN'i Open Library'den toplu olarak kütüphaneye ekler.
+
+    Sonuçlar her ISBN için ayrı ayrı döner: added, exists, not_found veya
+    error (geçersiz ISBN dahil).
+    """
+    return await library.add_books_by_isbn(batch.isbns)
 
 @app.delete("/books/{isbn}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book(isbn: str):
     """Belirtilen ISBN'e sahip kitabı kütüphaneden siler."""
-    success = library.remove_book(isbn)
+    success = await library.remove_book(isbn)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Book with ISBN {isbn} not found."
         )
     return
+
+@app.get("/changes")
+async def get_changes(
+    request: Request,
+    since: int = Query(default=0, ge=-1, description="Son alınan sıra numarası; -1 tüm kataloğu ister"),
+    limit: int = Query(default=1000, ge=1, le=10000, description="Partideki en fazla değişiklik"),
+    cursor: str | None = Query(default=None, description="Tam katalog partisinin önceki sayfasındaki `cursor` değeri"),
+):
+    """`since` sıra numarasından sonraki ekleme ve silmeleri döndürür (değişiklik akışı).
+
+    Replikalar ve yedekler kataloğun tamamı yerine yalnızca farkları alır:
+    yanıttaki `sequence` bir sonraki istekte `since` olarak verilir,
+    `sequence < latest` ise alınacak başka değişiklik vardır. Değişiklikler
+    artık tutulmuyorsa yanıt tüm kataloğu `limit` kitaplık sayfalarla taşır
+    ve `reset` True olur; `cursor` None değilse sonraki sayfa aynı `since`
+    (`sequence`) ve bu `cursor` ile istenir. İstemci kabul ediyorsa parti
+    gzip ile sıkıştırılır.
+    """
+    batch = await library.changes_since(since, limit, cursor)
+    compress = accepts_encoding(request.headers, "gzip")
+    headers = {"Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return Response(encode_batch(batch, compress=compress), media_type="application/json", headers=headers)
+
+@app.get("/jobs/dead-letter", response_model=List[JobModel])
+async def get_dead_letter_jobs():
+    """Tüm denemeleri tükenen veya beklenmeyen hatayla sonlanan işleri (en eskisi önce) listeler."""
+    return [_job_model(job) for job in jobs.dead_letter]
+
+@app.get("/jobs/{job_id}", response_model=JobModel)
+async def get_job(job_id: str):
+    """Arka plandaki bir ekleme işinin durumunu döndürür."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found."
+        )
+    return _job_model(job)
+
+@app.get("/stats/jobs")
+async def get_job_stats():
+    """Arka plan iş kuyruğunun doluluk ve sayaç istatistiklerini döndürür."""
+    return jobs.stats()
+
+@app.get("/stats/openlibrary")
+async def get_openlibrary_stats():
+    """Open Library bağlantı havuzu, önbellek, devre kesici ve ayna istatistiklerini döndürür."""
+    return await open_library.stats()
+
+@app.get("/ready")
+async def get_ready():
+    """Hazırlık (readiness) kontrolü: açılıştaki katalog ısınması bitene kadar 503 döner.
+
+    Yük dengeleyici veya otomatik ölçekleyici yeni bir örneğe bu uç nokta
+    200 dönene kadar trafik yönlendirmemelidir. Süreç ayakta olsa da istekler
+    o zamana kadar kataloğu okuma bedelini öder.
+    """
+    if library.warm_up_error is not None:
+        return JSONResponse({"status": "failed", "detail": str(library.warm_up_error)},
+                            status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    if not library.ready:
+        return JSONResponse({"status": "starting"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return {"status": "ready", "version": library.version}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Tüm metrikleri Prometheus metin biçiminde döndürür."""
+    LIBRARY_BOOKS.set(await library.repository.count())
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Kütüphane API sunucusunu bir veya daha çok worker ile başlatır.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker süreç sayısı (ör. çekirdek sayısı)")
+    args = parser.parse_args()
+    if args.workers > 1:
+        # Süreç içi arka uçlarda her worker'ın ayrı bir kataloğu olurdu
+        backend = os.environ.setdefault("LIBRARY_BACKEND", "sqlite").strip().lower()
+        if backend != "sqlite":
+            parser.error(f"--workers {args.workers} requires LIBRARY_BACKEND=sqlite (got {backend!r})")
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
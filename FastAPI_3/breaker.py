@@ -0,0 +1,108 @@
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# Metrik olarak dışa aktarılan durum kodları
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Art arda hata veren bir bağımlılığa istek göndermeyi geçici olarak durduran devre kesici.
+
+    - Kapalı (closed): istekler geçer; art arda `failure_threshold` hata
+      olursa devre açılır.
+    - Açık (open): istekler hiç gönderilmeden hemen reddedilir.
+      `recovery_timeout` saniye sonra devre yarı açık hale gelir.
+    - Yarı açık (half_open): en fazla `half_open_max_calls` deneme isteğine
+      izin verilir; deneme başarılıysa devre kapanır, başarısızsa yeniden
+      açılır.
+    Her izin verilen istekten sonra `record` çağrılmalıdır.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self.reset()
+
+    def reset(self):
+        """Devreyi kapalı duruma döndürür ve sayaçları sıfırlar."""
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.successes = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """Güncel durum; açık devrenin bekleme süresi dolduysa yarı açığa geçer."""
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        """Devre açıksa yeniden deneme yapılabilmesi için kalan saniye, değilse 0."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """İsteğin gönderilip gönderilemeyeceğini söyler; reddedilenleri sayar."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record(self, healthy: bool | None):
+        """İzin verilen isteğin sonucunu kaydeder.
+
+        `healthy` None ise (ör. istek iptal edildi) sonuç sayılmaz, yalnızca
+        yarı açık durumdaki deneme hakkı iade edilir.
+        """
+        if self._state == HALF_OPEN and self._probes:
+            self._probes -= 1
+        if healthy is None:
+            return
+        if healthy:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self._state = CLOSED
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self._state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probes = 0
+        self.opened += 1
+
+    def stats(self) -> dict:
+        """Durumu ve sayaçları döndürür (durum kodu: 0 kapalı, 1 yarı açık, 2 açık)."""
+        state = self.state
+        return {
+            "state": state,
+            "state_code": STATE_CODES[state],
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "recovery_timeout": self.recovery_timeout,
+            "retry_after": self.retry_after(),
+            "failures": self.failures,
+            "successes": self.successes,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
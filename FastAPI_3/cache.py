@@ -0,0 +1,165 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+# Önbellekte olmayan anahtar için dönen işaret; None "bulunamadı" sonucudur
+MISSING = object()
+
+
+class TTLCache:
+    """Boyutu sınırlı, süreli (TTL) LRU önbellek.
+
+    Olumsuz sonuçlar (None, "bulunamadı") ayrı ve genellikle daha kısa bir
+    süreyle saklanır; böylece var olmayan ISBN'ler de tekrar tekrar sorulmaz.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 86_400.0,
+        negative_ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        # Key -> (son geçerlilik zamanı, değer); sıra en eskiden en yeniye
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any:
+        """Değeri döndürür; yoksa veya süresi dolduysa MISSING döndürür."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        if value is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Değeri saklar; kapasite aşılırsa en uzun süredir kullanılmayanı atar."""
+        ttl = self.negative_ttl if value is None else self.ttl
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Anahtarı önbellekten siler."""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Önbelleği boşaltır (sayaçlar korunur)."""
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """İsabet/ıskalama sayaçlarını döndürür."""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
+
+
+class _LeaderCancelled(Exception):
+    """İşi yürüten çağıran iptal edildi; bekleyenlerden biri işi yeniden başlatır."""
+
+
+class SingleFlight:
+    """Aynı anahtar için eşzamanlı çağrıları tek bir çağrıda birleştirir.
+
+    İlk çağıran işi yürütür; o iş sürerken gelen diğer çağıranlar aynı
+    sonucu (veya aynı hatayı) bekler. İşi yürüten çağıran iptal edilirse
+    (ör. istemci bağlantıyı kesti) iptal bekleyenlere yayılmaz: ilk uyanan
+    bekleyen işi yeniden başlatır, diğerleri onu bekler.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """`fn`'i anahtar başına en fazla bir kez eşzamanlı çalıştırır."""
+        coalesced = False
+        while (future := self._calls.get(key)) is not None:
+            if not coalesced:
+                coalesced = True
+                self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()  # Bekleyen yoksa "never retrieved" uyarısını engelle
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # Bekleyen yoksa "never retrieved" uyarısını engelle
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+class KeyedLock:
+    """Anahtar (ör. ISBN) başına ayrı `asyncio.Lock`; farklı anahtarlar birbirini beklemez.
+
+    Kilitler ilk ihtiyaçta oluşturulur ve son kullanan bıraktığında silinir.
+    """
+
+    def __init__(self):
+        # Anahtar -> [kilit, tutan ve bekleyenlerin sayısı]
+        self._locks: dict[Hashable, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        """Blok süresince `key` anahtarının kilidini tutar."""
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
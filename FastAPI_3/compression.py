@@ -0,0 +1,189 @@
+import gzip
+import os
+import zlib
+from typing import Mapping
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from httpcache import accepts_encoding
+
+try:
+    import brotli
+except ImportError:  # İsteğe bağlı: kurulu değilse yalnızca gzip sunulur
+    brotli = None
+
+# Sıkıştırmanın kazanç sağladığı (metin tabanlı) içerik türleri
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class CompressionSettings:
+    """Yanıt sıkıştırmasının kodlama, eşik ve seviye ayarları.
+
+    `encodings` sunucunun tercih sırasıdır; istemcinin kabul ettiği ilk
+    kodlama seçilir. brotli kütüphanesi kurulu değilse "br" atlanır. Gövdesi
+    `min_size` bayttan küçük yanıtlar sıkıştırılmaz: küçük gövdelerde
+    kazanılan birkaç bayt, harcanan CPU'ya değmez.
+    """
+
+    def __init__(self, encodings: tuple[str, ...] = ("br", "gzip"), min_size: int = 1024,
+                 gzip_level: int = 6, brotli_quality: int = 4):
+        self.encodings = tuple(encoding for encoding in encodings if encoding != "br" or brotli is not None)
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.encodings)
+
+    @classmethod
+    def from_env(cls) -> "CompressionSettings":
+        """Ayarları LIBRARY_COMPRESSION* ortam değişkenlerinden oluşturur ("off" sıkıştırmayı kapatır)."""
+        value = os.environ.get("LIBRARY_COMPRESSION", "br,gzip").strip().lower()
+        encodings = () if value in ("", "off", "0", "none") else tuple(
+            encoding.strip() for encoding in value.split(",") if encoding.strip())
+        return cls(
+            encodings=encodings,
+            min_size=int(os.environ.get("LIBRARY_COMPRESSION_MIN_SIZE", "1024")),
+            gzip_level=int(os.environ.get("LIBRARY_GZIP_LEVEL", "6")),
+            brotli_quality=int(os.environ.get("LIBRARY_BROTLI_QUALITY", "4")),
+        )
+
+    def negotiate(self, headers: Mapping[str, str]) -> str | None:
+        """İstemcinin kabul ettiği ilk kodlamayı döndürür; hiçbiri kabul edilmiyorsa None."""
+        for encoding in self.encodings:
+            if accepts_encoding(headers, encoding):
+                return encoding
+        return None
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """Gövdeyi verilen kodlamayla tek seferde sıkıştırır."""
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compressor(self, encoding: str) -> "StreamCompressor":
+        return StreamCompressor(encoding, self)
+
+
+class StreamCompressor:
+    """Akışlı yanıtları parça parça sıkıştırır.
+
+    Her parçadan sonra sıkıştırıcı boşaltılır (flush); istemci bir satırı
+    almak için akışın sonunu beklemez.
+    """
+
+    def __init__(self, encoding: str, settings: CompressionSettings):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def weak_etag(etag: str) -> str:
+    """Sıkıştırılmış gövde bayt bayt aynı olmadığından güçlü ETag'i zayıfa çevirir.
+
+    `If-None-Match` zayıf karşılaştırma kullandığı için koşullu istekler yine eşleşir.
+    """
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+def encoded_headers(headers: Mapping[str, str], encoding: str) -> dict[str, str]:
+    """Önceden sıkıştırılmış bir gövde için yanıt başlıklarını hazırlar."""
+    headers = dict(headers)
+    headers["Content-Encoding"] = encoding
+    headers["Vary"] = "Accept-Encoding"
+    if "ETag" in headers:
+        headers["ETag"] = weak_etag(headers["ETag"])
+    return headers
+
+
+def _mark_encoded(headers: MutableHeaders, encoding: str):
+    headers["Content-Encoding"] = encoding
+    if "etag" in headers:
+        headers["ETag"] = weak_etag(headers["etag"])
+
+
+class CompressionMiddleware:
+    """Metin tabanlı yanıtları istemcinin kabul ettiği kodlamayla (brotli/gzip) sıkıştıran ASGI ara katmanı.
+
+    Tek parça gövdeler eşikten büyükse bir kerede sıkıştırılır; akışlı
+    yanıtlar (ör. ndjson) boyutları önceden bilinmediğinden parça parça
+    sıkıştırılır. Zaten kodlanmış (`Content-Encoding` taşıyan) yanıtlara,
+    ör. önbellekten gelen sıkıştırılmış koleksiyona dokunulmaz.
+    """
+
+    def __init__(self, app, settings: CompressionSettings):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.settings.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.settings.negotiate(Headers(scope=scope))
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "content-encoding" in headers or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                # Başlıklar gövdenin ilk parçası görülene kadar bekletilir
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = MutableHeaders(scope=start_message)
+                if not more_body:
+                    # Tek parça gövde
+                    if len(body) >= self.settings.min_size:
+                        body = self.settings.compress(body, encoding)
+                        _mark_encoded(headers, encoding)
+                        headers["Content-Length"] = str(len(body))
+                        message = {"type": "http.response.body", "body": body}
+                    else:
+                        passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+                compressor = self.settings.compressor(encoding)
+                _mark_encoded(headers, encoding)
+                del headers["Content-Length"]
+                await send(start_message)
+                start_message = None
+
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,64 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping
+
+
+def content_etag(data: bytes) -> str:
+    """Yanıt gövdesinin özetinden güçlü (strong) bir ETag üretir."""
+    return '"' + hashlib.blake2b(data, digest_size=8).hexdigest() + '"'
+
+
+def http_date(timestamp: float) -> str:
+    """Unix zamanını `Last-Modified` için HTTP tarih biçimine çevirir."""
+    return format_datetime(datetime.fromtimestamp(timestamp, timezone.utc), usegmt=True)
+
+
+def _opaque(tag: str) -> str:
+    # If-None-Match zayıf karşılaştırma kullanır: W/ öneki yok sayılır
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: float | None = None) -> bool:
+    """Koşullu GET isteğinin `304 Not Modified` ile yanıtlanıp yanıtlanamayacağını söyler.
+
+    `If-None-Match` varsa yalnızca ona bakılır (RFC 9110); yoksa
+    `If-Modified-Since` kaynağın son değişiklik zamanıyla karşılaştırılır.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False  # Geçersiz tarih yok sayılır
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP tarihleri saniye hassasiyetindedir
+    return int(last_modified) <= since.timestamp()
+
+
+def accepts_encoding(headers: Mapping[str, str], coding: str) -> bool:
+    """İstemcinin `Accept-Encoding` başlığı verilen içerik kodlamasını (ör. gzip) kabul ediyor mu?
+
+    Kodlama açıkça adlandırılmadıysa `*` değerine bakılır; `q=0` reddetmek demektir.
+    """
+    qualities = {}
+    for item in headers.get("accept-encoding", "").split(","):
+        name, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities.get(coding, qualities.get("*", 0.0)) > 0
@@ -0,0 +1,112 @@
+import cProfile
+import os
+import re
+import time
+
+import sharedpath  # noqa: F401  (shared paketi için)
+from shared.metrics import REGISTRY, Registry
+
+
+class RequestProfiler:
+    """`X-Profile` başlığı taşıyan istekleri cProfile ile profilleyen isteğe bağlı kanca.
+
+    `directory` verilmemişse kapalıdır. Her profil `.prof` dosyası olarak
+    yazılır (`python -m pstats` veya snakeviz ile incelenebilir) ve dosya adı
+    yanıtın `X-Profile-File` başlığında döner. cProfile süreç genelinde tek
+    bir profilleyiciye izin verdiği için aynı anda yalnızca bir istek
+    profillenir; profil, istek sürerken olay döngüsünde çalışan diğer
+    görevleri de içerir.
+    """
+
+    HEADER = b"x-profile"
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._active = False
+        self.profiled = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def wants(self, scope: dict) -> bool:
+        """İstek profillenmek isteniyor ve profilleme açık mı?"""
+        if not self.enabled:
+            return False
+        return any(name == self.HEADER and value not in (b"", b"0") for name, value in scope["headers"])
+
+    def start(self) -> cProfile.Profile | None:
+        """Profillemeyi başlatır; başka bir istek profilleniyorsa None döner."""
+        if self._active:
+            self.skipped += 1
+            return None
+        self._active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def path_for(self, scope: dict) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        return os.path.join(self.directory, f"{time.time_ns()}-{scope['method']}-{slug}.prof")
+
+    def stop(self, profile: cProfile.Profile, path: str):
+        profile.disable()
+        self._active = False
+        os.makedirs(self.directory, exist_ok=True)
+        profile.dump_stats(path)
+        self.profiled += 1
+
+
+class MetricsMiddleware:
+    """Her HTTP isteğinin süresini ve sonucunu rota şablonuna göre ölçen ASGI ara katmanı.
+
+    Etiket olarak gerçek yol yerine rota şablonu (ör. `/jobs/{job_id}`)
+    kullanılır; eşleşmeyen yollar "unmatched" olarak sayılır, böylece etiket
+    sayısı sınırlı kalır. Süre, akışlı yanıtlar dahil yanıtın son baytı
+    gönderilene kadar ölçülür.
+    """
+
+    def __init__(self, app, registry: Registry = REGISTRY, profiler: RequestProfiler | None = None):
+        self.app = app
+        self.profiler = profiler
+        self.requests = registry.counter(
+            "http_requests_total", "Tamamlanan HTTP istekleri", ("method", "route", "status"))
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "HTTP isteklerinin süresi (sn)", ("method", "route"))
+        self.in_progress = registry.gauge("http_requests_in_progress", "İşlenmekte olan HTTP istekleri")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        profile = profile_path = None
+        if self.profiler is not None and self.profiler.wants(scope):
+            profile = self.profiler.start()
+            if profile is not None:
+                profile_path = self.profiler.path_for(scope)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile_path is not None:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-file", os.path.basename(profile_path).encode())]
+            await send(message)
+
+        self.in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_progress.dec()
+            if profile is not None:
+                self.profiler.stop(profile, profile_path)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            self.latency.observe(elapsed, method=scope["method"], route=route_path)
+            self.requests.inc(method=scope["method"], route=route_path, status=status_code)
@@ -0,0 +1,210 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class JobFailed(Exception):
+    """İşin kalıcı olarak başarısız olduğunu bildirir; yeniden denenmez.
+
+    Örneğin kitap Open Library'de yoksa veya zaten kütüphanedeyse.
+    """
+
+    def __init__(self, detail: str, status_code: int | None = None):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class Job:
+    """Kuyruktaki tek bir işin durumu.
+
+    Durumlar: "queued", "running", "succeeded", "failed" (kalıcı hata) ve
+    "dead" (denemeler tükendi veya beklenmeyen hata; ölü mektup listesinde).
+    """
+
+    __slots__ = ("id", "key", "payload", "status", "attempts", "result", "error",
+                 "status_code", "created_at", "updated_at")
+
+    def __init__(self, payload: Any, key: Hashable | None = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.payload = payload
+        self.status = "queued"
+        self.attempts = 0
+        self.result: Any = None
+        self.error: str | None = None
+        self.status_code: int | None = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "dead")
+
+    def _set(self, status: str, **fields):
+        self.status = status
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.updated_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "payload": self.payload,
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "status_code": self.status_code,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobQueue:
+    """Sınırlı eşzamanlılıkla çalışan süreç içi iş kuyruğu.
+
+    İşler `submit` ile kuyruğa alınır ve `workers` adet görev tarafından
+    `handler(payload)` çağrılarak işlenir. Görevler ilk işte, o anki olay
+    döngüsünde başlatılır; döngü değişirse (ör. testlerde) bekleyen işlerle
+    birlikte yeni döngüde yeniden kurulur.
+
+    - `JobFailed` fırlatan iş "failed" olur ve yeniden denenmez.
+    - Diğer hatalar `retry_delay * 2**deneme` saniye sonra en fazla
+      `max_attempts` kez denenir; denemeler tükenirse iş "dead" olur ve ölü
+      mektup listesine eklenir.
+    - Aynı `key` ile bekleyen veya çalışan bir iş varsa yenisi açılmaz,
+      mevcut iş döndürülür.
+    - Kuyruk `max_queue` işe ulaşınca `submit` `asyncio.QueueFull` fırlatır.
+    - Tamamlanmış işlerin en fazla `max_jobs` tanesi sorgulanabilmek için
+      saklanır.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], workers: int = 4, max_queue: int = 1000,
+                 max_attempts: int = 3, retry_delay: float = 1.0, max_jobs: int = 10000,
+                 dead_letter_size: int = 1000):
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_jobs = max_jobs
+        self.dead_letter: deque[Job] = deque(maxlen=dead_letter_size)
+        self._jobs: dict[str, Job] = {}
+        # Tamamlanan işlerin kimlikleri, bitiş sırasıyla (eski işleri silmek için)
+        self._finished: deque[str] = deque()
+        self._active: dict[Hashable, Job] = {}
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        # Yeniden denemeyi bekleyen işlerin zamanlayıcıları (çöp toplanmasınlar diye)
+        self._retry_tasks: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.running = 0
+        self.completed = 0
+        self.retried = 0
+
+    def _ensure_started(self):
+        """Çalışan görevleri o anki olay döngüsünde başlatır (ilk kullanımda veya döngü değiştiyse)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        pending = [job for job in self._jobs.values() if job.status in ("queued", "running")]
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self.running = 0
+        for job in pending:
+            job._set("queued")
+            self._queue.put_nowait(job)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, payload: Any, key: Hashable | None = None) -> Job:
+        """İşi kuyruğa alır ve hemen döndürür."""
+        self._ensure_started()
+        if key is not None and key in self._active:
+            return self._active[key]
+        if self._queue.qsize() >= self.max_queue:
+            raise asyncio.QueueFull
+        job = Job(payload, key)
+        self._jobs[job.id] = job
+        if key is not None:
+            self._active[key] = job
+        self._queue.put_nowait(job)
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def _evict(self):
+        """Saklanan iş sayısı sınırı aşıldıysa en eski tamamlanmış işleri siler."""
+        while len(self._jobs) > self.max_jobs and self._finished:
+            self._jobs.pop(self._finished.popleft(), None)
+
+    def _finish(self, job: Job, status: str, **fields):
+        job._set(status, **fields)
+        if job.key is not None and self._active.get(job.key) is job:
+            del self._active[job.key]
+        self.completed += 1
+        self._finished.append(job.id)
+        if status == "dead":
+            self.dead_letter.append(job)
+
+    async def _requeue_later(self, job: Job, delay: float):
+        await asyncio.sleep(delay)
+        self._queue.put_nowait(job)
+
+    async def _worker(self):
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            job._set("running", attempts=job.attempts + 1)
+            self.running += 1
+            try:
+                result = await self.handler(job.payload)
+            except JobFailed as exc:
+                self._finish(job, "failed", error=exc.detail, status_code=exc.status_code)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                if job.attempts >= self.max_attempts:
+                    self._finish(job, "dead", error=error)
+                else:
+                    self.retried += 1
+                    job._set("queued", error=error)
+                    task = asyncio.get_running_loop().create_task(
+                        self._requeue_later(job, self.retry_delay * 2 ** (job.attempts - 1)))
+                    self._retry_tasks.add(task)
+                    task.add_done_callback(self._retry_tasks.discard)
+            else:
+                self._finish(job, "succeeded", result=result, error=None)
+            finally:
+                self.running -= 1
+                queue.task_done()
+
+    async def join(self):
+        """Kuyruktaki ve yeniden denenmeyi bekleyen tüm işler bitene kadar bekler."""
+        while any(not job.done for job in self._jobs.values()):
+            await asyncio.sleep(0.01)
+
+    async def aclose(self):
+        """Çalışan görevleri durdurur; bitmemiş işler kuyrukta kalır."""
+        tasks = self._tasks + list(self._retry_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        """Kuyruk uzunluğu, çalışan iş sayısı ve sayaçları döndürür."""
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead_letter": len(self.dead_letter),
+            "tracked_jobs": len(self._jobs),
+        }
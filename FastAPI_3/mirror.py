@@ -0,0 +1,75 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+
+class MetadataMirror:
+    """Open Library'den alınan ham kitap verilerinin yerel, kalıcı kopyası (SQLite).
+
+    Başarılı her sorgunun sonucu yazılır; Open Library'ye ulaşılamadığında
+    (ör. devre kesici açıkken) veri buradan, eski olabileceği bilinerek
+    sunulur. İşlemler olay döngüsünü bloklamamak için bir iş parçacığında
+    çalışır.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS metadata (
+            isbn TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(self.SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _get(self, isbn: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM metadata WHERE isbn = ?", (isbn,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def get(self, isbn: str) -> dict | None:
+        """ISBN'in en son kaydedilen verisini döndürür, yoksa None."""
+        data = await asyncio.to_thread(self._get, isbn)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def _put_many(self, items: dict[str, dict]):
+        now = time.time()
+        rows = [(isbn, json.dumps(data, ensure_ascii=False), now) for isbn, data in items.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metadata (isbn, data, fetched_at) VALUES (?, ?, ?)", rows)
+
+    async def put_many(self, items: dict[str, dict]):
+        """Verilen ISBN -> veri eşlemesini tek işlemde kaydeder."""
+        if items:
+            await asyncio.to_thread(self._put_many, items)
+            self.writes += len(items)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    async def stats(self) -> dict:
+        """Ayna istatistiklerini döndürür; kayıt sayısı bir iş parçacığında sayılır."""
+        return {"path": self.path, "size": await asyncio.to_thread(self.count), "hits": self.hits,
+                "misses": self.misses, "writes": self.writes}
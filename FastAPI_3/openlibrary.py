@@ -0,0 +1,351 @@
+import asyncio
+import importlib.util
+import os
+import time
+
+import httpx
+
+import sharedpath  # noqa: F401  (shared paketi için)
+from breaker import CircuitBreaker
+from cache import MISSING, SingleFlight, TTLCache
+from mirror import MetadataMirror
+from shared.metrics import REGISTRY
+
+OPEN_LIBRARY_BASE_URL = "https://openlibrary.org"
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "openlibrary_request_duration_seconds", "Open Library /api/books isteklerinin süresi (sn)", ("outcome",))
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "openlibrary_errors_total", "Başarısız Open Library istekleri", ("kind",))
+
+
+def _env_int(name: str, default: int) -> int:
+    """Ortam değişkenini tam sayı olarak okur, yoksa varsayılanı döndürür."""
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Ortam değişkenini ondalıklı sayı olarak okur, yoksa varsayılanı döndürür."""
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Ortam değişkenini mantıksal değer olarak okur ("1", "true", "yes")."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class OpenLibrarySettings:
+    """Open Library istemcisinin bağlantı havuzu ve zaman aşımı ayarları."""
+
+    def __init__(
+        self,
+        base_url: str = OPEN_LIBRARY_BASE_URL,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 10.0,
+        write_timeout: float = 5.0,
+        pool_timeout: float = 5.0,
+        cache_size: int = 10_000,
+        cache_ttl: float = 86_400.0,
+        negative_cache_ttl: float = 300.0,
+        batch_size: int = 50,
+        batch_concurrency: int = 8,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery_timeout: float = 30.0,
+        breaker_half_open_calls: int = 1,
+        mirror_path: str | None = None,
+    ):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.write_timeout = write_timeout
+        self.pool_timeout = pool_timeout
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.negative_cache_ttl = negative_cache_ttl
+        self.batch_size = batch_size
+        self.batch_concurrency = batch_concurrency
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_recovery_timeout = breaker_recovery_timeout
+        self.breaker_half_open_calls = breaker_half_open_calls
+        self.mirror_path = mirror_path
+
+    @classmethod
+    def from_env(cls) -> "OpenLibrarySettings":
+        """Ayarları OPENLIBRARY_* ortam değişkenlerinden oluşturur."""
+        return cls(
+            base_url=os.environ.get("OPENLIBRARY_BASE_URL", OPEN_LIBRARY_BASE_URL),
+            max_connections=_env_int("OPENLIBRARY_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=_env_int("OPENLIBRARY_MAX_KEEPALIVE", 20),
+            keepalive_expiry=_env_float("OPENLIBRARY_KEEPALIVE_EXPIRY", 30.0),
+            http2=_env_bool("OPENLIBRARY_HTTP2", True),
+            connect_timeout=_env_float("OPENLIBRARY_CONNECT_TIMEOUT", 5.0),
+            read_timeout=_env_float("OPENLIBRARY_READ_TIMEOUT", 10.0),
+            write_timeout=_env_float("OPENLIBRARY_WRITE_TIMEOUT", 5.0),
+            pool_timeout=_env_float("OPENLIBRARY_POOL_TIMEOUT", 5.0),
+            cache_size=_env_int("OPENLIBRARY_CACHE_SIZE", 10_000),
+            cache_ttl=_env_float("OPENLIBRARY_CACHE_TTL", 86_400.0),
+            negative_cache_ttl=_env_float("OPENLIBRARY_NEGATIVE_CACHE_TTL", 300.0),
+            batch_size=_env_int("OPENLIBRARY_BATCH_SIZE", 50),
+            batch_concurrency=_env_int("OPENLIBRARY_BATCH_CONCURRENCY", 8),
+            breaker_failure_threshold=_env_int("OPENLIBRARY_BREAKER_FAILURES", 5),
+            breaker_recovery_timeout=_env_float("OPENLIBRARY_BREAKER_RECOVERY", 30.0),
+            breaker_half_open_calls=_env_int("OPENLIBRARY_BREAKER_HALF_OPEN_CALLS", 1),
+            mirror_path=os.environ.get("OPENLIBRARY_MIRROR_PATH") or None,
+        )
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Devre kesici açık olduğu için Open Library'ye istek gönderilmediğini bildirir.
+
+    `httpx.RequestError` alt sınıfıdır; böylece ağ hatalarıyla aynı yoldan
+    (503, iş kuyruğunda yeniden deneme) ele alınır.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__("Open Library circuit breaker is open")
+        self.retry_after = retry_after
+
+
+def http2_available() -> bool:
+    """HTTP/2 için gereken `h2` paketinin kurulu olup olmadığını kontrol eder."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class OpenLibraryClient:
+    """Uygulama ömrü boyunca tek bir bağlantı havuzunu paylaşan Open Library istemcisi.
+
+    Her istekte yeni bir `httpx.AsyncClient` açmak DNS, TCP ve TLS kurulumunu
+    tekrarlar; bu sınıf istemciyi bir kez oluşturur ve bağlantıları canlı tutar.
+
+    İstekler bir devre kesiciden geçer: Open Library art arda hata verirse
+    istekler bir süre hiç gönderilmeden `CircuitOpenError` ile reddedilir.
+    Yerel ayna (`mirror_path`) tanımlıysa başarılı sonuçlar oraya yazılır ve
+    Open Library'ye ulaşılamadığında eski veri aynadan sunulur.
+    """
+
+    def __init__(self, settings: OpenLibrarySettings | None = None, mirror: MetadataMirror | None = None):
+        self.settings = settings or OpenLibrarySettings.from_env()
+        self._client: httpx.AsyncClient | None = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.saturated_requests = 0
+        self.cache = TTLCache(
+            maxsize=self.settings.cache_size,
+            ttl=self.settings.cache_ttl,
+            negative_ttl=self.settings.negative_cache_ttl,
+        )
+        self._single_flight = SingleFlight()
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.settings.breaker_failure_threshold,
+            recovery_timeout=self.settings.breaker_recovery_timeout,
+            half_open_max_calls=self.settings.breaker_half_open_calls,
+        )
+        if mirror is None and self.settings.mirror_path:
+            mirror = MetadataMirror(self.settings.mirror_path)
+        self.mirror = mirror
+        self.stale_served = 0
+
+    def _build_client(self) -> httpx.AsyncClient:
+        settings = self.settings
+        return httpx.AsyncClient(
+            base_url=settings.base_url,
+            http2=settings.http2 and http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.connect_timeout,
+                read=settings.read_timeout,
+                write=settings.write_timeout,
+                pool=settings.pool_timeout,
+            ),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Paylaşılan istemciyi döndürür; henüz başlatılmadıysa oluşturur."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def start(self):
+        """Uygulama açılışında (lifespan) paylaşılan istemciyi oluşturur."""
+        _ = self.client
+
+    async def aclose(self):
+        """Uygulama kapanışında havuzdaki bağlantıları ve yerel aynayı kapatır."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.mirror is not None:
+            await asyncio.to_thread(self.mirror.close)
+
+    async def fetch_books(self, bibkeys: list[str]) -> dict:
+        """`/api/books` uç noktasından verilen bibkey'lerin verisini getirir.
+
+        Dönen sözlüğün anahtarları "ISBN:<isbn>" biçimindedir. Ağ hataları
+        `httpx.RequestError` olarak çağırana iletilir; devre açıksa istek
+        gönderilmeden `CircuitOpenError` fırlatılır. Ağ hataları ve 5xx
+        yanıtlar devre kesicide hata sayılır.
+        """
+        if not self.breaker.allow():
+            UPSTREAM_ERRORS.inc(kind="circuit_open")
+            raise CircuitOpenError(self.breaker.retry_after())
+        params = {"bibkeys": ",".join(bibkeys), "format": "json", "jscmd": "data"}
+        client = self.client
+        self.total_requests += 1
+        if self.in_flight >= self.settings.max_connections:
+            # Havuz dolu: bu istek bağlantı beklemek zorunda kalacak
+            self.saturated_requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        healthy = None  # None: sonuç belirsiz (ör. istek iptal edildi)
+        outcome = "cancelled"
+        start = time.perf_counter()
+        try:
+            response = await client.get("/api/books", params=params)
+            response.raise_for_status()  # HTTP 4xx/5xx hatalarında exception fırlatır
+            healthy = True
+            outcome = "ok"
+            return response.json()
+        except httpx.HTTPStatusError as exc:
+            healthy = exc.response.status_code < 500  # 4xx Open Library'nin arızası değil
+            outcome = "client_error" if healthy else "server_error"
+            raise
+        except httpx.RequestError:
+            healthy = False
+            outcome = "network_error"
+            raise
+        finally:
+            self.in_flight -= 1
+            self.breaker.record(healthy)
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, outcome=outcome)
+            if outcome not in ("ok", "cancelled"):
+                UPSTREAM_ERRORS.inc(kind=outcome)
+
+    async def lookup_isbn(self, isbn: str) -> dict | None:
+        """Tek bir ISBN'in Open Library verisini döndürür, bulunamazsa None.
+
+        Sonuçlar (olumsuz olanlar dahil) önbelleğe alınır; aynı ISBN için
+        eşzamanlı gelen istekler tek bir Open Library çağrısını paylaşır.
+        Open Library'ye ulaşılamazsa veri yerel aynada varsa oradan döner.
+        """
+        cached = self.cache.get(isbn)
+        if cached is not MISSING:
+            return cached
+        try:
+            return await self._single_flight.do(isbn, lambda: self._fetch_and_cache(isbn))
+        except httpx.HTTPError:
+            stale = await self._from_mirror(isbn)
+            if stale is None:
+                raise
+            return stale
+
+    async def _fetch_and_cache(self, isbn: str) -> dict | None:
+        data = await self.fetch_books([f"ISBN:{isbn}"])
+        book_data = data.get(f"ISBN:{isbn}") or None
+        self.cache.set(isbn, book_data)
+        if book_data is not None:
+            await self._to_mirror({isbn: book_data})
+        return book_data
+
+    async def _from_mirror(self, isbn: str) -> dict | None:
+        """Aynadaki (eski olabilecek) veriyi döndürür; ayna yoksa veya veri yoksa None."""
+        if self.mirror is None:
+            return None
+        data = await self.mirror.get(isbn)
+        if data is not None:
+            self.stale_served += 1
+        return data
+
+    async def _to_mirror(self, items: dict[str, dict]):
+        if self.mirror is not None:
+            await self.mirror.put_many(items)
+
+    async def lookup_isbns(self, isbns: list[str]) -> dict[str, dict | None | Exception]:
+        """Birden çok ISBN'i çok-bibkey'li parça istekleriyle toplu olarak sorgular.
+
+        Önbellekte olmayan ISBN'ler `batch_size` büyüklüğünde parçalara ayrılır
+        ve parçalar en fazla `batch_concurrency` eşzamanlı istekle getirilir.
+        Her ISBN için veri sözlüğü, bulunamadıysa None, parçanın isteği
+        başarısız olduysa (ve ISBN aynada yoksa) ilgili istisna döner.
+        """
+        results: dict[str, dict | None | Exception] = {}
+        pending = []
+        for isbn in dict.fromkeys(isbns):  # Sırayı koruyarak tekrarları at
+            cached = self.cache.get(isbn)
+            if cached is MISSING:
+                pending.append(isbn)
+            else:
+                results[isbn] = cached
+
+        size = max(1, self.settings.batch_size)
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+        semaphore = asyncio.Semaphore(max(1, self.settings.batch_concurrency))
+
+        async def fetch_chunk(chunk: list[str]):
+            async with semaphore:
+                try:
+                    data = await self.fetch_books([f"ISBN:{isbn}" for isbn in chunk])
+                except httpx.HTTPError as exc:
+                    for isbn in chunk:
+                        stale = await self._from_mirror(isbn)
+                        results[isbn] = exc if stale is None else stale
+                    return
+            found = {}
+            for isbn in chunk:
+                book_data = data.get(f"ISBN:{isbn}") or None
+                self.cache.set(isbn, book_data)
+                results[isbn] = book_data
+                if book_data is not None:
+                    found[isbn] = book_data
+            await self._to_mirror(found)
+
+        await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        return results
+
+    async def stats(self) -> dict:
+        """Bağlantı havuzunun doluluk istatistiklerini döndürür."""
+        open_connections = idle_connections = None
+        if self._client is not None:
+            # httpx havuzu herkese açık bir API ile sunmuyor; httpcore havuzuna
+            # erişilebiliyorsa açık/boşta bağlantı sayılarını ekle
+            pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+            connections = getattr(pool, "connections", None)
+            if connections is not None:
+                open_connections = len(connections)
+                idle_connections = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "started": self._client is not None,
+            "http2": self.settings.http2 and http2_available(),
+            "max_connections": self.settings.max_connections,
+            "max_keepalive_connections": self.settings.max_keepalive_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "total_requests": self.total_requests,
+            "saturated_requests": self.saturated_requests,
+            "utilization": self.in_flight / self.settings.max_connections,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "coalesced_requests": self._single_flight.coalesced,
+            "cache": self.cache.stats(),
+            "breaker": self.breaker.stats(),
+            "mirror": await self.mirror.stats() if self.mirror is not None else None,
+            "stale_served": self.stale_served,
+        }
@@ -0,0 +1,458 @@
+import asyncio
+import bisect
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Type
+
+from pydantic import BaseModel
+
+import sharedpath  # noqa: F401  (shared paketi için)
+from shared.columnar import ColumnarTable
+from shared.metrics import REGISTRY
+from shared.normalize import canonical_key
+
+STORAGE_LATENCY = REGISTRY.histogram(
+    "library_storage_duration_seconds", "Kalıcı depo (SQLite) işlemlerinin süresi (sn)", ("operation",))
+
+
+class BookRepository(ABC):
+    """Kitapların saklandığı arka ucu soyutlayan depo arayüzü.
+
+    Tüm işlemler asenkrondur; böylece disk tabanlı arka uçlar olay döngüsünü
+    bloklamaz.
+
+    Her başarılı ekleme ve silme, depoya işlendiği anda artan bir sıra
+    numarasıyla değişiklik akışına yazılır (`changes_since`); en yeni
+    `retain_changes` değişiklik tutulur. `source` akışın kimliğidir: sıra
+    numaraları yalnızca aynı kimlik altında karşılaştırılabilir.
+    """
+
+    source: str
+
+    @abstractmethod
+    async def get(self, isbn: str) -> BaseModel | None:
+        """ISBN'e göre kitabı döndürür, yoksa None."""
+
+    @abstractmethod
+    async def contains(self, isbn: str) -> bool:
+        """Verilen ISBN'e sahip kitap var mı?"""
+
+    @abstractmethod
+    async def add(self, book: BaseModel) -> bool:
+        """Kitabı ekler; aynı ISBN zaten varsa eklemez ve False döndürür."""
+
+    @abstractmethod
+    async def add_many(self, books: List[BaseModel]) -> List[bool]:
+        """Kitapları tek işlemde ekler; her kitap için eklenip eklenmediğini döndürür."""
+
+    @abstractmethod
+    async def remove(self, isbn: str) -> bool:
+        """ISBN'e göre kitabı siler; kitap yoksa False döndürür."""
+
+    @abstractmethod
+    async def list_all(self) -> List[BaseModel]:
+        """Tüm kitapları döndürür."""
+
+    @abstractmethod
+    async def list_page(
+        self,
+        after: str | None = None,
+        limit: int | None = None,
+        author: str | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+    ) -> List[BaseModel]:
+        """ISBN'e göre sıralı, filtrelenmiş bir sayfa döndürür.
+
+        `after` verilirse yalnızca ISBN'i ondan büyük kitaplar döner (keyset
+        sayfalama). `author` harf duyarsız alt dize olarak, yıl sınırları
+        dahil olarak uygulanır.
+        """
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Kitap sayısını döndürür."""
+
+    @abstractmethod
+    async def changes_since(self, since: int, limit: int) -> tuple[List[dict], int, int]:
+        """Sıra numarası `since`'ten büyük en fazla `limit` değişikliği sırayla döndürür.
+
+        (değişiklikler, son sıra numarası, tutulan en eski sıra numarası)
+        döner; hiç değişiklik tutulmuyorsa en eski sıra numarası `son + 1`
+        olur. Değişiklikler `{"seq", "op": "add", "book"}` veya `{"seq", "op":
+        "remove", "isbn"}` biçimindedir.
+        """
+
+    async def close(self):
+        """Arka ucun kaynaklarını serbest bırakır."""
+
+
+class InMemoryRepository(BookRepository):
+    """Kitapları süreç içi bir sözlükte tutan depo (tek worker için).
+
+    Sözlük yerine bir `ColumnarTable` verilirse kitaplar sütunlu ve kompakt
+    biçimde tutulur, modeller yalnızca okunurken oluşturulur. Değişiklik
+    akışı da süreç içidir; kimliği her açılışta yenilenir.
+    """
+
+    def __init__(self, db: Dict[str, BaseModel] | ColumnarTable | None = None, retain_changes: int = 100_000):
+        self.db = db if db is not None else {}
+        # Kanonikleştirmeden önce doldurulmuş bir sözlük verildiyse anahtarları kanonik biçime taşı
+        for isbn in [isbn for isbn in self.db.keys() if canonical_key(isbn) != isbn]:
+            book = self.db.pop(isbn)
+            self.db.setdefault(canonical_key(isbn), book.model_copy(update={"isbn": canonical_key(isbn)}))
+        # Sayfalama için ISBN'lerin sıralı listesi; ilk ihtiyaçta oluşturulur
+        self._sorted_isbns: List[str] | None = None
+        # (sıra numarası, işlem, kitap veya ISBN); sıra numaraları ardışık olduğundan konum hesaplanabilir
+        self._changes: deque[tuple[int, str, Any]] = deque(maxlen=max(1, retain_changes))
+        self.sequence = 0
+        self.source = os.urandom(8).hex()
+
+    def _record(self, op: str, value: Any):
+        self.sequence += 1
+        self._changes.append((self.sequence, op, value))
+
+    def _isbn_index(self) -> List[str]:
+        """Sıralı ISBN listesini döndürür; sözlük dışarıdan değiştiyse yeniden kurar."""
+        if self._sorted_isbns is None or len(self._sorted_isbns) != len(self.db):
+            self._sorted_isbns = sorted(self.db)
+        return self._sorted_isbns
+
+    async def get(self, isbn: str) -> BaseModel | None:
+        return self.db.get(isbn)
+
+    async def contains(self, isbn: str) -> bool:
+        return isbn in self.db
+
+    async def add(self, book: BaseModel) -> bool:
+        if book.isbn in self.db:
+            return False
+        self.db[book.isbn] = book
+        if self._sorted_isbns is not None:
+            bisect.insort(self._sorted_isbns, book.isbn)
+        self._record("add", book)
+        return True
+
+    async def add_many(self, books: List[BaseModel]) -> List[bool]:
+        return [await self.add(book) for book in books]
+
+    async def remove(self, isbn: str) -> bool:
+        if self.db.pop(isbn, None) is None:
+            return False
+        if self._sorted_isbns is not None:
+            index = bisect.bisect_left(self._sorted_isbns, isbn)
+            if index < len(self._sorted_isbns) and self._sorted_isbns[index] == isbn:
+                del self._sorted_isbns[index]
+        self._record("remove", isbn)
+        return True
+
+    async def list_all(self) -> List[BaseModel]:
+        return list(self.db.values())
+
+    async def list_page(
+        self,
+        after: str | None = None,
+        limit: int | None = None,
+        author: str | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+    ) -> List[BaseModel]:
+        isbns = self._isbn_index()
+        start = 0 if after is None else bisect.bisect_right(isbns, after)
+        author = author.casefold() if author else None
+        page = []
+        for index in range(start, len(isbns)):
+            book = self.db.get(isbns[index])
+            if book is None:
+                continue
+            if author and author not in book.author.casefold():
+                continue
+            year = book.publication_year
+            if year_from is not None and (year is None or year < year_from):
+                continue
+            if year_to is not None and (year is None or year > year_to):
+                continue
+            page.append(book)
+            if limit is not None and len(page) >= limit:
+                break
+        return page
+
+    async def count(self) -> int:
+        return len(self.db)
+
+    async def changes_since(self, since: int, limit: int) -> tuple[List[dict], int, int]:
+        oldest = self._changes[0][0] if self._changes else self.sequence + 1
+        start = max(0, since + 1 - oldest)
+        changes = [
+            {"seq": seq, "op": op, "book": value.model_dump()} if op == "add" else {"seq": seq, "op": op, "isbn": value}
+            for seq, op, value in itertools.islice(self._changes, start, start + limit)
+        ]
+        return changes, self.sequence, oldest
+
+
+class SQLiteRepository(BookRepository):
+    """Kitapları WAL kipindeki bir SQLite veritabanında tutan depo.
+
+    Sorgular bir iş parçacığı havuzunda, her iş parçacığının kendi bağlantısı
+    üzerinden çalışır. WAL kipi okuyucuların yazanları beklememesini sağlar;
+    aynı dosyayı kullanan birden çok uvicorn worker'ı ortak durumu paylaşır.
+    `mmap_size` > 0 ise veritabanı dosyası belleğe eşlenerek okunur; sayfalar
+    işletim sisteminin sayfa önbelleğinden tüm worker'larca paylaşılır.
+    Değişiklik akışı `changes` tablosunda, kitap değişikliğiyle aynı işlemde
+    (transaction) tutulur; böylece tüm worker'lar tek bir sıra izler.
+    SQL metinleri sabit olduğundan sqlite3 modülü hazırlanmış ifadeleri
+    bağlantı başına önbellekte tutar.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS books (
+            isbn TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            publication_year INTEGER
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_books_author ON books (author)",
+        "CREATE INDEX IF NOT EXISTS idx_books_year ON books (publication_year)",
+        """
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            isbn TEXT NOT NULL,
+            title TEXT,
+            author TEXT,
+            publication_year INTEGER
+        )
+        """,
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    )
+    COLUMNS = ("isbn", "title", "author", "publication_year")
+    SELECT_ONE = "SELECT isbn, title, author, publication_year FROM books WHERE isbn = ?"
+    SELECT_ALL = "SELECT isbn, title, author, publication_year FROM books ORDER BY rowid"
+    EXISTS = "SELECT 1 FROM books WHERE isbn = ?"
+    INSERT = "INSERT OR IGNORE INTO books (isbn, title, author, publication_year) VALUES (?, ?, ?, ?)"
+    DELETE = "DELETE FROM books WHERE isbn = ?"
+    COUNT = "SELECT COUNT(*) FROM books"
+    INSERT_CHANGE = "INSERT INTO changes (op, isbn, title, author, publication_year) VALUES (?, ?, ?, ?, ?)"
+    SELECT_CHANGES = ("SELECT seq, op, isbn, title, author, publication_year FROM changes "
+                      "WHERE seq > ? ORDER BY seq LIMIT ?")
+    LATEST_CHANGE = "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+    OLDEST_CHANGE = "SELECT MIN(seq) FROM changes"
+    TRIM_CHANGES = "DELETE FROM changes WHERE seq <= ?"
+    # Akış her bu kadar değişiklikte bir `retain_changes` sınırına kısaltılır
+    TRIM_EVERY = 1000
+
+    def __init__(self, path: str, model: Type[BaseModel], max_workers: int = 4, mmap_size: int = 0,
+                 retain_changes: int = 100_000):
+        self.path = path
+        self.model = model
+        self.mmap_size = mmap_size
+        self.retain_changes = max(1, retain_changes)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqlite")
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                had_changes = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'changes'").fetchone()
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+                if not had_changes and conn.execute(self.COUNT).fetchone()[0]:
+                    # Akıştan önce eklenmiş kitaplar: sıra numarasını 1'e ilerlet ki
+                    # since=0 ile gelen replikalar eksik akış yerine tam katalog alsın
+                    seq = conn.execute(self.INSERT_CHANGE, ("baseline", "", None, None, None)).lastrowid
+                    conn.execute(self.TRIM_CHANGES, (seq,))
+                self._canonicalize_keys(conn)
+                conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('source', ?)", (os.urandom(8).hex(),))
+                self.source = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()[0]
+        finally:
+            conn.close()
+
+    # 13 haneden oluşmayan anahtarlar; kanonik olanlar tarama sırasında SQLite içinde elenir
+    NON_CANONICAL = "SELECT isbn FROM books WHERE length(isbn) != 13 OR isbn GLOB '*[^0-9]*'"
+    RENAME = "UPDATE books SET isbn = ? WHERE isbn = ?"
+
+    def _canonicalize_keys(self, conn: sqlite3.Connection):
+        """Kanonikleştirmeden önce yazılmış ISBN anahtarlarını kanonik biçime taşır.
+
+        Açılışta, şema ile aynı işlemde çalışır. Taşıma akışa silme + ekleme
+        olarak yazılır ki replikalar da eski anahtarı bıraksın; kanonik biçimi
+        zaten olan bir kitabın eski kopyası yalnızca silinir.
+        """
+        for (isbn,) in conn.execute(self.NON_CANONICAL).fetchall():
+            canonical = canonical_key(isbn)
+            if canonical == isbn:
+                continue  # Geçersiz ISBN; olduğu gibi kalır
+            if conn.execute(self.EXISTS, (canonical,)).fetchone():
+                conn.execute(self.DELETE, (isbn,))
+            else:
+                conn.execute(self.RENAME, (canonical, isbn))
+                row = conn.execute(self.SELECT_ONE, (canonical,)).fetchone()
+                self._log_change(conn, "add", row)
+            self._log_change(conn, "remove", (isbn, None, None, None))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, cached_statements=256, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL ile güvenli ve daha hızlı
+        conn.execute("PRAGMA busy_timeout=30000")
+        if self.mmap_size:
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """Çağıran iş parçacığına ait bağlantıyı döndürür, yoksa açar."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _run(self, operation: str, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """`fn`'i iş parçacığı havuzunda çalıştırır; süresi (kuyruk beklemesi dahil) ölçülür."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._executor, lambda: fn(self._connection()))
+        finally:
+            STORAGE_LATENCY.observe(time.perf_counter() - start, operation=operation)
+
+    def _to_model(self, row: tuple) -> BaseModel:
+        return self.model(**dict(zip(self.COLUMNS, row)))
+
+    @staticmethod
+    def _params(book: BaseModel) -> tuple:
+        return (book.isbn, book.title, book.author, book.publication_year)
+
+    def _log_change(self, conn: sqlite3.Connection, op: str, params: tuple):
+        """Değişikliği, çağıranın açtığı işlem içinde akışa yazar ve gerekirse akışı kısaltır."""
+        seq = conn.execute(self.INSERT_CHANGE, (op, *params)).lastrowid
+        if seq % self.TRIM_EVERY == 0:
+            conn.execute(self.TRIM_CHANGES, (seq - self.retain_changes,))
+
+    async def get(self, isbn: str) -> BaseModel | None:
+        row = await self._run("get", lambda conn: conn.execute(self.SELECT_ONE, (isbn,)).fetchone())
+        return self._to_model(row) if row else None
+
+    async def contains(self, isbn: str) -> bool:
+        row = await self._run("contains", lambda conn: conn.execute(self.EXISTS, (isbn,)).fetchone())
+        return row is not None
+
+    async def add(self, book: BaseModel) -> bool:
+        def insert(conn: sqlite3.Connection) -> bool:
+            with conn:
+                return self._insert(conn, book)
+        return await self._run("add", insert)
+
+    def _insert(self, conn: sqlite3.Connection, book: BaseModel) -> bool:
+        params = self._params(book)
+        if conn.execute(self.INSERT, params).rowcount != 1:
+            return False
+        self._log_change(conn, "add", params)
+        return True
+
+    async def add_many(self, books: List[BaseModel]) -> List[bool]:
+        def insert_many(conn: sqlite3.Connection) -> List[bool]:
+            with conn:
+                return [self._insert(conn, book) for book in books]
+        return await self._run("add_many", insert_many)
+
+    async def remove(self, isbn: str) -> bool:
+        def delete(conn: sqlite3.Connection) -> bool:
+            with conn:
+                if conn.execute(self.DELETE, (isbn,)).rowcount != 1:
+                    return False
+                self._log_change(conn, "remove", (isbn, None, None, None))
+                return True
+        return await self._run("remove", delete)
+
+    async def list_all(self) -> List[BaseModel]:
+        rows = await self._run("list_all", lambda conn: conn.execute(self.SELECT_ALL).fetchall())
+        return [self._to_model(row) for row in rows]
+
+    async def list_page(
+        self,
+        after: str | None = None,
+        limit: int | None = None,
+        author: str | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+    ) -> List[BaseModel]:
+        conditions, params = [], []
+        if after is not None:
+            conditions.append("isbn > ?")
+            params.append(after)
+        if author:
+            conditions.append("instr(lower(author), lower(?)) > 0")
+            params.append(author)
+        if year_from is not None:
+            conditions.append("publication_year >= ?")
+            params.append(year_from)
+        if year_to is not None:
+            conditions.append("publication_year <= ?")
+            params.append(year_to)
+        sql = "SELECT isbn, title, author, publication_year FROM books"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY isbn"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = await self._run("list_page", lambda conn: conn.execute(sql, params).fetchall())
+        return [self._to_model(row) for row in rows]
+
+    async def count(self) -> int:
+        row = await self._run("count", lambda conn: conn.execute(self.COUNT).fetchone())
+        return row[0]
+
+    async def changes_since(self, since: int, limit: int) -> tuple[List[dict], int, int]:
+        def read(conn: sqlite3.Connection) -> tuple[List[dict], int, int]:
+            latest = conn.execute(self.LATEST_CHANGE).fetchone()
+            latest = latest[0] if latest else 0
+            oldest = conn.execute(self.OLDEST_CHANGE).fetchone()[0]
+            changes = []
+            for seq, op, isbn, *fields in conn.execute(self.SELECT_CHANGES, (since, limit)):
+                if op == "add":
+                    changes.append({"seq": seq, "op": op, "book": dict(zip(self.COLUMNS, (isbn, *fields)))})
+                else:
+                    changes.append({"seq": seq, "op": op, "isbn": isbn})
+            return changes, latest, latest + 1 if oldest is None else oldest
+        return await self._run("changes_since", read)
+
+    async def close(self):
+        self._executor.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def create_repository(model: Type[BaseModel], memory_db: Dict[str, BaseModel] | None = None) -> BookRepository:
+    """LIBRARY_BACKEND ortam değişkenine göre depo oluşturur.
+
+    "memory" (varsayılan) süreç içi sözlüğü, "compact" süreç içi sütunlu
+    tabloyu, "sqlite" ise LIBRARY_DB_PATH (varsayılan "library.db") dosyasını
+    kullanır; LIBRARY_DB_MMAP_SIZE baytına kadarı belleğe eşlenir. Değişiklik
+    akışında en yeni LIBRARY_CHANGES_RETAIN (varsayılan 100000) değişiklik
+    tutulur.
+    """
+    backend = os.environ.get("LIBRARY_BACKEND", "memory").strip().lower()
+    retain_changes = int(os.environ.get("LIBRARY_CHANGES_RETAIN", "100000"))
+    if backend == "memory":
+        return InMemoryRepository(memory_db, retain_changes=retain_changes)
+    if backend == "compact":
+        return InMemoryRepository(ColumnarTable(model), retain_changes=retain_changes)
+    if backend == "sqlite":
+        return SQLiteRepository(os.environ.get("LIBRARY_DB_PATH", "library.db"), model,
+                                mmap_size=int(os.environ.get("LIBRARY_DB_MMAP_SIZE", str(256 * 1024 * 1024))),
+                                retain_changes=retain_changes)
+    raise ValueError(f"Unknown LIBRARY_BACKEND: {backend}")
@@ -0,0 +1,48 @@
+from typing import Iterable
+
+from pydantic import BaseModel
+
+
+class BookEncoder:
+    """Book modellerini JSON baytlarına çeviren, kitap başına önbellekli kodlayıcı.
+
+    Zaten doğrulanmış modeller Pydantic'in yerel (Rust) serileştiricisiyle
+    doğrudan baytlara çevrilir; `jsonable_encoder` ve `response_model`
+    üzerinden tekrar doğrulama yapılmaz. Her kitabın kodlanmış hali ISBN'e
+    göre saklanır ve kitap eklenip silindiğinde `invalidate` ile geçersiz
+    kılınmalıdır.
+    """
+
+    def __init__(self, maxsize: int = 1_000_000):
+        self.maxsize = maxsize
+        self._cache: dict[str, bytes] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def encode_book(self, book: BaseModel) -> bytes:
+        """Tek bir kitabı JSON baytlarına çevirir (önbellekten veya yeniden)."""
+        data = self._cache.get(book.isbn)
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = book.__pydantic_serializer__.to_json(book)
+        if len(self._cache) < self.maxsize:
+            self._cache[book.isbn] = data
+        return data
+
+    def encode_books(self, books: Iterable[BaseModel]) -> bytes:
+        """Kitap listesini tek bir JSON dizisi olarak kodlar."""
+        return b"[" + b",".join([self.encode_book(book) for book in books]) + b"]"
+
+    def invalidate(self, isbn: str):
+        """Değişen kitabın önbellekteki kodlanmış halini siler."""
+        self._cache.pop(isbn, None)
+
+    def clear(self):
+        """Tüm kodlanmış kitapları önbellekten siler."""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Önbellek boyutu ve isabet sayaçlarını döndürür."""
+        return {"size": len(self._cache), "hits": self.hits, "misses": self.misses}
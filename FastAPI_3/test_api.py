@@ -1,10 +1,15 @@
+import asyncio
+import json
+import time
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
 
 # Testleri çalıştırmadan önce api.py'nin import edilebilir olduğundan emin olun.
 # Bu dosyanın api.py ile aynı dizinde olduğunu varsayıyoruz.
-from api import app, library_db
+from api import app, library, library_db, open_library, Book
+from repository import SQLiteRepository
+from shared.normalize import canonical_isbn
 
 client = TestClient(app)
 
@@ -12,6 +17,9 @@ client = TestClient(app)
 def clear_db_before_each_test():
     """Her testten önce veritabanını temizler."""
     library_db.clear()
+    open_library.cache.clear()
+    open_library.breaker.reset()
+    library.invalidate_caches()
     yield # test çalışır
 
 
@@ -28,7 +36,7 @@ async def test_create_book_success(mock_get):
     mock_response = Mock()
     mock_response.status_code = 200
     mock_response.json.return_value = {
-        f"ISBN:{isbn}": {
+        f"ISBN:{canonical_isbn(isbn)}": {
             "title": "Effective C++",
             "authors": [{"name": "Scott Meyers"}],
             "publish_date": "2005"
@@ -47,22 +55,33 @@ async def test_create_book_success(mock_get):
     # Yanıtı kontrol et
     assert response.status_code == 201
     data = response.json()
-    assert data["isbn"] == isbn
+    assert data["isbn"] == canonical_isbn(isbn)
     assert data["title"] == "Effective C++"
     assert data["author"] == "Scott Meyers"
     assert data["publication_year"] == 2005
     
     # Veritabanını kontrol et
     assert len(library_db) == 1
-    assert library_db[isbn].title == "Effective C++"
+    assert library_db[canonical_isbn(isbn)].title == "Effective C++"
 
 def test_create_book_already_exists():
     # Önce bir kitap ekleyelim
-    isbn = "12345"
+    isbn = "9780134494166"
     library_db[isbn] = Mock(isbn=isbn, title="Existing Book")
 
     response = client.post("/books", json={"isbn": isbn})
     assert response.status_code == 409 # Conflict
+    # Aynı kitabın ISBN-10 ve tireli yazımları da aynı kitaptır
+    assert client.post("/books", json={"isbn": "0-13-449416-4"}).status_code == 409
+    assert client.post("/books", json={"isbn": "978-0134494166"}).status_code == 409
+
+def test_create_book_invalid_isbn():
+    for isbn in ("978-0134494167", "12345"):
+        response = client.post("/books", json={"isbn": isbn})
+        assert response.status_code == 422
+        assert "Invalid ISBN" in response.text
+    assert client.post("/books?mode=async", json={"isbn": "12345"}).status_code == 422
+    assert len(library_db) == 0
 
 @patch('api.httpx.AsyncClient.get')
 async def test_delete_book(mock_get):
@@ -72,7 +91,7 @@ async def test_delete_book(mock_get):
     mock_response = Mock()
     mock_response.status_code = 200
     mock_response.json.return_value = {
-        f"ISBN:{isbn}": {
+        f"ISBN:{canonical_isbn(isbn)}": {
             "title": "Effective C++",
             "authors": [{"name": "Scott Meyers"}],
             "publish_date": "2005"
@@ -96,3 +115,777 @@ async def test_delete_book(mock_get):
 def test_delete_book_not_found():
     response = client.delete("/books/non-existent-isbn")
     assert response.status_code == 404
+
+def _isbn(n: int) -> str:
+    """Testlerde kullanılan, kontrol hanesi doğru n'inci ISBN-13."""
+    core = f"978{n:09d}"
+    return core + str(-sum(int(digit) * (3 if index % 2 else 1) for index, digit in enumerate(core)) % 10)
+
+def _open_library_response(isbn: str, title: str = "Effective C++") -> Mock:
+    """Open Library'nin /api/books yanıtını taklit eden Mock nesnesi."""
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {
+        f"ISBN:{canonical_isbn(isbn) or isbn}": {
+            "title": title,
+            "authors": [{"name": "Scott Meyers"}],
+            "publish_date": "2005"
+        }
+    }
+    return mock_response
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_create_book_reuses_shared_client(mock_get):
+    mock_get.side_effect = lambda *args, **kwargs: _open_library_response(kwargs["params"]["bibkeys"][5:])
+
+    assert client.post("/books", json={"isbn": _isbn(111)}).status_code == 201
+    shared_client = open_library.client
+    assert client.post("/books", json={"isbn": _isbn(222)}).status_code == 201
+
+    # İki istek de aynı havuzlanmış istemciyi kullanmalı
+    assert open_library.client is shared_client
+    assert mock_get.await_count == 2
+    assert mock_get.call_args.kwargs["params"]["bibkeys"] == f"ISBN:{_isbn(222)}"
+
+def test_openlibrary_stats():
+    response = client.get("/stats/openlibrary")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["max_connections"] == open_library.settings.max_connections
+    assert data["in_flight"] == 0
+    assert "saturated_requests" in data
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_readd_after_delete_uses_cache(mock_get):
+    isbn = "978-0134494166"
+    mock_get.return_value = _open_library_response(isbn)
+
+    assert client.post("/books", json={"isbn": isbn}).status_code == 201
+    assert client.delete(f"/books/{isbn}").status_code == 204
+    assert client.post("/books", json={"isbn": isbn}).status_code == 201
+
+    # İkinci ekleme önbellekten karşılanmalı
+    assert mock_get.await_count == 1
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_not_found_is_cached(mock_get):
+    mock_response = Mock()
+    mock_response.json.return_value = {}
+    mock_get.return_value = mock_response
+
+    assert client.post("/books", json={"isbn": _isbn(0)}).status_code == 404
+    assert client.post("/books", json={"isbn": _isbn(0)}).status_code == 404
+
+    assert mock_get.await_count == 1
+    assert client.get("/stats/openlibrary").json()["cache"]["negative_hits"] >= 1
+
+def test_concurrent_lookups_are_coalesced():
+    isbn = "978-0321765723"
+    calls = 0
+
+    async def slow_get(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return _open_library_response(isbn)
+
+    async def lookup_many():
+        return await asyncio.gather(*(open_library.lookup_isbn(isbn) for _ in range(10)))
+
+    with patch('api.httpx.AsyncClient.get', side_effect=slow_get):
+        results = asyncio.run(lookup_many())
+
+    assert calls == 1
+    assert all(result["title"] == "Effective C++" for result in results)
+
+def test_single_flight_leader_cancelled():
+    """İşi yürüten çağıran iptal edilince bekleyenler CancelledError almamalı; iş yeniden çalıştırılmalı."""
+    from cache import SingleFlight
+
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def scenario():
+        leader = asyncio.create_task(single_flight.do("key", slow))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(single_flight.do("key", slow)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        # İlk bekleyen işi yeniden başlatır, diğerleri onun sonucunu paylaşır
+        assert await asyncio.gather(*waiters) == [2, 2, 2]
+        assert calls == 2 and single_flight.coalesced == 3
+
+    asyncio.run(scenario())
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_create_books_batch(mock_get, monkeypatch):
+    monkeypatch.setattr(open_library.settings, "batch_size", 2)
+
+    def chunk_response(*args, **kwargs):
+        bibkeys = kwargs["params"]["bibkeys"].split(",")
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            key: {"title": f"Title {key}", "authors": [{"name": "Author"}], "publish_date": "2001"}
+            for key in bibkeys if key != f"ISBN:{_isbn(404)}"
+        }
+        return mock_response
+    mock_get.side_effect = chunk_response
+    library_db[_isbn(5)] = Mock(isbn=_isbn(5))
+    hyphenated = f"978-{_isbn(1)[3:]}"
+
+    response = client.post("/books/batch", json={"isbns": [
+        _isbn(1), _isbn(2), _isbn(404), hyphenated, _isbn(5), "978-0134494167", _isbn(3),
+    ]})
+
+    assert response.status_code == 200
+    statuses = {item["isbn"]: item["status"] for item in response.json()}
+    assert statuses == {_isbn(1): "added", _isbn(2): "added", _isbn(404): "not_found", _isbn(5): "exists",
+                        "978-0134494167": "error", _isbn(3): "added"}
+    assert response.json()[4]["detail"] == "Invalid ISBN: '978-0134494167'"
+    # 4 yeni ISBN, 2'şerli parçalar halinde 2 istekte çekilmeli
+    assert mock_get.await_count == 2
+    assert library_db[_isbn(3)].publication_year == 2001
+
+@pytest.fixture
+def sqlite_repository(tmp_path, monkeypatch):
+    """Kütüphaneyi geçici bir SQLite veritabanı ile çalıştırır."""
+    repository = SQLiteRepository(str(tmp_path / "library.db"), Book)
+    monkeypatch.setattr(library, "repository", repository)
+    yield repository
+    asyncio.run(repository.close())
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_sqlite_backend_crud(mock_get, sqlite_repository):
+    isbn = "978-0134494166"
+    mock_get.return_value = _open_library_response(isbn)
+
+    assert client.post("/books", json={"isbn": isbn}).status_code == 201
+    assert client.post("/books", json={"isbn": isbn}).status_code == 409
+    assert client.get("/books").json() == [
+        {"isbn": "9780134494166", "title": "Effective C++", "author": "Scott Meyers", "publication_year": 2005}
+    ]
+    # In-memory sözlük kullanılmamalı
+    assert len(library_db) == 0
+
+    assert client.delete(f"/books/{isbn}").status_code == 204
+    assert client.get("/books").json() == []
+
+def test_sqlite_backend_is_shared_between_instances(sqlite_repository):
+    """Aynı dosyayı kullanan iki depo (ör. iki worker) aynı veriyi görmeli."""
+    other = SQLiteRepository(sqlite_repository.path, Book)
+
+    async def scenario():
+        book = Book(isbn="1", title="Shared", author="Author", publication_year=2001)
+        assert await sqlite_repository.add(book) is True
+        assert await other.add(book) is False
+        assert (await other.get("1")).title == "Shared"
+        assert await other.count() == 1
+        await other.close()
+
+    asyncio.run(scenario())
+
+def _seed_books():
+    """Sayfalama testleri için kütüphaneye örnek kitaplar ekler."""
+    for i, (author, year) in enumerate([
+        ("Orhan Pamuk", 1998), ("Yaşar Kemal", 1955), ("Orhan Pamuk", 2002),
+        ("Sabahattin Ali", 1943), ("Orhan Pamuk", 2008),
+    ]):
+        isbn = f"97800000000{i}"
+        library_db[isbn] = Book(isbn=isbn, title=f"Book {i}", author=author, publication_year=year)
+
+def test_get_books_cursor_pagination():
+    _seed_books()
+
+    first = client.get("/books", params={"limit": 2})
+    assert [book["isbn"] for book in first.json()] == ["978000000000", "978000000001"]
+    cursor = first.headers["X-Next-Cursor"]
+    assert 'rel="next"' in first.headers["Link"]
+
+    second = client.get("/books", params={"limit": 2, "cursor": cursor})
+    assert [book["isbn"] for book in second.json()] == ["978000000002", "978000000003"]
+
+    last = client.get("/books", params={"limit": 2, "cursor": second.headers["X-Next-Cursor"]})
+    assert [book["isbn"] for book in last.json()] == ["978000000004"]
+    assert "X-Next-Cursor" not in last.headers
+
+def test_get_books_filters_and_fields():
+    _seed_books()
+
+    response = client.get("/books", params={"author": "orhan", "year_from": 2000, "fields": "isbn,publication_year"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"isbn": "978000000002", "publication_year": 2002},
+        {"isbn": "978000000004", "publication_year": 2008},
+    ]
+
+    assert client.get("/books", params={"fields": "isbn,price"}).status_code == 400
+
+def test_get_books_ndjson_stream(monkeypatch):
+    _seed_books()
+    # Akışın birden çok sayfaya bölündüğünü de sına
+    original_iter_books = library.iter_books
+    monkeypatch.setattr(library, "iter_books", lambda **kwargs: original_iter_books(page_size=2, **kwargs))
+
+    response = client.get("/books", params={"format": "ndjson", "year_to": 2005, "fields": "isbn"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"isbn": "978000000000"}, {"isbn": "978000000001"}, {"isbn": "978000000002"}, {"isbn": "978000000003"}]
+
+    # limit ile yalnızca bir sayfa akıtılır; sonraki sayfa imleci başlıkta döner
+    pages, params = [], {"format": "ndjson", "limit": 2}
+    while True:
+        response = client.get("/books", params=params)
+        pages.append([json.loads(line)["isbn"] for line in response.text.splitlines()])
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert pages == [["978000000000", "978000000001"], ["978000000002", "978000000003"], ["978000000004"]]
+
+def test_sqlite_backend_pagination(sqlite_repository):
+    books = [Book(isbn=str(i), title=f"Book {i}", author="Orhan Pamuk" if i % 2 else "Other", publication_year=2000 + i)
+             for i in range(6)]
+    asyncio.run(sqlite_repository.add_many(books))
+
+    page = asyncio.run(sqlite_repository.list_page(after="1", limit=2, author="PAMUK"))
+    assert [book.isbn for book in page] == ["3", "5"]
+    page = asyncio.run(sqlite_repository.list_page(year_from=2002, year_to=2003))
+    assert [book.isbn for book in page] == ["2", "3"]
+
+def test_fast_json_mode(monkeypatch):
+    monkeypatch.setattr(library, "fast_json", True)
+    _seed_books()
+
+    default = client.get("/books", params={"limit": 2})
+    assert default.headers["content-type"] == "application/json"
+    assert default.headers["X-Next-Cursor"] == "978000000001"
+    assert [book["isbn"] for book in default.json()] == ["978000000000", "978000000001"]
+
+    # İkinci istek kodlanmış baytları önbellekten almalı
+    hits = library.encoder.hits
+    again = client.get("/books", params={"limit": 2})
+    assert again.content == default.content
+    assert library.encoder.hits == hits + 2
+
+    # Silinen kitabın baytları önbellekten düşmeli
+    assert client.delete("/books/978000000000").status_code == 204
+    assert [book["isbn"] for book in client.get("/books").json()] == [
+        "978000000001", "978000000002", "978000000003", "978000000004"
+    ]
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_search_books(mock_get):
+    _seed_books()
+    library_db["978000000001"] = Book(isbn="978000000001", title="İnce Memed", author="Yaşar Kemal", publication_year=1955)
+
+    response = client.get("/books/search", params={"q": "INCE memed"})
+    assert response.status_code == 200
+    assert [book["isbn"] for book in response.json()] == ["978000000001"]
+    assert response.json()[0]["score"] > 0
+
+    # Türkçe karakter duyarsız ve önek eşleşmesi
+    assert [book["isbn"] for book in client.get("/books/search", params={"q": "yasar"}).json()] == ["978000000001"]
+    assert len(client.get("/books/search", params={"q": "pam"}).json()) == 3
+
+    # İndeks ekleme ve silmelerle birlikte güncellenmeli
+    mock_get.return_value = _open_library_response(_isbn(555), title="Kar")
+    client.post("/books", json={"isbn": _isbn(555)})
+    assert [book["isbn"] for book in client.get("/books/search", params={"q": "kar"}).json()] == [_isbn(555)]
+    client.delete("/books/978000000001")
+    assert client.get("/books/search", params={"q": "memed"}).json() == []
+
+def test_compact_backend(monkeypatch):
+    from shared.columnar import ColumnarTable
+    from repository import InMemoryRepository
+
+    monkeypatch.setattr(library, "repository", InMemoryRepository(ColumnarTable(Book)))
+    asyncio.run(library.repository.add_many([
+        Book(isbn="2", title="B", author="Author", publication_year=2001),
+        Book(isbn="1", title="A", author="Author"),
+    ]))
+
+    assert client.get("/books", params={"limit": 1}).json() == [
+        {"isbn": "1", "title": "A", "author": "Author", "publication_year": None}
+    ]
+    assert client.delete("/books/2").status_code == 204
+    assert len(client.get("/books").json()) == 1
+
+def _wait_for_job(test_client: TestClient, job_id: str) -> dict:
+    """İş tamamlanana kadar GET /jobs/{id} ile durumunu sorgular."""
+    for _ in range(200):
+        job = test_client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_async_create_book_job(mock_get):
+    isbn = "978-0134494166"
+    mock_get.return_value = _open_library_response(isbn)
+
+    # Lifespan'in çalışması ve tek olay döngüsü için TestClient bağlam yöneticisi olarak kullanılır
+    with TestClient(app) as test_client:
+        response = test_client.post("/books?mode=async", json={"isbn": isbn})
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] in ("queued", "running", "succeeded")
+        assert response.headers["Location"] == f"/jobs/{job['id']}"
+
+        job = _wait_for_job(test_client, job["id"])
+        assert job["status"] == "succeeded"
+        assert job["result"]["title"] == "Effective C++"
+        assert canonical_isbn(isbn) in library_db
+
+        # Kalıcı hata (zaten var) yeniden denenmez ve ölü mektup listesine girmez
+        job = _wait_for_job(test_client, test_client.post("/books?mode=async", json={"isbn": isbn}).json()["id"])
+        assert (job["status"], job["status_code"], job["attempts"]) == ("failed", 409, 1)
+        assert test_client.get("/jobs/unknown").status_code == 404
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_async_job_dead_letter(mock_get, monkeypatch):
+    import httpx
+    from api import jobs
+
+    monkeypatch.setattr(jobs, "retry_delay", 0)
+    monkeypatch.setattr(jobs, "max_attempts", 2)
+    mock_get.side_effect = httpx.ConnectError("connection refused")
+
+    with TestClient(app) as test_client:
+        job_id = test_client.post("/books?mode=async", json={"isbn": _isbn(555)}).json()["id"]
+        job = _wait_for_job(test_client, job_id)
+        assert (job["status"], job["attempts"]) == ("dead", 2)
+        assert "Open Library" in job["error"]
+        assert job_id in [job["id"] for job in test_client.get("/jobs/dead-letter").json()]
+        assert test_client.get("/stats/jobs").json()["retried"] >= 1
+    assert mock_get.await_count == 2
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_circuit_breaker_fails_fast_and_recovers(mock_get, monkeypatch):
+    import httpx
+    from breaker import CircuitBreaker
+
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30, clock=lambda: now[0])
+    monkeypatch.setattr(open_library, "breaker", breaker)
+    mock_get.side_effect = httpx.ConnectError("connection refused")
+
+    assert client.post("/books", json={"isbn": _isbn(777)}).status_code == 503
+    assert client.post("/books", json={"isbn": _isbn(777)}).status_code == 503
+    # Devre açıldı: istek Open Library'ye gönderilmeden reddedilir
+    response = client.post("/books", json={"isbn": _isbn(777)})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+    assert mock_get.await_count == 2
+    stats = client.get("/stats/openlibrary").json()["breaker"]
+    assert (stats["state"], stats["state_code"], stats["rejected"]) == ("open", 2, 1)
+
+    # Bekleme süresi dolunca tek bir deneme isteği geçer ve devre kapanır
+    now[0] = 31
+    mock_get.side_effect = None
+    mock_get.return_value = _open_library_response(_isbn(777))
+    assert client.post("/books", json={"isbn": _isbn(777)}).status_code == 201
+    assert breaker.state == "closed"
+    assert mock_get.await_count == 3
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_stale_metadata_served_from_mirror(mock_get, tmp_path, monkeypatch):
+    import httpx
+    from mirror import MetadataMirror
+
+    mirror = MetadataMirror(str(tmp_path / "mirror.db"))
+    monkeypatch.setattr(open_library, "mirror", mirror)
+    monkeypatch.setattr(open_library, "stale_served", 0)
+    isbn = "978-0201633610"
+    mock_get.return_value = _open_library_response(isbn, title="Design Patterns")
+
+    assert client.post("/books", json={"isbn": isbn}).status_code == 201
+    assert client.delete(f"/books/{isbn}").status_code == 204
+    open_library.cache.clear()
+
+    # Open Library erişilemez; veri aynadan sunulur
+    mock_get.side_effect = httpx.ConnectError("connection refused")
+    response = client.post("/books", json={"isbn": isbn})
+    assert response.status_code == 201
+    assert response.json()["title"] == "Design Patterns"
+    stats = client.get("/stats/openlibrary").json()
+    assert stats["stale_served"] == 1
+    assert stats["mirror"]["size"] == 1
+    # Aynada olmayan ISBN için hata iletilir
+    assert client.post("/books", json={"isbn": _isbn(0)}).status_code == 503
+    mirror.close()
+
+def test_client_close_closes_mirror(tmp_path):
+    import sqlite3
+    from openlibrary import OpenLibraryClient, OpenLibrarySettings
+
+    open_library_client = OpenLibraryClient(OpenLibrarySettings(mirror_path=str(tmp_path / "mirror.db")))
+    asyncio.run(open_library_client.aclose())
+    with pytest.raises(sqlite3.ProgrammingError):
+        open_library_client.mirror.count()
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_metrics_endpoint(mock_get):
+    from shared.metrics import REGISTRY
+
+    requests_total = REGISTRY.get("http_requests_total")
+    upstream = REGISTRY.get("openlibrary_request_duration_seconds")
+    created_before = requests_total.value(method="POST", route="/books", status="201")
+    upstream_before = upstream.count(outcome="ok")
+    mock_get.return_value = _open_library_response(_isbn(888))
+
+    assert client.post("/books", json={"isbn": _isbn(888)}).status_code == 201
+    assert client.get("/jobs/unknown").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert requests_total.value(method="POST", route="/books", status="201") == created_before + 1
+    # Etiket olarak gerçek yol değil rota şablonu kullanılır
+    assert 'http_request_duration_seconds_count{method="GET",route="/jobs/{job_id}"}' in text
+    assert upstream.count(outcome="ok") == upstream_before + 1
+    assert "library_books 1.0" in text
+    assert "openlibrary_circuit_state 0.0" in text
+    assert 'openlibrary_cache_lookups_total{result="misses"}' in text
+
+def test_profile_header(tmp_path, monkeypatch):
+    import pstats
+    from api import profiler
+
+    assert "x-profile-file" not in client.get("/books", headers={"X-Profile": "1"}).headers
+
+    monkeypatch.setattr(profiler, "directory", str(tmp_path))
+    assert "x-profile-file" not in client.get("/books").headers
+    response = client.get("/books", headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    profile_file = tmp_path / response.headers["x-profile-file"]
+    assert profile_file.exists()
+    assert pstats.Stats(str(profile_file)).total_calls > 0
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_books_conditional_get(mock_get, monkeypatch):
+    _seed_books()
+    calls = []
+    original_get_books = library.get_books
+    monkeypatch.setattr(library, "get_books", lambda *args, **kwargs: calls.append(args) or original_get_books(*args, **kwargs))
+
+    first = client.get("/books")
+    etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+    assert len(first.json()) == 5
+    # Değişiklik yoksa tam liste önbellekten gelir ve koşullu istek 304 alır
+    assert client.get("/books").content == first.content
+    assert len(calls) == 1
+    not_modified = client.get("/books", headers={"If-None-Match": etag})
+    assert (not_modified.status_code, not_modified.content) == (304, b"")
+    assert not_modified.headers["ETag"] == etag
+    assert client.get("/books", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/books", params={"limit": 2}, headers={"If-None-Match": f'"x", W/{etag}'}).status_code == 304
+
+    # Ekleme sürümü artırır: eski ETag artık eşleşmez ve liste yeniden kodlanır
+    mock_get.return_value = _open_library_response(_isbn(9))
+    assert client.post("/books", json={"isbn": _isbn(9)}).status_code == 201
+    changed = client.get("/books", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 6
+    assert len(calls) == 2
+
+def test_get_book_etag():
+    _seed_books()
+
+    response = client.get("/books/978000000002")
+    assert response.status_code == 200
+    assert response.json()["author"] == "Orhan Pamuk"
+    etag = response.headers["ETag"]
+    assert client.get("/books/978000000002", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/books/978000000003").headers["ETag"] != etag
+    assert client.get("/books/unknown").status_code == 404
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_concurrent_add_remove_same_isbn(mock_get, sqlite_repository):
+    """Aynı ISBN için eşzamanlı ekleme/silmeler sıraya girmeli; arama indeksi depoyla tutarlı kalmalı."""
+    isbn = _isbn(777)
+    mock_get.return_value = _open_library_response(isbn, title="Kuyucaklı Yusuf")
+
+    async def scenario():
+        await library.search_books("yusuf")  # İndeksi kur
+        operations = [library.add_book_by_isbn(isbn), library.remove_book(isbn)] * 3
+        operations.append(library.add_book_by_isbn(isbn))
+        results = await asyncio.gather(*operations, return_exceptions=True)
+        assert not any(isinstance(result, Exception) for result in results)
+        assert len(library._isbn_locks) == 0
+        assert await sqlite_repository.contains(isbn)
+        assert [book.isbn for book in await library.search_books("yusuf")] == [isbn]
+
+    asyncio.run(scenario())
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_shared_catalog_across_workers(mock_get, tmp_path):
+    """Aynı SQLite dosyasını ve sürüm dosyasını kullanan iki worker birbirinin değişikliklerini görmeli."""
+    import subprocess
+    import sys
+    from api import Library
+    from versionfile import SharedVersion
+
+    db_path, version_path = str(tmp_path / "library.db"), str(tmp_path / "library.db.version")
+    first, second = (Library(open_library, SQLiteRepository(db_path, Book), shared=SharedVersion(version_path))
+                     for _ in range(2))
+    kar = _isbn(555)
+    mock_get.return_value = _open_library_response(kar, title="Kar")
+
+    async def scenario():
+        assert first.etag == second.etag
+        assert await second.search_books("kar") == []  # İkinci worker'ın indeksi ve önbelleği dolar
+        assert json.loads(await second.get_collection_bytes()) == []
+
+        await first.add_book_by_isbn(kar)
+        assert [book.isbn for book in await second.search_books("kar")] == [kar]
+        assert [book["isbn"] for book in json.loads(await second.get_collection_bytes())] == [kar]
+        assert second.etag == first.etag
+
+        # Başka bir süreçteki değişiklik de görülmeli
+        assert [book.isbn for book in await first.search_books("kar")] == [kar]
+        subprocess.run([sys.executable, "-c", f"from versionfile import SharedVersion; SharedVersion({version_path!r}).bump()"],
+                       check=True)
+        before = first.etag
+        first.refresh()
+        assert first.etag != before and first._search_index is None
+
+        for worker in (first, second):
+            await worker.repository.close()
+            worker.shared.close()
+
+    asyncio.run(scenario())
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_change_feed(mock_get, sqlite_repository):
+    """GET /changes yalnızca verilen sıra numarasından sonraki değişiklikleri sıkıştırılmış olarak döndürmeli."""
+    from api import Library
+    from repository import InMemoryRepository
+
+    kar = _isbn(555)
+    mock_get.return_value = _open_library_response(kar, title="Kar")
+    assert client.post("/books", json={"isbn": kar}).status_code == 201
+    assert client.delete(f"/books/{kar}").status_code == 204
+    assert client.post("/books", json={"isbn": kar}).status_code == 201
+
+    response = client.get("/changes", params={"limit": 2}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    batch = response.json()
+    assert [(change["seq"], change["op"]) for change in batch["changes"]] == [(1, "add"), (2, "remove")]
+    assert (batch["sequence"], batch["latest"], batch["reset"]) == (2, 3, False)
+    assert batch["source"] == sqlite_repository.source
+
+    replica = Library(open_library, InMemoryRepository(retain_changes=2))
+
+    async def scenario():
+        assert await replica.apply_changes(batch) == 0  # Kitap partide eklenip silindi
+        rest = client.get("/changes", params={"since": batch["sequence"]}).json()
+        assert [change["seq"] for change in rest["changes"]] == [3]
+        assert await replica.apply_changes(rest) == 1
+        assert await replica.apply_changes(rest) == 0
+        assert (await replica.get_book(kar)).title == "Kar"
+        assert client.get("/changes", params={"since": 3}).json()["changes"] == []
+
+        # Replikanın kısaltılmış akışından eski bir sıra numarası istenirse tam katalog döner
+        await replica.apply_changes({"changes": [{"op": "add", "book": {"isbn": str(i), "title": "T", "author": "A"}}
+                                                 for i in range(3)]})
+        full = await replica.changes_since(0)
+        assert full["reset"] and full["sequence"] == 4
+        assert sorted(change["book"]["isbn"] for change in full["changes"]) == ["0", "1", "2", kar]
+
+        # Tam katalog `limit` kitaplık sayfalara bölünür; uygulayan taraf yalnızca sayfanın aralığını temizler
+        other = Library(open_library, InMemoryRepository())
+        await other.apply_changes({"changes": [{"op": "add", "book": {"isbn": isbn, "title": "Eski", "author": "A"}}
+                                               for isbn in ("00", "10", "99")]})
+        pages = [await replica.changes_since(0, limit=2)]
+        while pages[-1]["cursor"] is not None:
+            pages.append(await replica.changes_since(pages[-1]["sequence"], limit=2, cursor=pages[-1]["cursor"]))
+        assert [[change["book"]["isbn"] for change in page["changes"]] for page in pages] == [["0", "1"], ["2", kar]]
+        assert [page["sequence"] for page in pages] == [4, 4]
+        assert await other.apply_changes(pages[0]) == 3  # "00" silinir; "10" ve "99" sonraki sayfanın aralığında
+        assert (await other.get_book("10")) is not None
+        assert await other.apply_changes(pages[1]) == 4
+        assert [book.isbn for book in await other.get_books()] == ["0", "1", "2", kar]
+
+        await library.apply_changes({"changes": [{"op": "add", "book": {"isbn": "0", "title": "T", "author": "A"}}]})
+        first = client.get("/changes", params={"since": -1, "limit": 1}).json()
+        assert (first["reset"], first["sequence"], first["cursor"]) == (True, 4, "0")
+        rest = client.get("/changes", params={"since": first["sequence"], "limit": 1, "cursor": first["cursor"]}).json()
+        assert [change["book"]["isbn"] for change in rest["changes"]] == [kar]
+        assert (rest["after"], rest["cursor"], rest["sequence"]) == ("0", None, 4)
+
+    asyncio.run(scenario())
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_publish_date_and_author_normalization(mock_get):
+    """"c1999" veya "2005-03-01" gibi tarihler 500 yerine yıla çevrilmeli; yazarlar sadeleştirilmeli."""
+    records = {
+        f"ISBN:{_isbn(1)}": {"title": " Kar ", "authors": [{"name": "Orhan  Pamuk"}, {"name": "orhan pamuk"}], "publish_date": "c1999"},
+        f"ISBN:{_isbn(2)}": {"title": "Tutunamayanlar", "authors": [{"name": "Oğuz Atay"}], "publish_date": "2005-03-01"},
+        f"ISBN:{_isbn(3)}": {"title": "Tarihsiz", "publish_date": "n.d."},
+    }
+
+    def respond(*args, **kwargs):
+        mock_response = Mock()
+        mock_response.json.return_value = {key: records[key] for key in kwargs["params"]["bibkeys"].split(",")}
+        return mock_response
+    mock_get.side_effect = respond
+
+    response = client.post("/books", json={"isbn": _isbn(1)})
+    assert response.status_code == 201
+    assert response.json() == {"isbn": _isbn(1), "title": "Kar", "author": "Orhan Pamuk", "publication_year": 1999}
+
+    response = client.post("/books/batch", json={"isbns": [_isbn(2), _isbn(3)]})
+    assert [item["book"]["publication_year"] for item in response.json()] == [2005, None]
+    assert library_db[_isbn(3)].author == ""
+
+def test_isbn_canonicalization():
+    from shared.normalize import is_valid_isbn, normalize_record
+
+    assert canonical_isbn("0-13-449416-4") == canonical_isbn("978-0134494166") == "9780134494166"
+    assert canonical_isbn("0 8044 2957 x") == "9780804429573"
+    assert not is_valid_isbn("978-0134494167")  # Hatalı kontrol hanesi
+    assert not is_valid_isbn("0134494166")
+    assert not is_valid_isbn("12345")
+
+    with pytest.raises(ValueError, match="Invalid ISBN"):
+        normalize_record("978-0134494167", {})
+    assert normalize_record("0-13-449416-4", {})["isbn"] == "9780134494166"
+
+@patch('api.httpx.AsyncClient.get', new_callable=AsyncMock)
+def test_legacy_hyphenated_isbns_are_canonicalized(mock_get, tmp_path, monkeypatch):
+    """Kanonikleştirmeden önce tireli yazılmış ISBN'ler her iki biçimle bulunup silinebilmeli."""
+    import sqlite3
+
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("CREATE TABLE books (isbn TEXT PRIMARY KEY, title TEXT NOT NULL, author TEXT NOT NULL, "
+                     "publication_year INTEGER)")
+        conn.executemany("INSERT INTO books VALUES (?, ?, ?, ?)", [
+            ("0-13-449416-4", "Clean Architecture", "Robert C. Martin", 2017),
+            ("978-0134685991", "Effective Java", "Joshua Bloch", 2018),
+            ("9780134685991", "Effective Java", "Joshua Bloch", 2018),
+            ("1", "Eski", "Yazar", None),
+        ])
+    conn.close()
+    repository = SQLiteRepository(db_path, Book)
+    monkeypatch.setattr(library, "repository", repository)
+    library.invalidate_caches()
+
+    assert sorted(book["isbn"] for book in client.get("/books").json()) == ["1", "9780134494166", "9780134685991"]
+    for isbn in ("0-13-449416-4", "9780134494166"):
+        assert client.get(f"/books/{isbn}").json()["title"] == "Clean Architecture"
+    assert client.post("/books", json={"isbn": "0134494164"}).status_code == 409
+    mock_get.assert_not_called()
+    assert client.delete("/books/0-13-449416-4").status_code == 204
+    assert client.get("/books/9780134494166").status_code == 404
+    # Taşıma akışa yazılır; replikalar eski anahtarları bırakır
+    changes = client.get("/changes", params={"since": 1}).json()["changes"]  # 1: eski kitapların taban kaydı
+    assert [(change["op"], change.get("isbn", change.get("book", {}).get("isbn"))) for change in changes] == [
+        ("add", "9780134494166"), ("remove", "0-13-449416-4"), ("remove", "978-0134685991"), ("remove", "9780134494166"),
+    ]
+    asyncio.run(repository.close())
+
+    legacy = {"0-13-449416-4": Book(isbn="0-13-449416-4", title="Clean Architecture", author="Robert C. Martin")}
+    from repository import InMemoryRepository
+    assert list(InMemoryRepository(legacy).db) == ["9780134494166"]
+    assert legacy["9780134494166"].isbn == "9780134494166"
+
+def test_response_compression(monkeypatch):
+    """Eşiği aşan yanıtlar gzip ile sıkıştırılmalı; değişmeyen koleksiyon yeniden sıkıştırılmamalı."""
+    import api
+
+    monkeypatch.setattr(api.compression, "encodings", ("gzip",))
+    monkeypatch.setattr(api.compression, "min_size", 200)
+    calls = []
+    original_compress = api.compression.compress
+    monkeypatch.setattr(api.compression, "compress", lambda data, encoding: calls.append(encoding) or original_compress(data, encoding))
+    _seed_books()
+    gzip_only = {"Accept-Encoding": "gzip"}
+
+    first = client.get("/books", headers=gzip_only)
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert first.headers["ETag"].startswith('W/"')
+    assert len(first.json()) == 5
+    # Değişmeyen koleksiyonun sıkıştırılmış hali önbellekten gelir
+    assert client.get("/books", headers=gzip_only).content == first.content
+    assert calls == ["gzip"]
+    assert client.get("/books", headers={**gzip_only, "If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    identity = client.get("/books", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["ETag"] == first.headers["ETag"][2:]
+    # Eşiğin altındaki gövdeler olduğu gibi gider
+    assert "content-encoding" not in client.get("/books/978000000002", headers=gzip_only).headers
+
+    # Akışlı yanıtlar ara katmanda parça parça sıkıştırılır
+    stream = client.get("/books", params={"format": "ndjson"}, headers=gzip_only)
+    assert stream.headers["content-encoding"] == "gzip"
+    assert len(stream.text.splitlines()) == 5
+
+    assert client.delete("/books/978000000000").status_code == 204
+    assert len(client.get("/books", headers=gzip_only).json()) == 4
+    assert calls == ["gzip", "gzip"]
+
+def test_compressed_collection_not_cached_across_changes(monkeypatch):
+    """Koleksiyon kodlanırken gelen değişiklik, eski gövdenin yeni sürümle sıkıştırılıp saklanmasına yol açmamalı."""
+    import gzip
+
+    _seed_books()
+    original_get_books = library.get_books
+
+    async def get_books_then_add(*args, **kwargs):
+        books = await original_get_books(*args, **kwargs)
+        # Katalog okunduktan sonra, sıkıştırma başlamadan başka bir istek kitap ekler
+        library_db["978000000009"] = Book(isbn="978000000009", title="Yeni", author="Yazar")
+        library._changed()
+        monkeypatch.setattr(library, "get_books", original_get_books)
+        return books
+    monkeypatch.setattr(library, "get_books", get_books_then_add)
+
+    async def scenario():
+        stale = await library.get_compressed_collection("gzip")
+        assert len(json.loads(gzip.decompress(stale))) == 5
+        fresh = await library.get_compressed_collection("gzip")
+        assert len(json.loads(gzip.decompress(fresh))) == 6
+        assert library._compressed["gzip"] == (library.version, fresh)
+
+    asyncio.run(scenario())
+
+def test_readiness_after_warm_up(monkeypatch):
+    """GET /ready katalog ısınması bitene kadar 503, sonra 200 dönmeli; ısınma ilk istekleri hızlandırmalı."""
+    _seed_books()
+    monkeypatch.setattr(library, "ready", False)
+    assert client.get("/ready").json() == {"status": "starting"}
+    assert client.get("/ready").status_code == 503
+
+    asyncio.run(library.warm_up())
+    assert client.get("/ready").status_code == 200
+    assert library._collection is not None and library._search_index is not None
+    results = client.get("/books/search", params={"q": "pamuk"}).json()
+    assert sorted(result["isbn"] for result in results) == ["978000000000", "978000000002", "978000000004"]
+
+def test_failed_warm_up_keeps_ready_503(monkeypatch):
+    """Isınma hatası görevden fırlatılmamalı; GET /ready hatayı 503 ile bildirmeli."""
+    async def failing(*args, **kwargs):
+        raise OSError("disk unavailable")
+
+    monkeypatch.setattr(library, "ready", False)
+    monkeypatch.setattr(library, "warm_up_error", None)
+    monkeypatch.setattr(library, "get_collection_bytes", failing)
+    asyncio.run(library.warm_up())
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "failed", "detail": "disk unavailable"}
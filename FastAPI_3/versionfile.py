@@ -0,0 +1,90 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası kilit yok, tek süreç için yeterli
+    fcntl = None
+
+# Katalog kimliği (8 bayt), sürüm, son değişiklik zamanı
+_LAYOUT = struct.Struct("<8sQd")
+_STATE = struct.Struct("<Qd")
+
+
+class SharedVersion:
+    """Aynı kataloğu paylaşan worker süreçleri arasında koleksiyon sürümünü taşıyan küçük dosya.
+
+    Dosya her süreçte belleğe eşlenir; sürümü okumak sistem çağrısı
+    gerektirmeyen bir bellek okumasıdır, bu yüzden her istekte yapılabilir.
+    Kataloğu değiştiren worker `bump()` ile sürümü dosya kilidi (flock)
+    altında artırır; diğer worker'lar bir sonraki okumada farkı görüp süreç
+    içi önbelleklerini sıfırlar. Dosya ilk oluşturulurken yazılan rastgele
+    katalog kimliği ETag'lere ön ek olur; dosya silinip yeniden oluşturulursa
+    eski ETag'ler yeni sürümlerle karışmaz.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            with self._locked():
+                if os.fstat(self._fd).st_size < _LAYOUT.size:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    os.write(self._fd, _LAYOUT.pack(os.urandom(8), 0, time.time()))
+            self._map = mmap.mmap(self._fd, _LAYOUT.size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self.id = self._map[:8].hex()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def read(self) -> tuple[int, float]:
+        """(sürüm, son değişiklik zamanı) döndürür.
+
+        Okuma kilitsizdir; eşzamanlı bir `bump()` yarısını görmemek için alan
+        art arda iki kez aynı okunana kadar tekrarlanır.
+        """
+        while True:
+            state = self._map[8:_LAYOUT.size]
+            if self._map[8:_LAYOUT.size] == state:
+                return _STATE.unpack(state)
+
+    def bump(self) -> tuple[int, int, float]:
+        """Sürümü bir artırır; (önceki sürüm, yeni sürüm, değişiklik zamanı) döndürür."""
+        with self._locked():
+            previous, _ = _STATE.unpack_from(self._map, 8)
+            modified = time.time()
+            _STATE.pack_into(self._map, 8, previous + 1, modified)
+            return previous, previous + 1, modified
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+def create_shared_version() -> SharedVersion | None:
+    """Worker'lar kataloğu paylaşıyorsa (LIBRARY_BACKEND=sqlite) sürüm dosyasını açar.
+
+    Dosya LIBRARY_VERSION_FILE ile verilir; varsayılanı veritabanının yanında
+    `<LIBRARY_DB_PATH>.version` dosyasıdır. Süreç içi arka uçlarda katalog
+    zaten paylaşılmadığından None döner.
+    """
+    if os.environ.get("LIBRARY_BACKEND", "memory").strip().lower() != "sqlite":
+        return None
+    path = os.environ.get("LIBRARY_VERSION_FILE") or os.environ.get("LIBRARY_DB_PATH", "library.db") + ".version"
+    return SharedVersion(path)
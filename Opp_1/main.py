@@ -1,8 +1,20 @@
-import json
 import os
+import threading
+
+import sharedpath  # noqa: F401  (shared paketi için)
+from shared.binsnap import BinarySnapshot, write_binary
+from shared.changefeed import in_reset_page, make_batch, reset_page, squash
+from shared.columnar import ColumnarTable
+from shared.concurrency import VersionLock
+from shared.journal import LibraryJournal, apply_record, write_snapshot
+from shared.jsonstream import LazyTable
+from shared.storage import BookStore
 
 class Book:
     """Her bir kitabı temsil eden sınıf."""
+    # __dict__ yerine sabit alanlar: kitap başına daha az bellek
+    __slots__ = ("title", "author", "isbn")
+
     def __init__(self, title: str, author: str, isbn: str):
         self.title = title
         self.author = author
@@ -20,66 +32,247 @@ class Book:
         }
 
 class Library:
-    """Kütüphane operasyonlarını yöneten sınıf."""
-    def __init__(self, filename: str = "library.json"):
+    """Kütüphane operasyonlarını yöneten sınıf.
+
+    Birden çok iş parçacığından kullanılabilir: ekleme ve silmeler tek bir
+    yazar kilidiyle sıraya girer, okumalar kilit almaz (`VersionLock`).
+    Listeleme ve kaydetme, değişiklik olana kadar paylaşılan değişmez bir
+    kopya üzerinden yapılır; kaydetme sırasında yazarlar beklemez.
+    """
+    def __init__(self, filename: str = "library.json", compact: bool = False, lazy: bool = False,
+                 binary: bool = False, background: bool = False):
         self.filename = filename
-        self.books = []
-        self.load_books()
+        # compact=True: kitaplar nesne yerine sütunlu tabloda tutulur (büyük kataloglar için)
+        self.compact = compact
+        # lazy=True: yalnızca ISBN -> dosya konumu indeksi tutulur, kitaplar erişildikçe okunur
+        self.lazy = lazy
+        # binary=True: anlık görüntü JSON yerine belleğe eşlenen ikili biçimde (shared/binsnap.py) tutulur
+        self.binary = binary
+        self._lock = VersionLock()
+        self.store = self._new_store()
+        self.journal = LibraryJournal(filename, writer=write_binary if binary else write_snapshot)
+        # background=True: katalog ayrı bir iş parçacığında okunur, açılış beklemez;
+        # kataloğa erişmeden önce `wait_ready()` çağrılmalıdır
+        self.ready = threading.Event()
+        self._load_error: BaseException | None = None
+        if background:
+            threading.Thread(target=self._load_in_background, name="library-load", daemon=True).start()
+        else:
+            self.load_books()
+            self.ready.set()
+
+    @property
+    def books(self) -> list[Book]:
+        """Kütüphanedeki kitapların eklenme sırasına göre listesi."""
+        return list(self._snapshot())
+
+    def _snapshot(self) -> tuple[Book, ...]:
+        """Kitapların değişmez kopyası; bir sonraki değişikliğe kadar okuyucular arasında paylaşılır."""
+        return self._lock.snapshot(lambda: tuple(self.store))
+
+    def _indexed_read(self, query):
+        """Yazar/metin sorgusunu kilitsiz yapar; tembel indeksler gerekirse önce kilit altında kurulur."""
+        if not self.store.indexed:
+            with self._lock.write():
+                self.store.ensure_indexes()
+        return self._lock.read(query)
+
+    def _new_store(self, books=()) -> BookStore:
+        """Kütüphanenin kipine göre (nesne veya sütunlu) boş/dolu bir depo oluşturur."""
+        table = ColumnarTable(Book, fields=("title", "author", "isbn")) if self.compact else None
+        return BookStore(books, table=table)
 
     def load_books(self):
-        """JSON dosyasından kitapları yükler."""
-        if os.path.exists(self.filename):
+        """JSON dosyasından kitapları yükler ve değişiklik günlüğünü üzerine uygular.
+
+        Dosya akış halinde, parça parça çözülür; bellek kullanımı dosya
+        boyutuyla değil kitap sayısıyla büyür. Tembel kipte kitaplar hiç
+        oluşturulmaz, yalnızca dosyadaki konumları indekslenir. İkili kipte
+        dosya yalnızca belleğe eşlenir; açılış süresi kitap sayısından
+        bağımsızdır.
+        """
+        if not self.journal.exists():
+            print(f"Bilgi: {self.filename} bulunamadı. Yeni bir kütüphane oluşturuluyor.")
+            return
+        with self._lock.write():
             try:
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    books_data = json.load(f)
-                    self.books = [Book(**data) for data in books_data]
-                    print(f"{len(self.books)} kitap {self.filename} dosyasından yüklendi.")
-            except (json.JSONDecodeError, TypeError):
+                self.store = self._load_store()
+            except (ValueError, TypeError, KeyError):  # JSONDecodeError ve UnicodeDecodeError da ValueError
                 print(f"Uyarı: {self.filename} dosyası okunamadı veya formatı bozuk.")
-                self.books = []
+                self.store = self._new_store()
+                return
+        if self.journal.recovering:
+            # Önceki sıkıştırma tamamlanamamış; şimdi bitir
+            self.save_books()
+        print(f"{len(self.store)} kitap {self.filename} dosyasından yüklendi.")
+
+    def _load_in_background(self):
+        try:
+            self.load_books()
+        except BaseException as exc:
+            self._load_error = exc
+        finally:
+            self.ready.set()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Arka planda yüklenen katalog hazır olana kadar bekler; zaman aşımında False döner.
+
+        Yükleme hata verdiyse hata burada yeniden fırlatılır; boş katalog
+        üzerinde çalışılıp dosyanın üzerine yazılmaz.
+        """
+        if not self.ready.wait(timeout):
+            return False
+        if self._load_error is not None:
+            raise self._load_error
+        return True
+
+    def _load_store(self) -> BookStore:
+        """Anlık görüntüyü ve günlüğü okuyarak yeni bir depo kurar."""
+        if self.binary:
+            # İkili anlık görüntü çözülmeden eşlenir; aramalar dosyadaki indeksten yapılır
+            table = BinarySnapshot(self.filename, Book) if os.path.exists(self.filename) else None
+            store = BookStore(table=table, lazy_indexes=True)
+        elif self.lazy:
+            table = LazyTable(Book)
+            if os.path.exists(self.filename):
+                table.load(self.filename)
+            store = BookStore(table=table, lazy_indexes=True)
         else:
-            print(f"Bilgi: {self.filename} bulunamadı. Yeni bir kütüphane oluşturuluyor.")
+            store = self._new_store(Book(**data) for _, _, data in self.journal.iter_snapshot())
+        for record in self.journal.replay():
+            apply_record(store, record, Book)
+        return store
 
     def save_books(self):
-        """Kütüphanedeki kitapları JSON dosyasına kaydeder."""
-        with open(self.filename, 'w', encoding='utf-8') as f:
-            json.dump([book.to_dict() for book in self.books], f, indent=4, ensure_ascii=False)
+        """Kütüphanedeki tüm kitapları JSON dosyasına kaydeder ve günlüğü sıfırlar.
+
+        Dosya geçici bir dosyaya yazılıp atomik olarak değiştirilir; yazarlar
+        kaydetme boyunca yeni günlüğe yazmaya devam eder.
+        """
+        self.journal.snapshot(lambda: [book.to_dict() for book in self._snapshot()])
+
+    def _log_change(self, record: dict):
+        """Tek bir değişikliği günlüğe ekler; günlük büyüdüyse arka planda sıkıştırır.
+
+        Yazar kilidi altında çağrılmalıdır.
+        """
+        self.journal.append(record)
+        if self.journal.needs_compaction:
+            self.journal.compact_in_background(list(self.store))
+
+    def close(self):
+        """Bekleyen değişiklikleri diske yazar ve tembel kipteki dosya eşlemesini kapatır."""
+        self.ready.wait()  # Arka plandaki yükleme bitmeden depo kapatılmaz
+        with self._lock.write():
+            self.journal.close()
+            self.store.close()
 
     def add_book(self, book: Book):
         """Yeni bir kitabı kütüphaneye ekler."""
-        if self.find_book(book.isbn):
+        with self._lock.write():
+            added = self.store.add(book)
+            if added:
+                self._log_change({"op": "add", "book": book.to_dict()})
+        if added:
+            print(f"'{book.title}' kütüphaneye eklendi.")
+        else:
             print(f"Hata: {book.isbn} ISBN numaralı kitap zaten mevcut.")
-            return
-        self.books.append(book)
-        self.save_books()
-        print(f"'{book.title}' kütüphaneye eklendi.")
 
     def remove_book(self, isbn: str):
         """ISBN'e göre bir kitabı siler."""
-        book_to_remove = self.find_book(isbn)
-        if book_to_remove:
-            self.books.remove(book_to_remove)
-            self.save_books()
+        with self._lock.write():
+            removed = self.store.remove(isbn) is not None
+            if removed:
+                self._log_change({"op": "remove", "isbn": isbn})
+        if removed:
             print(f"{isbn} ISBN numaralı kitap silindi.")
         else:
             print(f"Hata: {isbn} ISBN numaralı kitap bulunamadı.")
 
+    def changes_since(self, since: int = 0, limit: int | None = None, cursor: str | None = None) -> dict:
+        """`since` sıra numarasından sonraki ekleme ve silmeleri bir değişiklik partisi olarak döndürür.
+
+        Parti başka bir kütüphanenin `apply_changes` metoduna verilir; dosya
+        veya ağ üzerinden `changefeed.encode_batch` ile sıkıştırılarak taşınır.
+        İstenen değişiklikler artık tutulmuyorsa veya `since` negatifse parti
+        tüm kataloğu içerir ve `reset` True olur. Tam katalog ISBN sırasıyla
+        en fazla `limit` kitaplık sayfalara bölünür; sonraki sayfa partinin
+        `sequence` ve `cursor` değerleriyle istenir.
+        """
+        latest = self.journal.sequence
+        if cursor is None and 0 <= since <= latest:
+            changes, oldest = self.journal.changes_since(since, limit)
+            if since >= oldest - 1:
+                return make_batch(since, latest, changes)
+        # Katalog sıra numarasından sonra okunur; arada gelen değişiklikler sonraki partide tekrar gelir
+        books, next_cursor = reset_page(self._snapshot(), cursor, limit)
+        return make_batch(since, latest, [{"op": "add", "book": book.to_dict()} for book in books], reset=True,
+                          after=cursor, cursor=next_cursor)
+
+    def apply_changes(self, batch: dict) -> int:
+        """Başka bir kütüphaneden alınan değişiklik partisini uygular.
+
+        Değişiklikler ISBN bazında idempotenttir; aynı parti tekrar
+        uygulanabilir. Eklenen kitap farklı bilgilerle zaten varsa yenisiyle
+        değiştirilir, tam katalog partisinde (`reset`) sayfanın ISBN aralığında
+        olup partide olmayan kitaplar silinir. Değişiklikler bu kütüphanenin günlüğüne kendi sıra
+        numaralarıyla yazılır. Durumu değiştiren değişiklik sayısını döndürür.
+        """
+        fields = set(Book.__slots__)
+        applied = 0
+        with self._lock.write():
+            if batch.get("reset"):
+                keep = {change["book"]["isbn"] for change in batch["changes"] if change["op"] == "add"}
+                for book in list(self.store):
+                    if book.isbn not in keep and in_reset_page(batch, book.isbn):
+                        applied += self._apply_remove(book.isbn)
+            for change in squash(batch["changes"]):
+                if change["op"] == "add":
+                    data = {key: value for key, value in change["book"].items() if key in fields}
+                    applied += self._apply_add(Book(**data))
+                elif change["op"] == "remove":
+                    applied += self._apply_remove(change["isbn"])
+        self.journal.sync()
+        return applied
+
+    def _apply_add(self, book: Book) -> bool:
+        existing = self.store.get(book.isbn)
+        if existing is not None:
+            if existing.to_dict() == book.to_dict():
+                return False
+            self._apply_remove(book.isbn)
+        self.store.add(book)
+        self._log_change({"op": "add", "book": book.to_dict()})
+        return True
+
+    def _apply_remove(self, isbn: str) -> bool:
+        if self.store.remove(isbn) is None:
+            return False
+        self._log_change({"op": "remove", "isbn": isbn})
+        return True
+
     def list_books(self):
         """Kütüphanedeki tüm kitapları listeler."""
-        if not self.books:
+        books = self._snapshot()
+        if not books:
             print("Kütüphanede hiç kitap yok.")
             return
         print("--- Kütüphanedeki Kitaplar ---")
-        for book in self.books:
+        for book in books:
             print(book)
         print("---------------------------")
 
     def find_book(self, isbn: str) -> Book | None:
         """ISBN'e göre bir kitabı bulur."""
-        for book in self.books:
-            if book.isbn == isbn:
-                return book
-        return None
+        return self._lock.read(lambda: self.store.get(isbn))
+
+    def find_books_by_author(self, author: str) -> list[Book]:
+        """Yazar adına göre (harf duyarsız) kitapları bulur."""
+        return self._indexed_read(lambda: self.store.find_by_author(author))
+
+    def search_books(self, query: str, limit: int = 10) -> list[Book]:
+        """Başlık ve yazarda tam metin araması yapar (harf ve Türkçe karakter duyarsız)."""
+        return self._indexed_read(lambda: self.store.search(query, limit=limit))
 
 def main_menu(library: Library):
     """Kullanıcıya ana menüyü sunar ve işlemleri yönetir."""
@@ -89,9 +282,13 @@ def main_menu(library: Library):
         print("2. Kitap Sil")
         print("3. Kitapları Listele")
         print("4. Kitap Ara")
-        print("5. Çıkış")
+        print("5. Başlık/Yazar ile Ara")
+        print("6. Çıkış")
 
-        choice = input("Seçiminiz (1-5): ")
+        choice = input("Seçiminiz (1-6): ")
+        if not library.ready.is_set():
+            print("Katalog yükleniyor, lütfen bekleyin...")
+        library.wait_ready()
 
         if choice == '1':
             title = input("Kitap Başlığı: ")
@@ -115,11 +312,24 @@ def main_menu(library: Library):
             else:
                 print("Bu ISBN ile bir kitap bulunamadı.")
         elif choice == '5':
+            query = input("Aranacak başlık veya yazar: ")
+            books = library.search_books(query)
+            if books:
+                print(f"{len(books)} kitap bulundu:")
+                for book in books:
+                    print(book)
+            else:
+                print("Aramanızla eşleşen bir kitap bulunamadı.")
+        elif choice == '6':
             print("Çıkış yapılıyor...")
             break
         else:
-            print("Geçersiz seçim. Lütfen 1-5 arasında bir numara girin.")
+            print("Geçersiz seçim. Lütfen 1-6 arasında bir numara girin.")
 
 if __name__ == "__main__":
-    my_library = Library()
-    main_menu(my_library)
+    # LIBRARY_FAST_START=1: menü katalog yüklenmeden gösterilir, katalog arka planda okunur
+    my_library = Library(background=os.environ.get("LIBRARY_FAST_START", "").lower() in ("1", "true", "yes"))
+    try:
+        main_menu(my_library)
+    finally:
+        my_library.close()
@@ -0,0 +1,13 @@
+"""Aşama 1 kütüphanesini değişiklik akışıyla eşitleyen komut (bkz. `shared/sync.py`).
+
+Kullanım:
+    python sync.py export changes.json.gz --since 120 [--library library.json]
+    python sync.py import changes.json.gz [--library replica.json]
+    python sync.py pull http://127.0.0.1:8000 [--library replica.json] [--state replica.json.sync]
+"""
+import sharedpath  # noqa: F401  (shared paketi için)
+from main import Library
+from shared.sync import main
+
+if __name__ == "__main__":
+    main(Library)
@@ -2,21 +2,26 @@ import pytest
 import os
 from main import Book, Library
 
+def remove_library_files(filename: str):
+    """Kütüphane dosyasını, günlüğünü ve geçici dosyalarını siler."""
+    for path in (filename, filename + ".journal", filename + ".journal.old", filename + ".changes", filename + ".tmp"):
+        if os.path.exists(path):
+            os.remove(path)
+
 @pytest.fixture
 def library_fixture():
     """Her test için temiz bir Library nesnesi ve test dosyası oluşturur."""
     test_filename = "test_library.json"
-    # Test öncesi varsa eski test dosyasını sil
-    if os.path.exists(test_filename):
-        os.remove(test_filename)
+    # Test öncesi varsa eski test dosyasını (ve günlüklerini) sil
+    remove_library_files(test_filename)
     
     library = Library(filename=test_filename)
     
     yield library  # Testin çalışacağı nokta
     
     # Test sonrası test dosyasını temizle
-    if os.path.exists(test_filename):
-        os.remove(test_filename)
+    library.close()
+    remove_library_files(test_filename)
 
 def test_add_book(library_fixture: Library):
     book = Book("Test Title", "Test Author", "1234567890")
@@ -56,3 +61,255 @@ def test_persistence(library_fixture: Library):
     found_book = new_library.find_book("1010101010")
     assert found_book is not None
     assert found_book.author == "Author 1"
+
+def test_find_books_by_author(library_fixture: Library):
+    library_fixture.add_book(Book("Book A", "Orhan Pamuk", "1"))
+    library_fixture.add_book(Book("Book B", "Orhan Pamuk, Yaşar Kemal", "2"))
+    library_fixture.add_book(Book("Book C", "Yaşar Kemal", "3"))
+
+    assert [book.isbn for book in library_fixture.find_books_by_author("orhan pamuk")] == ["1", "2"]
+    assert [book.isbn for book in library_fixture.find_books_by_author("Yaşar Kemal")] == ["2", "3"]
+
+    # Silinen kitap ikincil indeksten de çıkmalı
+    library_fixture.remove_book("2")
+    assert [book.isbn for book in library_fixture.find_books_by_author("Orhan Pamuk")] == ["1"]
+
+def test_add_duplicate_book(library_fixture: Library):
+    library_fixture.add_book(Book("Original", "Author", "1234567890"))
+    library_fixture.add_book(Book("Duplicate", "Author", "1234567890"))
+    assert len(library_fixture.books) == 1
+    assert library_fixture.find_book("1234567890").title == "Original"
+
+def test_mutations_append_to_journal(library_fixture: Library):
+    """Ekleme/silme işlemlerinin tüm dosyayı değil yalnızca günlüğü yazdığını test eder."""
+    library_fixture.add_book(Book("Journal Book", "Author", "1"))
+    library_fixture.add_book(Book("Removed Book", "Author", "2"))
+    library_fixture.remove_book("2")
+
+    assert not os.path.exists(library_fixture.filename)
+    with open(library_fixture.journal.journal_path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+
+    new_library = Library(filename=library_fixture.filename)
+    assert [book.isbn for book in new_library.books] == ["1"]
+    new_library.close()
+
+def test_torn_journal_write_is_ignored(library_fixture: Library):
+    """Yarıda kesilmiş son günlük satırının kütüphaneyi bozmadığını test eder."""
+    library_fixture.add_book(Book("Safe Book", "Author", "1"))
+    library_fixture.close()
+    with open(library_fixture.journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op":"add","book":{"title":"Torn')
+
+    recovered = Library(filename=library_fixture.filename)
+    assert [book.isbn for book in recovered.books] == ["1"]
+
+    # Kesik satır temizlenmeli, yeni kayıtlar okunabilir kalmalı
+    recovered.add_book(Book("After Crash", "Author", "2"))
+    recovered.close()
+    assert len(Library(filename=library_fixture.filename).books) == 2
+
+def test_journal_compaction(library_fixture: Library):
+    """Günlük eşiği aşınca anlık görüntüye sıkıştırıldığını test eder."""
+    library_fixture.journal.compact_every = 3
+    for i in range(5):
+        library_fixture.add_book(Book(f"Book {i}", "Author", str(i)))
+    library_fixture.journal.wait()
+
+    assert os.path.exists(library_fixture.filename)
+    assert not os.path.exists(library_fixture.journal.rotated_path)
+    assert library_fixture.journal.entries == 2
+
+    new_library = Library(filename=library_fixture.filename)
+    assert [book.isbn for book in new_library.books] == ["0", "1", "2", "3", "4"]
+    new_library.close()
+
+def test_search_books(library_fixture: Library):
+    library_fixture.add_book(Book("İnce Memed", "Yaşar Kemal", "1"))
+    library_fixture.add_book(Book("Kürk Mantolu Madonna", "Sabahattin Ali", "2"))
+    library_fixture.add_book(Book("Istanbul: Memories and the City", "Orhan Pamuk", "3"))
+
+    assert [book.isbn for book in library_fixture.search_books("ince memed")] == ["1"]
+    assert [book.isbn for book in library_fixture.search_books("YASAR")] == ["1"]
+    assert [book.isbn for book in library_fixture.search_books("istanbul")] == ["3"]
+    assert [book.isbn for book in library_fixture.search_books("madona")] == ["2"]  # Bulanık eşleşme
+    assert [book.isbn for book in library_fixture.search_books("Kürk Man")] == ["2"]  # Önek eşleşmesi
+
+    library_fixture.remove_book("1")
+    assert library_fixture.search_books("memed") == []
+
+def test_compact_library(library_fixture: Library):
+    """Sütunlu (compact) kipte kitapların doğru saklanıp geri okunduğunu test eder."""
+    library_fixture.add_book(Book("Kept", "Author", "1"))
+    library_fixture.close()
+
+    compact = Library(filename=library_fixture.filename, compact=True)
+    compact.add_book(Book("İnce Memed", "Yaşar Kemal", "2"))
+    compact.add_book(Book("Removed", "Author", "3"))
+    compact.remove_book("3")
+
+    assert [book.title for book in compact.books] == ["Kept", "İnce Memed"]
+    assert compact.find_book("2").author == "Yaşar Kemal"
+    assert [book.isbn for book in compact.find_books_by_author("author")] == ["1"]
+    assert [book.isbn for book in compact.search_books("memed")] == ["2"]
+    compact.close()
+
+def test_lazy_library(library_fixture: Library):
+    """Tembel kipte kitapların dosyadan yalnızca erişildiğinde oluşturulduğunu test eder."""
+    library_fixture.add_book(Book("İnce Memed", "Yaşar Kemal", "1"))
+    library_fixture.add_book(Book("Kürk Mantolu Madonna", "Sabahattin Ali", "2"))
+    library_fixture.save_books()
+    library_fixture.add_book(Book("Journaled", "Author", "3"))
+    library_fixture.close()
+
+    lazy = Library(filename=library_fixture.filename, lazy=True)
+    assert lazy.store._by_isbn.materialized == 1  # Yalnızca günlükten gelen kitap bellekte
+    assert lazy.find_book("1").title == "İnce Memed"
+    assert [book.isbn for book in lazy.search_books("madonna")] == ["2"]
+    lazy.remove_book("1")
+    lazy.close()
+
+    reloaded = Library(filename=library_fixture.filename, lazy=True)
+    assert [book.isbn for book in reloaded.books] == ["2", "3"]
+    reloaded.close()
+
+def test_binary_library(library_fixture: Library, tmp_path):
+    """İkili anlık görüntü kipinde kitapların kaydedilip belleğe eşlenerek okunduğunu test eder."""
+    path = str(tmp_path / "library.bin")
+    library = Library(filename=path, binary=True)
+    library.add_book(Book("İnce Memed", "Yaşar Kemal", "2"))
+    library.add_book(Book("Kürk Mantolu Madonna", "Sabahattin Ali", "1"))
+    library.save_books()
+    library.close()
+
+    reopened = Library(filename=path, binary=True)
+    assert reopened.find_book("1").title == "Kürk Mantolu Madonna"
+    assert [book.isbn for book in reopened.search_books("memed")] == ["2"]
+    assert [book.to_dict() for book in reopened.books][0] == {"title": "İnce Memed", "author": "Yaşar Kemal", "isbn": "2"}
+    reopened.close()
+
+def test_concurrent_writers_and_readers(library_fixture: Library):
+    """Eşzamanlı ekleme/silme, okuma ve kaydetmelerden sonra bellekteki ve diskteki durumun tutarlı olduğunu test eder."""
+    import threading
+
+    library_fixture.journal.compact_every = 50
+    errors = []
+
+    def writer(offset: int):
+        for i in range(offset, offset + 200):
+            library_fixture.add_book(Book(f"Book {i}", f"Author {i % 7}", str(i)))
+            if i % 3 == 0:
+                library_fixture.remove_book(str(i))
+
+    def reader():
+        try:
+            for _ in range(200):
+                books = library_fixture.books
+                assert len({book.isbn for book in books}) == len(books)
+                library_fixture.find_book("1")
+                library_fixture.find_books_by_author("Author 1")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(offset,)) for offset in (0, 200, 400)]
+    threads += [threading.Thread(target=reader) for _ in range(3)]
+    threads.append(threading.Thread(target=library_fixture.save_books))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    expected = {str(i) for i in range(600) if i % 3}
+    assert {book.isbn for book in library_fixture.books} == expected
+    assert len(library_fixture.find_books_by_author("Author 1")) == sum(1 for i in range(600) if i % 3 and i % 7 == 1)
+    library_fixture.close()
+    assert {book.isbn for book in Library(filename=library_fixture.filename).books} == expected
+
+def test_change_feed_sync(library_fixture: Library, tmp_path):
+    """Değişiklik akışıyla başka bir kütüphaneye yalnızca yeni değişikliklerin aktarıldığını test eder."""
+    from shared.changefeed import decode_batch, encode_batch
+
+    library_fixture.journal.compact_every = 3
+    for i in range(5):
+        library_fixture.add_book(Book(f"Book {i}", "Author", str(i)))
+    library_fixture.remove_book("1")
+    library_fixture.journal.wait()
+
+    # Sıkıştırılıp anlık görüntüye işlenen kayıtlar da akışta kalmalı
+    batch = decode_batch(encode_batch(library_fixture.changes_since(0)))
+    assert [change["seq"] for change in batch["changes"]] == [1, 2, 3, 4, 5, 6]
+    assert batch["sequence"] == batch["latest"] == 6 and not batch["reset"]
+
+    replica = Library(filename=str(tmp_path / "replica.json"))
+    replica.add_book(Book("Only On Replica", "Author", "x"))
+    assert replica.apply_changes(batch) == 4  # "1" partide eklenip silindiği için hiç eklenmez
+    assert replica.apply_changes(batch) == 0  # Aynı parti tekrar uygulanabilir
+    assert [book.isbn for book in replica.books] == ["x", "0", "2", "3", "4"]
+
+    library_fixture.add_book(Book("Book 5", "Author", "5"))
+    delta = library_fixture.changes_since(batch["sequence"])
+    assert [(change["seq"], change["op"]) for change in delta["changes"]] == [(7, "add")]
+    assert replica.apply_changes(delta) == 1
+
+    # Tam katalog partisi kaynakta olmayan kitapları siler; sayfalar yalnızca kendi ISBN aralığını temizler
+    full = library_fixture.changes_since(-1, limit=3)
+    assert full["reset"] and (full["sequence"], full["cursor"]) == (7, "3")
+    assert [change["book"]["isbn"] for change in full["changes"]] == ["0", "2", "3"]
+    assert replica.apply_changes(full) == 0  # "x" sonraki sayfanın aralığında
+    rest = library_fixture.changes_since(full["sequence"], limit=3, cursor=full["cursor"])
+    assert (rest["sequence"], rest["after"], rest["cursor"]) == (7, "3", None)
+    assert replica.apply_changes(rest) == 1
+    assert [book.isbn for book in replica.books] == ["0", "2", "3", "4", "5"]
+    replica.close()
+
+    # Sıra numarası yeniden açılışta kaldığı yerden devam eder
+    library_fixture.save_books()
+    library_fixture.close()
+    reopened = Library(filename=library_fixture.filename)
+    assert reopened.journal.sequence == 7
+    reopened.remove_book("5")
+    assert [change["seq"] for change in reopened.changes_since(6)["changes"]] == [7, 8]
+    reopened.close()
+
+def test_change_feed_index_skips_archived_history(tmp_path, monkeypatch):
+    """Akıştan okuma `since`'e en yakın indeks noktasından başlamalı; yinelenen kayıtlar ayıklanmalı."""
+    import shared.journal
+    from shared.journal import LibraryJournal
+
+    journal = LibraryJournal(str(tmp_path / "feed.json"))
+    journal.INDEX_EVERY = 4
+    with open(journal.changes_path, "w", encoding="utf-8") as f:
+        for seq in [*range(1, 11), *range(7, 13)]:  # 7-10 çökme sonrası iki kez arşivlenmiş
+            f.write(f'{{"seq":{seq},"op":"remove","isbn":"{seq}"}}\n')
+    journal.sequence = 12
+
+    starts = []
+    iter_journal = shared.journal.iter_journal
+    monkeypatch.setattr(shared.journal, "iter_journal",
+                        lambda path, start=0: starts.append((path, start)) or iter_journal(path, start))
+    changes, oldest = journal.changes_since(9, limit=2)
+    assert [change["seq"] for change in changes] == [10, 11] and oldest == 1
+    assert starts[-1] == (journal.changes_path, journal._changes_index[2][1])  # 9 ve sonrası: üçüncü nokta
+    assert journal._indexed_end == os.path.getsize(journal.changes_path)
+
+    starts.clear()
+    assert [change["seq"] for change in journal.changes_since(0)[0]] == list(range(1, 13))
+    assert starts[0] == (journal.changes_path, journal._indexed_end)  # İndeks güncel; dosya yeniden okunmaz
+    assert [change["seq"] for change in journal.changes_since(12)[0]] == []
+
+def test_background_load(library_fixture: Library, tmp_path, monkeypatch):
+    for i in range(3):
+        library_fixture.add_book(Book(f"Book {i}", "Author", str(i)))
+    library_fixture.save_books()
+
+    loaded = Library(filename=library_fixture.filename, background=True)
+    assert loaded.wait_ready(timeout=5)
+    assert [book.isbn for book in loaded.books] == ["0", "1", "2"]
+    loaded.close()
+
+    # Yükleme hatası boş katalogla devam edilmesine değil, wait_ready'de hataya yol açar
+    monkeypatch.setattr(Library, "load_books", lambda self: 1 / 0)
+    broken = Library(filename=str(tmp_path / "broken.json"), background=True)
+    with pytest.raises(ZeroDivisionError):
+        broken.wait_ready(timeout=5)
@@ -0,0 +1,109 @@
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def use_stage(stage: str):
+    """Verilen aşamanın dizinini (ör. "FastAPI_3") ve ortak `shared` paketini import yoluna ekler."""
+    path = os.path.join(ROOT, stage)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    if ROOT not in sys.path:
+        sys.path.append(ROOT)
+
+
+def make_isbn(n: int, prefix: str = "979") -> str:
+    """`prefix` ile başlayan, kontrol hanesi doğru n'inci ISBN-13'ü üretir (ekleme yolları ISBN'i doğrular)."""
+    core = f"{prefix}{n:09d}"
+    return core + str(-sum(int(digit) * (3 if index % 2 else 1) for index, digit in enumerate(core)) % 10)
+
+
+@contextmanager
+def timed(results: dict, name: str, ops: int = 1):
+    """Bloğun süresini ölçüp `results[name]` içine saniye ve işlem/sn olarak yazar."""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    results[name] = {"seconds": elapsed, "ops_per_sec": ops / elapsed if elapsed else float("inf")}
+
+
+def print_table(title: str, rows: dict[str, dict]):
+    """Ölçüm sonuçlarını basit bir tablo olarak yazdırır."""
+    print(f"\n== {title} ==")
+    for name, row in rows.items():
+        print(f"{name:<40} {row['seconds'] * 1000:>10.2f} ms {row['ops_per_sec']:>14,.0f} ops/s")
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Sıralı olmayan örneklerin q. yüzdelik değerini (en yakın sıra yöntemi) döndürür."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def latency_summary(samples: list[float], elapsed: float | None = None) -> dict:
+    """Saniye cinsinden gecikme örneklerini ms cinsinden p50/p95/p99 ve verim olarak özetler.
+
+    `elapsed` verilmezse verim, örneklerin toplam süresinden (ardışık
+    çalıştırma varsayımıyla) hesaplanır.
+    """
+    total = elapsed if elapsed is not None else sum(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "ops_per_sec": len(samples) / total if total else float("inf"),
+    }
+
+
+def print_latency_table(title: str, rows: dict[str, dict]):
+    """`latency_summary` sonuçlarını tablo olarak yazdırır."""
+    print(f"\n== {title} ==")
+    print(f"{'':<32} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>14}")
+    for name, row in rows.items():
+        print(f"{name:<32} {row['p50_ms']:>10.3f} {row['p95_ms']:>10.3f} {row['p99_ms']:>10.3f} "
+              f"{row['ops_per_sec']:>14,.0f}")
+
+
+def git_commit() -> str | None:
+    """Deponun o anki commit kimliğini döndürür; git yoksa None."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(suite: str, results: dict, params: dict, path: str | None = None) -> str:
+    """Sonuçları commit ve ortam bilgisiyle birlikte JSON olarak kaydeder; dosya yolunu döndürür.
+
+    Yol verilmezse `benchmarks/results/<suite>-<kısa commit>.json` kullanılır.
+    İki sonuç dosyası `compare.py` ile karşılaştırılabilir.
+    """
+    commit = git_commit()
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{suite}-{(commit or 'nogit')[:10]}.json")
+    document = {
+        "suite": suite,
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    return path
@@ -0,0 +1,121 @@
+"""Yanıt sıkıştırmasında CPU ile aktarılan bayt arasındaki dengeyi ölçer.
+
+İki bölümden oluşur:
+
+- Kodlama/seviye tablosu: tüm koleksiyonun JSON'u her gzip seviyesi ve
+  (kuruluysa) brotli kalitesiyle sıkıştırılır; sıkıştırma süresi, çıkan
+  bayt, oran ve `--bandwidth-mbps` hızındaki bir bağlantıda tahmini aktarım
+  süresi yazdırılır. En iyi seviye, sıkıştırma + aktarım toplamı en küçük
+  olandır.
+- Süreç içi `GET /books`: sıkıştırmasız, her istekte yeniden sıkıştıran ve
+  sürüme göre önbellekten sunan yolların gecikmesi.
+
+Kullanım:
+    python benchmarks/bench_compression.py [--books 10000] [--repeat 20] [--requests 200] [--bandwidth-mbps 20]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from _common import latency_summary, print_latency_table, save_results, use_stage
+
+use_stage("FastAPI_3")
+
+from api import BOOK_LIST, Book, app, library, library_db  # noqa: E402
+from compression import CompressionSettings, brotli  # noqa: E402
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def codec_table(data: bytes, repeat: int, bandwidth_mbps: float) -> dict:
+    """Her kodlama ve seviye için sıkıştırma süresini ve çıkan baytı ölçer."""
+    variants = [("identity", None, 0)] + [("gzip", "gzip", level) for level in GZIP_LEVELS]
+    if brotli is not None:
+        variants += [("br", "br", quality) for quality in BROTLI_QUALITIES]
+    bytes_per_ms = bandwidth_mbps * 1_000_000 / 8 / 1000
+    results = {}
+    for label, encoding, level in variants:
+        settings = CompressionSettings(gzip_level=level or 6, brotli_quality=level or 4)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            body = settings.compress(data, encoding) if encoding else data
+        compress_ms = (time.perf_counter() - start) / repeat * 1000
+        transfer_ms = len(body) / bytes_per_ms
+        name = label if encoding is None else f"{label}-{level}"
+        results[name] = {
+            "compress_ms": compress_ms,
+            "bytes": len(body),
+            "ratio": len(data) / len(body),
+            "transfer_ms": transfer_ms,
+            "total_ms": compress_ms + transfer_ms,
+            "ops_per_sec": 1000 / compress_ms if compress_ms else float("inf"),
+        }
+    return results
+
+
+def print_codec_table(title: str, rows: dict[str, dict]):
+    print(f"\n== {title} ==")
+    print(f"{'':<12} {'sıkıştırma ms':>14} {'bayt':>12} {'oran':>7} {'aktarım ms':>11} {'toplam ms':>10}")
+    for name, row in rows.items():
+        print(f"{name:<12} {row['compress_ms']:>14.2f} {row['bytes']:>12,} {row['ratio']:>7.1f} "
+              f"{row['transfer_ms']:>11.2f} {row['total_ms']:>10.2f}")
+
+
+async def measure_http(requests: int, encoding: str) -> dict:
+    """GET /books gecikmesi: sıkıştırmasız, önbelleksiz sıkıştırma ve önbellekli sıkıştırma."""
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, accept, cached in (("identity", "identity", True),
+                                     (f"{encoding} (her istekte)", encoding, False),
+                                     (f"{encoding} (sürüm önbelleği)", encoding, True)):
+            await client.get("/books", headers={"Accept-Encoding": accept})  # Isınma
+            samples = []
+            for _ in range(requests):
+                if not cached:
+                    library._compressed.clear()
+                start = time.perf_counter()
+                response = await client.get("/books", headers={"Accept-Encoding": accept})
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+            results[name] = latency_summary(samples)
+            results[name]["bytes"] = int(response.headers["content-length"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20, help="Her seviye için sıkıştırma tekrarı")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--bandwidth-mbps", type=float, default=20.0, help="Aktarım tahmini için bağlantı hızı")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/compression-<commit>.json)")
+    args = parser.parse_args()
+
+    library_db.clear()
+    for i in range(args.books):
+        isbn = f"{i:013d}"
+        library_db[isbn] = Book(isbn=isbn, title=f"Title {i}", author=f"Author {i % 1000}", publication_year=1900 + i % 120)
+    library.invalidate_caches()
+    data = BOOK_LIST.dump_json(list(library_db.values()))
+
+    codecs = codec_table(data, args.repeat, args.bandwidth_mbps)
+    print_codec_table(f"{args.books:,} kitap, {len(data):,} bayt JSON, {args.bandwidth_mbps:g} Mbit/sn", codecs)
+    best = min(codecs, key=lambda name: codecs[name]["total_ms"])
+    print(f"\nSıkıştırma + aktarım toplamı en küçük: {best}")
+
+    encoding = "br" if brotli is not None else "gzip"
+    http = asyncio.run(measure_http(args.requests, encoding))
+    print_latency_table(f"GET /books ({args.requests} istek)", http)
+
+    results = {f"codec {name}": row for name, row in codecs.items()}
+    results.update({f"http {name}": row for name, row in http.items()})
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    print(f"Sonuçlar: {save_results('compression', results, params, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
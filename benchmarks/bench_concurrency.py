@@ -0,0 +1,154 @@
+"""Opp_1 / API_2 Library sınıfı için çok iş parçacıklı okuma/yazma stres testi.
+
+Her iş parçacığı sayısı için `--duration` saniye boyunca okuyucu iş
+parçacıkları karışık okumalar yapar (%90 find_book, %9 yazar sorgusu, %1
+tüm liste) ve aynı anda bir yazar iş parçacığı sürekli kitap ekleyip siler.
+Okuma verimi ve gecikmesi ile yazarın ulaştığı yazma hızı raporlanır.
+Okumalar kilit almadığından okuyucu sayısı arttıkça toplam okuma verimi
+düşmemeli ve yazar okuyuculara rağmen ilerlemelidir. CPython'da GIL
+nedeniyle saf Python okumaları birden çok çekirdeğe yayılmaz; toplam verimin
+doğrusal artması ancak GIL'siz (free-threaded) derlemelerde beklenir.
+
+API_2'de ekleme, Open Library yerine sahte sunucunun verisiyle
+(`add_fetched_books`) yapılır; ağa çıkılmaz.
+
+Kullanım:
+    python benchmarks/bench_concurrency.py [--stage API_2] [--books 100000] [--threads 1 2 4 8]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+
+from _common import latency_summary, make_isbn, print_latency_table, save_results, use_stage
+from bench_library import make_records
+
+READ_MIX = (("find", 0.90), ("author", 0.09), ("list", 0.01))
+
+
+def open_library(stage: str, path: str, size: int, compact: bool):
+    """Verilen aşamanın Library'sini `size` kitaplık bir anlık görüntüyle açar."""
+    use_stage(stage)
+    from shared.journal import write_snapshot
+    from main import Library
+
+    write_snapshot(path, make_records(size, with_year=stage == "API_2"))
+    return Library(filename=path, compact=compact)
+
+
+def make_writer(stage: str, library):
+    """Tek bir ISBN'i ekleyip silen yazma işlemini döndürür."""
+    if stage == "API_2":
+        from openlibrary_stub import book_data
+
+        def add(isbn: str):
+            library.add_fetched_books({isbn: book_data(isbn)})
+    else:
+        from main import Book
+
+        def add(isbn: str):
+            library.add_book(Book(title=f"New {isbn}", author="Bench", isbn=isbn))
+
+    def write(isbn: str):
+        add(isbn)
+        library.remove_book(isbn)
+    return write
+
+
+def run_round(library, write, size: int, readers: int, duration: float, write_rate: float) -> dict:
+    """`readers` okuyucu ve bir yazarla `duration` saniye çalışır ve gecikmeleri özetler."""
+    stop = threading.Event()
+    read_samples: list[list[float]] = [[] for _ in range(readers)]
+    write_samples: list[float] = []
+    errors: list[Exception] = []
+
+    def reader(samples: list[float], seed: int):
+        rng = random.Random(seed)
+        kinds = rng.choices([kind for kind, _ in READ_MIX], [weight for _, weight in READ_MIX], k=4096)
+        i = 0
+        try:
+            while not stop.is_set():
+                kind = kinds[i % len(kinds)]
+                i += 1
+                start = time.perf_counter()
+                if kind == "find":
+                    library.find_book(f"{9780000000000 + rng.randrange(size)}")
+                elif kind == "author":
+                    library.find_books_by_author(f"Author {rng.randrange(1000)}")
+                else:
+                    len(library.books)
+                samples.append(time.perf_counter() - start)
+        except Exception as exc:  # Ölçümü bozmamak için hatayı sona sakla
+            errors.append(exc)
+
+    def writer():
+        interval = 1 / write_rate if write_rate else 0.0
+        n = 0
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                write(make_isbn(n))
+                write_samples.append(time.perf_counter() - start)
+                n += 1
+                if interval:
+                    stop.wait(max(0.0, interval - (time.perf_counter() - start)))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=reader, args=(samples, i)) for i, samples in enumerate(read_samples)]
+    threads.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return {
+        "read": latency_summary([sample for samples in read_samples for sample in samples], elapsed),
+        "write": latency_summary(write_samples, elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stage", choices=("Opp_1", "API_2"), default="API_2")
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Okuyucu iş parçacığı sayıları")
+    parser.add_argument("--duration", type=float, default=2.0, help="Her tur için saniye")
+    parser.add_argument("--write-rate", type=float, default=0.0,
+                        help="Saniyedeki en fazla ekleme+silme çifti (0: sınırsız)")
+    parser.add_argument("--compact", action="store_true", help="Kitapları sütunlu tabloda tut")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/concurrency-<commit>.json)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):  # Library'nin bilgi mesajlarını gizle
+            library = open_library(args.stage, os.path.join(tmp, "library.json"), args.books, args.compact)
+        write = make_writer(args.stage, library)
+        baseline = None
+        for readers in args.threads:
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = run_round(library, write, args.books, readers, args.duration, args.write_rate)
+            baseline = baseline or rows["read"]["ops_per_sec"]
+            print_latency_table(f"{args.stage}: {readers} okuyucu + 1 yazar, {args.books:,} kitap", rows)
+            print(f"okuma verimi 1 okuyucuya göre: {rows['read']['ops_per_sec'] / baseline:.2f}x")
+            for kind, row in rows.items():
+                results[f"{args.stage}/{readers}/{kind}"] = row
+        with contextlib.redirect_stdout(io.StringIO()):
+            library.close()
+
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    print(f"\nSonuçlar: {save_results('concurrency', results, params, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""FastAPI_3 uç noktaları için eşzamanlı HTTP yük üreteci.
+
+`--url` verilmezse uygulama süreç içinde (httpx.ASGITransport) çalıştırılır,
+katalog `--books` kitapla doldurulur ve Open Library yerine sahte sunucu
+taşıyıcısı (openlibrary_stub.py) kullanılır; ölçüm ağa çıkmaz ve uygulamanın
+kendi maliyetini gösterir. `--url` ile çalışan bir sunucu ölçülür; ekleme
+senaryosu için sunucunun sahte Open Library'ye yönlendirilmesi gerekir
+(`--start-stub` bu süreçte bir sahte sunucu başlatır).
+
+Senaryolar: list (GET /books?limit=50), search (GET /books/search),
+add (POST /books) ve mixed (%70 list, %20 search, %10 add).
+
+Kullanım:
+    python benchmarks/bench_http.py [--scenario mixed] [--concurrency 32] [--requests 5000]
+    python benchmarks/openlibrary_stub.py --port 8081 &
+    OPENLIBRARY_BASE_URL=http://127.0.0.1:8081 uvicorn api:app --app-dir FastAPI_3 &
+    python benchmarks/bench_http.py --url http://127.0.0.1:8000 --concurrency 64
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import time
+
+import httpx
+
+from _common import latency_summary, make_isbn, print_latency_table, save_results, use_stage
+
+SCENARIOS = ("list", "search", "add", "mixed")
+MIX = (("list", 0.7), ("search", 0.2), ("add", 0.1))
+
+
+class LoadGenerator:
+    """`concurrency` eşzamanlı işçiyle toplam `requests` istek gönderir ve gecikmeleri toplar."""
+
+    def __init__(self, client: httpx.AsyncClient, scenario: str, books: int):
+        self.client = client
+        self.scenario = scenario
+        self.books = max(1, books)
+        self._isbns = itertools.count()
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    def _pick(self) -> str:
+        if self.scenario != "mixed":
+            return self.scenario
+        return random.choices([name for name, _ in MIX], [weight for _, weight in MIX])[0]
+
+    async def _send(self, kind: str) -> httpx.Response:
+        if kind == "list":
+            return await self.client.get("/books", params={"limit": 50})
+        if kind == "search":
+            return await self.client.get("/books/search", params={"q": f"Title {random.randrange(self.books)}"})
+        return await self.client.post("/books", json={"isbn": make_isbn(next(self._isbns))})
+
+    async def _worker(self, remaining: itertools.count, total: int):
+        while next(remaining) < total:
+            kind = self._pick()
+            start = time.perf_counter()
+            try:
+                response = await self._send(kind)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            self.samples.setdefault(kind, []).append(time.perf_counter() - start)
+            if failed:
+                self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    async def run(self, total: int, concurrency: int) -> dict:
+        self.samples, self.errors = {}, {}
+        remaining = itertools.count()
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker(remaining, total) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        results = {}
+        for kind, samples in sorted(self.samples.items()):
+            results[kind] = latency_summary(samples, elapsed) | {"errors": self.errors.get(kind, 0)}
+        every = [sample for samples in self.samples.values() for sample in samples]
+        results["total"] = latency_summary(every, elapsed) | {"errors": sum(self.errors.values())}
+        return results
+
+
+async def in_process_client(books: int, stub_latency: float, backend: str) -> httpx.AsyncClient:
+    """Uygulamayı süreç içinde kurar, kataloğu doldurur ve ona bağlı bir istemci döndürür."""
+    os.environ["LIBRARY_BACKEND"] = backend
+    use_stage("FastAPI_3")
+    from api import Book, app, library, open_library
+    from openlibrary_stub import mock_transport
+
+    open_library._client = httpx.AsyncClient(base_url=open_library.settings.base_url,
+                                             transport=mock_transport(stub_latency))
+    await library.repository.add_many([
+        Book(isbn=f"{9780000000000 + i}", title=f"Title {i}", author=f"Author {i % 1000}",
+             publication_year=1900 + i % 120)
+        for i in range(books)
+    ])
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def run(args) -> dict:
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30.0)
+    else:
+        client = await in_process_client(args.books, args.stub_latency_ms / 1000, args.backend)
+    async with client:
+        generator = LoadGenerator(client, args.scenario, args.books)
+        if args.warmup:
+            await generator.run(args.warmup, args.concurrency)
+        return await generator.run(args.requests, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Ölçülecek sunucu (verilmezse süreç içi)")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--books", type=int, default=10_000, help="Süreç içi kipte katalog boyutu")
+    parser.add_argument("--backend", choices=("memory", "compact", "sqlite"), default="memory",
+                        help="Süreç içi kipte depo arka ucu")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Sahte Open Library gecikmesi")
+    parser.add_argument("--start-stub", type=int, metavar="PORT", help="Bu portta sahte Open Library başlat")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/http-<commit>.json)")
+    args = parser.parse_args()
+
+    if args.start_stub:
+        from openlibrary_stub import start_server
+        _, stub_url = start_server(args.start_stub, args.stub_latency_ms / 1000)
+        print(f"Sahte Open Library: {stub_url}")
+
+    random.seed(0)
+    results = asyncio.run(run(args))
+    target = args.url or "süreç içi"
+    print_latency_table(f"{args.scenario} ({target}, {args.concurrency} eşzamanlı, {args.requests} istek)", results)
+    errors = results["total"]["errors"]
+    if errors:
+        print(f"Uyarı: {errors} istek hata ile sonuçlandı.")
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "start_stub")}
+    results = {f"{args.scenario}/{kind}": row for kind, row in results.items()}
+    print(f"\nSonuçlar: {save_results('http', results, params, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
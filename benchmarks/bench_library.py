@@ -0,0 +1,177 @@
+"""Üç aşamanın Library sınıflarında temel işlemlerin gecikmesini ölçer.
+
+Ölçülen işlemler: find_book, add_book, remove_book, save_books ve
+load_books. API_2 ve FastAPI_3'te kitap ekleme Open Library yerine süreç
+içi sahte sunucuyla (openlibrary_stub.py) yapılır; ağa çıkılmaz. FastAPI_3
+kalıcı bir dosyaya kaydetmediği için "save" bütün kataloğun boş bir depoya
+toplu yazılması (add_many), "load" ise tamamının okunmasıdır (list_all).
+
+Aşamalar aynı modül adlarını (main, storage, ...) kullandığından her
+aşama/boyut ayrı bir süreçte ölçülür. Sonuçlar JSON olarak kaydedilir ve
+`compare.py` ile başka bir commit'in sonuçlarıyla karşılaştırılabilir.
+
+Kullanım:
+    python benchmarks/bench_library.py [--sizes 1000 10000 100000 1000000] [--stages Opp_1 API_2 FastAPI_3]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import latency_summary, make_isbn, print_latency_table, save_results, use_stage
+
+STAGES = ("Opp_1", "API_2", "FastAPI_3")
+OPERATIONS = ("find", "add", "remove", "save", "load")
+
+
+def make_records(count: int, with_year: bool) -> list[dict]:
+    records = []
+    for i in range(count):
+        record = {"title": f"Title {i}", "author": f"Author {i % 1000}", "isbn": f"{9780000000000 + i}"}
+        if with_year:
+            record["publication_year"] = 1900 + i % 120
+        records.append(record)
+    return records
+
+
+def measure(fn, args_list) -> dict:
+    """`fn`'i her argüman için ayrı ayrı çağırıp gecikmeleri özetler."""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return latency_summary(samples)
+
+
+async def measure_async(fn, args_list) -> dict:
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        await fn(*args)
+        samples.append(time.perf_counter() - start)
+    return latency_summary(samples)
+
+
+def run_sync_stage(stage: str, size: int, ops: int, repeat: int, tmp: str) -> dict:
+    """Opp_1 ve API_2'nin (senkron) Library sınıfını ölçer."""
+    use_stage(stage)
+    import httpx
+    from shared.journal import write_snapshot
+    from main import Book, Library
+
+    with_year = stage == "API_2"
+    path = os.path.join(tmp, "library.json")
+    write_snapshot(path, make_records(size, with_year))
+    library = Library(filename=path)
+
+    existing = random.sample(range(size), min(ops, size))
+    new_isbns = [make_isbn(i) for i in range(ops)]
+    results = {"find": measure(library.find_book, [(f"{9780000000000 + i}",) for i in existing])}
+    if stage == "API_2":
+        from openlibrary_stub import mock_transport
+        stub = httpx.Client(transport=mock_transport(asynchronous=False))
+        httpx.get = stub.get  # main.py httpx.get'i çağırıyor
+        results["add"] = measure(library.add_book_by_isbn, [(isbn,) for isbn in new_isbns])
+    else:
+        results["add"] = measure(library.add_book,
+                                 [(Book(title=f"New {isbn}", author="Bench", isbn=isbn),) for isbn in new_isbns])
+    results["remove"] = measure(library.remove_book, [(isbn,) for isbn in new_isbns])
+    results["save"] = measure(library.save_books, [()] * repeat)
+    results["load"] = measure(library.load_books, [()] * repeat)
+    library.close()
+    return results
+
+
+async def run_fastapi_stage(size: int, ops: int, repeat: int, tmp: str, backend: str) -> dict:
+    """FastAPI_3'ün asenkron Library sınıfını seçilen depo arka ucuyla ölçer."""
+    os.environ["LIBRARY_BACKEND"] = backend
+    os.environ["LIBRARY_DB_PATH"] = os.path.join(tmp, "library.db")
+    use_stage("FastAPI_3")
+    import httpx
+    from api import Book, library, open_library
+    from openlibrary_stub import mock_transport
+    from repository import InMemoryRepository, SQLiteRepository
+
+    open_library._client = httpx.AsyncClient(base_url=open_library.settings.base_url, transport=mock_transport())
+    books = [Book(**record) for record in make_records(size, with_year=True)]
+    await library.repository.add_many(books)
+
+    existing = random.sample(range(size), min(ops, size))
+    new_isbns = [make_isbn(i) for i in range(ops)]
+    results = {
+        "find": await measure_async(library.repository.get, [(f"{9780000000000 + i}",) for i in existing]),
+        "add": await measure_async(library.add_book_by_isbn, [(isbn,) for isbn in new_isbns]),
+        "remove": await measure_async(library.remove_book, [(isbn,) for isbn in new_isbns]),
+    }
+
+    async def save(index: int):
+        if backend == "sqlite":
+            repository = SQLiteRepository(os.path.join(tmp, f"save-{index}.db"), Book)
+        else:
+            repository = InMemoryRepository()
+        await repository.add_many(books)
+        await repository.close()
+
+    results["save"] = await measure_async(save, [(i,) for i in range(repeat)])
+    results["load"] = await measure_async(library.repository.list_all, [()] * repeat)
+    await open_library.aclose()
+    await library.repository.close()
+    return results
+
+
+def run_child(stage: str, size: int, ops: int, repeat: int, backend: str):
+    """Tek bir aşama/boyut ölçümünü yapar ve sonucu JSON olarak standart çıktıya yazar."""
+    random.seed(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):  # Library'nin bilgi mesajlarını gizle
+            if stage == "FastAPI_3":
+                results = asyncio.run(run_fastapi_stage(size, ops, repeat, tmp, backend))
+            else:
+                results = run_sync_stage(stage, size, ops, repeat, tmp)
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--ops", type=int, default=1_000, help="find/add/remove için örnek sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="save/load tekrar sayısı")
+    parser.add_argument("--fastapi-backend", choices=("memory", "compact", "sqlite"), default="sqlite")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/library-<commit>.json)")
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_child(args.run_stage, args.run_size, args.ops, args.repeat, args.fastapi_backend)
+        return
+
+    results = {}
+    for stage in args.stages:
+        for size in args.sizes:
+            output = subprocess.run(
+                [sys.executable, __file__, "--run-stage", stage, "--run-size", str(size), "--ops", str(args.ops),
+                 "--repeat", str(args.repeat), "--fastapi-backend", args.fastapi_backend],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            rows = json.loads(output.strip().splitlines()[-1])
+            print_latency_table(f"{stage}: {size:,} kitap", rows)
+            for operation in OPERATIONS:
+                results[f"{stage}/{size}/{operation}"] = rows[operation]
+
+    params = {"sizes": args.sizes, "stages": args.stages, "ops": args.ops, "repeat": args.repeat,
+              "fastapi_backend": args.fastapi_backend}
+    print(f"\nSonuçlar: {save_results('library', results, params, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Büyük library.json dosyalarının yüklenme süresini ve tepe bellek kullanımını ölçer.
+
+Her yükleme kipi (ikili kip için katalog önce binsnap biçimine çevrilir)
+ayrı bir süreçte çalıştırılır; tepe bellek o sürecin en
+yüksek yerleşik bellek (max RSS) değeridir. Katalog verilen boyuta ulaşana
+kadar üretilir ve geçici bir dizine yazılır.
+
+Kullanım:
+    python benchmarks/bench_loading.py [--size-mb 120] [--stage API_2]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import ROOT, use_stage
+
+MODES = ("json.load", "stream", "stream+compact", "lazy", "binary")
+
+
+def generate_catalog(path: str, size_mb: int, with_year: bool) -> int:
+    """`path` dosyasına en az `size_mb` MiB'lık bir katalog yazar; kitap sayısını döndürür."""
+    target = size_mb * 2**20
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        while f.tell() < target:
+            record = {
+                "title": f"Kitap başlığı numara {count} — uzun bir alt başlık ile",
+                "author": f"Yazar {count % 5000}",
+                "isbn": f"{9780000000000 + count}",
+            }
+            if with_year:
+                record["publication_year"] = 1900 + count % 120
+            f.write(("," if count else "") + "\n    " + json.dumps(record, ensure_ascii=False, indent=8))
+            count += 1
+        f.write("\n]")
+    return count
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # macOS bayt, Linux KiB verir
+
+
+def run_mode(stage: str, mode: str, path: str):
+    """Tek bir kipi çalıştırır ve sonucu JSON olarak standart çıktıya yazar."""
+    use_stage(stage)
+    from main import Book, Library
+    from shared.storage import BookStore
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "json.load":
+            # Eski yükleyici: tüm dosya tek seferde çözülür, ardından kitaplar oluşturulur
+            with open(path, encoding="utf-8") as f:
+                library = BookStore(Book(**data) for data in json.load(f))
+        elif mode == "binary":
+            library = Library(filename=path + ".bin", binary=True).store
+        else:
+            library = Library(filename=path, compact=mode == "stream+compact", lazy=mode == "lazy").store
+    load_seconds = time.perf_counter() - start
+
+    isbn = next(iter(library)).isbn
+    start = time.perf_counter()
+    for _ in range(1000):
+        library.get(isbn)
+    lookup_us = (time.perf_counter() - start) * 1e6 / 1000
+
+    print(json.dumps({"books": len(library), "load_seconds": load_seconds,
+                      "lookup_us": lookup_us, "peak_rss_mb": peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=120)
+    parser.add_argument("--stage", choices=("Opp_1", "API_2"), default="API_2")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_mode(args.stage, args.run_mode, args.file)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "library.json")
+        count = generate_catalog(path, args.size_mb, with_year=args.stage == "API_2")
+        size = os.path.getsize(path) / 2**20
+        print(f"\n== {args.stage}: {count:,} kitap, {size:.0f} MiB ==")
+        if "binary" in args.modes:
+            # Ayrı süreçte: Linux'ta tepe RSS exec sonrasında alt süreçlere aktarılır
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "shared.binsnap", "to-binary", path, path + ".bin"],
+                           cwd=ROOT, check=True, capture_output=True)
+            print(f"İkili biçime çevirme: {time.perf_counter() - start:.2f}s, "
+                  f"{os.path.getsize(path + '.bin') / 2**20:.0f} MiB")
+        print(f"{'kip':<16} {'yükleme':>10} {'tepe RSS':>12} {'ISBN erişimi':>14}")
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, __file__, "--stage", args.stage, "--run-mode", mode, "--file", path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<16} {result['load_seconds']:>9.3f}s {result['peak_rss_mb']:>9.0f} MiB "
+                  f"{result['lookup_us']:>11.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
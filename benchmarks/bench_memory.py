@@ -0,0 +1,83 @@
+"""Kitap koleksiyonlarının farklı bellek temsillerini karşılaştırır.
+
+Kullanım:
+    python benchmarks/bench_memory.py [--books 200000]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from _common import use_stage
+
+use_stage("API_2")
+
+from shared.columnar import ColumnarTable  # noqa: E402
+from main import Book  # noqa: E402
+
+
+class DictBook:
+    """__slots__ olmadan, her örneği __dict__ taşıyan eski Book sınıfı."""
+    def __init__(self, title, author, isbn, publication_year=None):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.publication_year = publication_year
+
+
+def fresh(text: str) -> str:
+    """Dizenin yeni bir kopyasını döndürür (girdi listesiyle paylaşılmasın diye)."""
+    return (text + ".")[:-1]
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.books
+    rows = [(f"Kitap başlığı numara {i}", f"Yazar {i % 5000}", f"{9780000000000 + i}", 1900 + i % 120)
+            for i in range(n)]
+
+    def objects(factory):
+        def build():
+            books = {}
+            for title, author, isbn, year in rows:
+                isbn = fresh(isbn)
+                books[isbn] = factory(title=fresh(title), author=fresh(author), isbn=isbn, publication_year=year)
+            return books
+        return build
+
+    def columnar():
+        table = ColumnarTable(Book)
+        for title, author, isbn, year in rows:
+            isbn = fresh(isbn)
+            table[isbn] = Book(title, author, isbn, year)
+        return table
+
+    use_stage("FastAPI_3")
+    from api import Book as BookModel
+
+    # Dizeler her temsilde yeniden oluşturulur ki ölçüme dahil olsunlar
+    candidates = {
+        "dict + __dict__ Book": objects(DictBook),
+        "dict + __slots__ Book": objects(Book),
+        "dict + Pydantic Book (FastAPI)": objects(BookModel),
+        "ColumnarTable": columnar,
+    }
+    print(f"\n== {n} kitap için bellek kullanımı ==")
+    for name, build in candidates.items():
+        size = measure(build)
+        print(f"{name:<32} {size / 2**20:10.1f} MiB {size / n:10.1f} bayt/kitap")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Open Library kayıtlarının normalleştirme hızını (kayıt/sn) ölçer.
+
+Karışık tarih biçimli (ör. "March 1984", "2005-03-01", "c1999", "n.d.")
+sahte kayıtlar üzerinde eski kayıt başına ayrıştırma ile `normalize.py`'nin
+tek tek ve toplu yolunu karşılaştırır. Toplu yol `--min-rate` kayıt/sn'nin
+altında kalırsa çıkış kodu 1 olur; böylece CI'da bütçe olarak kullanılabilir.
+
+Kullanım:
+    python benchmarks/bench_normalize.py [--records 200000] [--min-rate 100000]
+"""
+import argparse
+import sys
+
+from _common import make_isbn, print_table, save_results, timed, use_stage
+from openlibrary_stub import book_data
+
+use_stage("API_2")
+
+from shared.normalize import normalize_record, normalize_records  # noqa: E402
+
+DATE_FORMATS = ("March {year}", "{year}-03-01", "c{year}", "[{year}?]", "May 12, {year}", "{year}", "n.d.")
+
+
+def make_records(count: int) -> list[tuple[str, dict]]:
+    """Sahte sunucunun kayıtlarını farklı tarih biçimleriyle çoğaltır."""
+    records = []
+    for i in range(count):
+        isbn = make_isbn(i, prefix="978")
+        data = book_data(isbn)
+        data["publish_date"] = DATE_FORMATS[i % len(DATE_FORMATS)].format(year=1950 + i % 70)
+        records.append((isbn, data))
+    return records
+
+
+def legacy_record(isbn: str, data: dict) -> dict:
+    """Normalleştirme aşamasından önceki (Aşama 2) kayıt başına ayrıştırma."""
+    authors = [author["name"] for author in data.get("authors", [])]
+    publication_year = None
+    if data.get("publish_date"):
+        try:
+            publication_year = int(data["publish_date"].split()[-1])
+        except (ValueError, IndexError):
+            publication_year = None
+    return {"isbn": isbn, "title": data.get("title", "N/A"), "author": ", ".join(authors) or "N/A",
+            "publication_year": publication_year}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--min-rate", type=float, default=100_000, help="Toplu yol için en düşük kayıt/sn")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/normalize-<commit>.json)")
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    results = {}
+    with timed(results, "legacy (split()[-1])", args.records):
+        legacy = [legacy_record(isbn, data) for isbn, data in records]
+    with timed(results, "normalize_record", args.records):
+        for isbn, data in records:
+            normalize_record(isbn, data)
+    with timed(results, "normalize_records", args.records):
+        normalized = normalize_records(records)
+    print_table(f"{args.records:,} kayıt", results)
+
+    lost = sum(1 for old, new in zip(legacy, normalized)
+               if old["publication_year"] is None and new["publication_year"] is not None)
+    print(f"\nEski ayrıştırmanın kaçırıp yeni aşamanın bulduğu yıl: {lost:,}")
+
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    print(f"Sonuçlar: {save_results('normalize', results, params, args.output)}")
+    rate = results["normalize_records"]["ops_per_sec"]
+    if rate < args.min_rate:
+        print(f"Bütçe aşıldı: {rate:,.0f} kayıt/sn < {args.min_rate:,.0f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
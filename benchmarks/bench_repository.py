@@ -0,0 +1,56 @@
+"""FastAPI_3 depo arka uçlarını (memory, sqlite) karşılaştırır.
+
+Kullanım:
+    python benchmarks/bench_repository.py [--books 10000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+from _common import print_table, timed, use_stage
+
+use_stage("FastAPI_3")
+
+from api import Book  # noqa: E402
+from repository import InMemoryRepository, SQLiteRepository  # noqa: E402
+
+
+async def run(repository, books: list, lookups: int) -> dict:
+    results = {}
+    with timed(results, "add_many", len(books)):
+        await repository.add_many(books)
+    isbns = [book.isbn for book in random.sample(books, min(lookups, len(books)))]
+    with timed(results, "get", len(isbns)):
+        for isbn in isbns:
+            await repository.get(isbn)
+    with timed(results, "contains (concurrent)", len(isbns)):
+        await asyncio.gather(*(repository.contains(isbn) for isbn in isbns))
+    with timed(results, "list_all", 1):
+        await repository.list_all()
+    with timed(results, "remove", len(isbns)):
+        for isbn in isbns:
+            await repository.remove(isbn)
+    await repository.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    books = [
+        Book(isbn=f"{i:013d}", title=f"Title {i}", author=f"Author {i % 1000}", publication_year=1900 + i % 120)
+        for i in range(args.books)
+    ]
+    print_table("memory", asyncio.run(run(InMemoryRepository(), books, args.lookups)))
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SQLiteRepository(os.path.join(tmp, "bench.db"), Book)
+        print_table("sqlite", asyncio.run(run(sqlite, books, args.lookups)))
+
+
+if __name__ == "__main__":
+    main()
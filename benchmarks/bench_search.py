@@ -0,0 +1,57 @@
+"""Tam metin arama indeksinin kurulum süresini ve sorgu gecikmesini ölçer.
+
+Kullanım:
+    python benchmarks/bench_search.py [--books 100000] [--queries 1000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from _common import use_stage
+
+use_stage("FastAPI_3")
+
+from shared.search import SearchIndex  # noqa: E402
+
+WORDS = ("kırmızı kar masumiyet müzesi ince memed kürk mantolu madonna tutunamayanlar saatleri ayarlama "
+         "enstitüsü huzur aylak adam beyaz kale sessiz ev yeni hayat kara kitap istanbul hatıralar şehir "
+         "time war peace crime punishment brothers karamazov idiot demons notes underground").split()
+AUTHORS = ["Orhan Pamuk", "Yaşar Kemal", "Sabahattin Ali", "Oğuz Atay", "Ahmet Hamdi Tanpınar",
+           "Yusuf Atılgan", "Fyodor Dostoyevski", "Lev Tolstoy", "İlhan Berk", "Sait Faik Abasıyanık"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    for i in range(args.books):
+        title = " ".join(rng.choices(WORDS, k=3)) + f" {i}"
+        index.add(i, title, rng.choice(AUTHORS))
+    print(f"İndeks kurulumu: {args.books} kitap, {time.perf_counter() - start:.2f} sn")
+
+    queries = {
+        "tek kelime (nadir)": lambda: str(rng.randrange(args.books)),
+        "yazar + kelime": lambda: f"{rng.choice(AUTHORS).split()[0]} {rng.choice(WORDS)}",
+        "önek": lambda: rng.choice(WORDS)[:3],
+        "bulanık": lambda: rng.choice(WORDS)[:-1] + "x",
+    }
+    for name, make_query in queries.items():
+        latencies = []
+        for _ in range(args.queries):
+            query = make_query()
+            start = time.perf_counter()
+            index.search(query, limit=10)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{name:<22} p50 {statistics.median(latencies):8.3f} ms   p99 {p99:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
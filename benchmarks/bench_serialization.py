@@ -0,0 +1,49 @@
+"""GET /books liste uç noktasının varsayılan ve hızlı JSON kipindeki verimini ölçer.
+
+Kullanım:
+    python benchmarks/bench_serialization.py [--books 10000] [--requests 50]
+"""
+import argparse
+import asyncio
+
+import httpx
+
+from _common import print_table, timed, use_stage
+
+use_stage("FastAPI_3")
+
+from api import Book, app, library, library_db  # noqa: E402
+
+
+async def measure(requests: int) -> dict:
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for fast_json in (False, True):
+            library.fast_json = fast_json
+            library.encoder.clear()
+            await client.get("/books")  # Isınma (hızlı kipte önbelleği doldurur)
+            name = "fast_json (cached bytes)" if fast_json else "default (response_model)"
+            with timed(results, name, requests):
+                for _ in range(requests):
+                    response = await client.get("/books")
+                    response.raise_for_status()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    library_db.clear()
+    for i in range(args.books):
+        isbn = f"{i:013d}"
+        library_db[isbn] = Book(isbn=isbn, title=f"Title {i}", author=f"Author {i % 1000}", publication_year=1900 + i % 120)
+
+    print_table(f"GET /books ({args.books} kitap, istek/sn)", asyncio.run(measure(args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Giriş noktalarının soğuk açılış süresini ölçer ve bütçeyi aşan gerilemede başarısız olur.
+
+- Import süresi: her giriş noktası (`Opp_1/main.py`, `API_2/main.py`,
+  `FastAPI_3/api.py`) ayrı bir süreçte `python -X importtime` ile yüklenir ve
+  modülün kümülatif import süresi okunur.
+- Menüye kadar geçen süre: CLI'lar `--size-mb` büyüklüğünde bir katalogla
+  başlatılır; süreç açılışından "Seçiminiz" isteminin görünmesine kadar geçen
+  süre, katalog önce yüklenerek ve `LIBRARY_FAST_START=1` ile (arka planda)
+  ölçülür.
+
+Import süresinin medyanı `--budget GİRİŞ=MS` bütçesini aşarsa çıkış kodu 1
+olur; böylece CI'da kullanılabilir.
+
+Kullanım:
+    python benchmarks/bench_startup.py [--runs 10] [--size-mb 20] [--budget API_2=60]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import ROOT, latency_summary, print_latency_table, save_results
+from bench_loading import generate_catalog
+
+# Giriş noktası -> (aşama dizini, modül)
+ENTRY_POINTS = {"Opp_1": ("Opp_1", "main"), "API_2": ("API_2", "main"), "FastAPI_3": ("FastAPI_3", "api")}
+# Import süresi bütçeleri (ms, medyan); yavaş makinelerde --budget ile değiştirilebilir
+BUDGETS_MS = {"Opp_1": 50.0, "API_2": 50.0, "FastAPI_3": 600.0}
+PROMPT = "Seçiminiz".encode("utf-8")
+
+
+def import_time(stage: str, module: str) -> float:
+    """Modülün yeni bir süreçteki kümülatif import süresini (sn) döndürür."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=os.path.join(ROOT, stage), capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        _, _, fields = line.partition("import time:")
+        parts = [part.strip() for part in fields.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1_000_000
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def time_to_prompt(stage: str, workdir: str, fast_start: bool) -> float:
+    """CLI'ı başlatıp menü istemi görünene kadar geçen süreyi (sn) döndürür, sonra çıkış seçer."""
+    env = dict(os.environ, LIBRARY_FAST_START="1" if fast_start else "0", PYTHONIOENCODING="utf-8")
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-u", os.path.join(ROOT, stage, "main.py")], cwd=workdir, env=env,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = b""
+    while PROMPT not in output:
+        chunk = os.read(process.stdout.fileno(), 65536)
+        if not chunk:
+            raise RuntimeError(f"{stage} exited before showing the menu")
+        output += chunk
+    elapsed = time.perf_counter() - start
+    process.communicate(b"6\n")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--size-mb", type=int, default=20, help="Menü ölçümündeki katalog büyüklüğü")
+    parser.add_argument("--budget", action="append", default=[], metavar="GİRİŞ=MS",
+                        help="Import süresi bütçesi, ör. API_2=60 (birden çok verilebilir)")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/startup-<commit>.json)")
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS_MS)
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        if name not in ENTRY_POINTS:
+            parser.error(f"unknown entry point {name!r}")
+        budgets[name] = float(value)
+
+    results = {}
+    for name, (stage, module) in ENTRY_POINTS.items():
+        results[f"import {name}"] = latency_summary([import_time(stage, module) for _ in range(args.runs)])
+    print_latency_table(f"Import süresi ({args.runs} süreç)", results)
+
+    prompts = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for stage in ("Opp_1", "API_2"):
+            workdir = os.path.join(tmp, stage)
+            os.makedirs(workdir)
+            books = generate_catalog(os.path.join(workdir, "library.json"), args.size_mb, with_year=stage == "API_2")
+            for fast_start in (False, True):
+                label = f"menu {stage} ({'arka planda' if fast_start else 'önce yükle'})"
+                prompts[label] = latency_summary([time_to_prompt(stage, workdir, fast_start) for _ in range(args.runs)])
+    print_latency_table(f"Menüye kadar geçen süre ({args.size_mb} MB, {books:,} kitap)", prompts)
+    results.update(prompts)
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "budget")}
+    params["budgets_ms"] = budgets
+    print(f"Sonuçlar: {save_results('startup', results, params, args.output)}")
+
+    over = [(name, results[f"import {name}"]["p50_ms"], budget) for name, budget in budgets.items()
+            if results[f"import {name}"]["p50_ms"] > budget]
+    for name, value, budget in over:
+        print(f"Bütçe aşıldı: {name} import {value:.1f} ms > {budget:.1f} ms")
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""İki benchmark sonuç dosyasını (ör. iki commit) karşılaştırır ve gerilemeleri bildirir.
+
+Gecikmelerde (p50/p95/p99) artış, verimde (ops/s) düşüş `--threshold`
+yüzdesini aşarsa gerileme sayılır ve çıkış kodu 1 olur; böylece CI'da
+kullanılabilir. Mikrosaniye altındaki işlemlerin gürültüsü gerileme
+sayılmasın diye işlem başına sürenin en az `--min-delta-ms` artması da
+gerekir. Yalnızca iki dosyada da bulunan ölçümler karşılaştırılır.
+
+Kullanım:
+    python benchmarks/compare.py results/library-<eski>.json results/library-<yeni>.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+# Metrik -> daha yüksek değer daha mı iyi?
+METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "ops_per_sec": True}
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _per_op_ms(metric: str, value: float) -> float:
+    """Metriği işlem başına milisaniyeye çevirir."""
+    if METRICS[metric]:
+        return 1000 / value if value else float("inf")
+    return value
+
+
+def compare(baseline: dict, candidate: dict, metrics: list[str], threshold: float,
+            min_delta_ms: float = 0.0) -> list[tuple]:
+    """Ortak ölçümler için (ad, metrik, eski, yeni, değişim %, gerileme mi) satırları döndürür."""
+    rows = []
+    for name in sorted(baseline.keys() & candidate.keys()):
+        for metric in metrics:
+            old, new = baseline[name].get(metric), candidate[name].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            worse = -change if METRICS[metric] else change
+            delta_ms = _per_op_ms(metric, new) - _per_op_ms(metric, old)
+            rows.append((name, metric, old, new, change, worse > threshold and delta_ms >= min_delta_ms))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Gerileme sayılacak değişim yüzdesi")
+    parser.add_argument("--min-delta-ms", type=float, default=0.01,
+                        help="Gerileme için işlem başına sürenin en az artması gereken miktar (ms)")
+    parser.add_argument("--metrics", nargs="+", choices=tuple(METRICS), default=["p50_ms", "p99_ms", "ops_per_sec"])
+    parser.add_argument("--only-regressions", action="store_true")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline.get("suite") != candidate.get("suite"):
+        print(f"Uyarı: farklı benchmark'lar karşılaştırılıyor ({baseline.get('suite')} / {candidate.get('suite')}).")
+    if baseline.get("params") != candidate.get("params"):
+        print("Uyarı: iki ölçümün parametreleri farklı.")
+    print(f"eski: {(baseline.get('commit') or '?')[:10]}  yeni: {(candidate.get('commit') or '?')[:10]}")
+
+    rows = compare(baseline["results"], candidate["results"], args.metrics, args.threshold,
+                   args.min_delta_ms)
+    print(f"{'ölçüm':<36} {'metrik':<12} {'eski':>12} {'yeni':>12} {'değişim':>9}")
+    for name, metric, old, new, change, regressed in rows:
+        if args.only_regressions and not regressed:
+            continue
+        mark = "  GERİLEME" if regressed else ""
+        print(f"{name:<36} {metric:<12} {old:>12.3f} {new:>12.3f} {change:>+8.1f}%{mark}")
+
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n{len(rows)} karşılaştırma, {regressions} gerileme (eşik %{args.threshold:g}).")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
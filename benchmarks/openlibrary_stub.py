@@ -0,0 +1,115 @@
+"""Benchmark'ların ağa çıkmadan kullandığı sahte Open Library `/api/books` sunucusu.
+
+Her ISBN için belirlenimci bir kitap verisi döner; "000" ile başlayan
+ISBN'ler bulunamamış sayılır. `--latency-ms` ile her yanıt yapay olarak
+geciktirilir. Aynı yanıtlar süreç içi kullanım için `mock_transport` ile
+httpx taşıyıcısı olarak da sunulur.
+
+Kullanım:
+    python benchmarks/openlibrary_stub.py [--port 8081] [--latency-ms 20]
+    OPENLIBRARY_BASE_URL=http://127.0.0.1:8081 uvicorn api:app
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+
+def book_data(isbn: str) -> dict | None:
+    """ISBN için sahte Open Library verisi; "000" ile başlayan ISBN'ler için None."""
+    if isbn.startswith("000"):
+        return None
+    number = sum(ord(char) for char in isbn)
+    return {
+        "title": f"Benchmark Book {isbn}",
+        "authors": [{"name": f"Author {number % 500}"}, {"name": f"Co-Author {number % 97}"}],
+        "publish_date": f"March {1950 + number % 70}",
+    }
+
+
+def payload(bibkeys: str) -> dict:
+    """`bibkeys` parametresi ("ISBN:1,ISBN:2") için `/api/books?jscmd=data` yanıtı."""
+    result = {}
+    for key in filter(None, bibkeys.split(",")):
+        data = book_data(key.removeprefix("ISBN:"))
+        if data is not None:
+            result[key] = data
+    return result
+
+
+def mock_transport(latency: float = 0.0, asynchronous: bool = True) -> httpx.MockTransport:
+    """Sahte sunucuyla aynı yanıtları süreç içinde veren httpx taşıyıcısı.
+
+    `asynchronous` True ise `httpx.AsyncClient`, değilse `httpx.Client` içindir.
+    """
+    def respond(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/books":
+            return httpx.Response(404, json={})
+        return httpx.Response(200, json=payload(request.url.params.get("bibkeys", "")))
+
+    if not asynchronous:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if latency:
+                time.sleep(latency)
+            return respond(request)
+        return httpx.MockTransport(handler)
+
+    async def async_handler(request: httpx.Request) -> httpx.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        return respond(request)
+    return httpx.MockTransport(async_handler)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    protocol_version = "HTTP/1.1"  # Bağlantıların canlı tutulabilmesi için
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/api/books":
+            self.send_error(404)
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps(payload(parse_qs(url.query).get("bibkeys", [""])[0])).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Her isteği yazdırmak ölçümü yavaşlatır
+
+
+def start_server(port: int = 0, latency: float = 0.0) -> tuple[ThreadingHTTPServer, str]:
+    """Sunucuyu arka plan iş parçacığında başlatır; sunucuyu ve temel adresini döndürür."""
+    handler = type("Handler", (_Handler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.latency_ms / 1000)
+    print(f"Sahte Open Library {base_url} adresinde çalışıyor (Ctrl+C ile durdurun).")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Aşamaların ortak kullandığı modüller.
+
+Aşamalar kendi dizinlerinden çalıştırılır; depo kökü import yoluna her
+aşamadaki `sharedpath` modülüyle eklenir.
+"""
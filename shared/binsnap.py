@@ -0,0 +1,260 @@
+"""Sürümlü, belleğe eşlenebilir (mmap) ikili kütüphane anlık görüntüsü.
+
+Dosya düzeni (tüm sayılar little-endian):
+
+    başlık    : sihirli dize "LIBSNAP\\0", sürüm (u16), bayraklar (u16),
+                kayıt sayısı, kayıt/indeks/yığın ofsetleri (u64)
+    kayıtlar  : eklenme sırasıyla sabit genişlikli kayıtlar; her biri ISBN,
+                başlık ve yazar için (yığın ofseti u64, uzunluk u32) ve
+                yayın yılı (i32)
+    indeks    : ISBN'e göre (UTF-8 bayt sırası) sıralı kayıt numaraları (u32)
+    yığın     : tüm dizelerin UTF-8 baytları; aynı yazar bir kez yazılır
+
+Dosya açılırken hiçbir şey çözülmez; ISBN aramaları indeks üzerinde ikili
+arama ile doğrudan eşlenmiş bellekten yapılır.
+
+Kullanım:
+    python -m shared.binsnap to-binary library.json library.bin
+    python -m shared.binsnap to-json library.bin library.json
+"""
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Callable, Iterable, Iterator
+
+MAGIC = b"LIBSNAP\x00"
+VERSION = 1
+FLAG_HAS_YEAR = 1
+
+_HEADER = struct.Struct("<8sHHQQQQ")
+_RECORD = struct.Struct("<QIQIQIi")
+_INDEX = struct.Struct("<I")
+# Yılı olmayan kayıtlar için işaret değeri
+_NO_YEAR = -(2 ** 31)
+
+
+def write_binary(filename: str, records: Iterable[dict]):
+    """Kitap kayıtlarını (sözlükler) ikili anlık görüntü olarak atomik biçimde yazar.
+
+    Aynı ISBN birden çok kez geçiyorsa ilki yazılır.
+    """
+    heap = bytearray()
+    interned: dict[str, tuple[int, int]] = {}
+
+    def put(text: str, intern: bool = False) -> tuple[int, int]:
+        if intern and text in interned:
+            return interned[text]
+        data = text.encode("utf-8")
+        span = (len(heap), len(data))
+        heap.extend(data)
+        if intern:
+            interned[text] = span
+        return span
+
+    rows = bytearray()
+    keys: list[tuple[bytes, int]] = []
+    seen: set[str] = set()
+    flags = 0
+    for record in records:
+        isbn = record["isbn"]
+        if isbn in seen:
+            continue
+        seen.add(isbn)
+        if "publication_year" in record:
+            flags |= FLAG_HAS_YEAR
+        year = record.get("publication_year")
+        isbn_span = put(isbn)
+        rows += _RECORD.pack(*isbn_span, *put(record["title"]), *put(record["author"], intern=True),
+                             _NO_YEAR if year is None else year)
+        keys.append((isbn.encode("utf-8"), len(keys)))
+    keys.sort()
+
+    records_offset = _HEADER.size
+    index_offset = records_offset + len(rows)
+    heap_offset = index_offset + _INDEX.size * len(keys)
+    tmp_path = filename + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, flags, len(keys), records_offset, index_offset, heap_offset))
+        f.write(rows)
+        f.write(b"".join(_INDEX.pack(row) for _, row in keys))
+        f.write(heap)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filename)
+
+
+class BinarySnapshot:
+    """İkili anlık görüntüyü belleğe eşleyerek okuyan, sözlük gibi kullanılabilen tablo.
+
+    Dosyadaki kitaplar yalnızca erişildiğinde `factory` ile oluşturulur.
+    Sonradan eklenen ve silinen kitaplar bellekte ayrı tutulur, dosyaya
+    dokunulmaz. Dosya yerine yeni bir anlık görüntü yazılsa da eşleme eski
+    dosyayı göstermeye devam eder. ISBN -> kitap sözlüğünün arayüzünü
+    (get, pop, values, ...) taklit eder, böylece `BookStore` içinde
+    kullanılabilir.
+    """
+
+    def __init__(self, filename: str, factory: Callable[..., Any]):
+        self.factory = factory
+        self._added: dict[str, Any] = {}
+        self._removed: set[str] = set()
+        with open(filename, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(f"Not a library snapshot: {filename}")
+        magic, version, flags, count, records, index, heap = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a library snapshot: {filename}")
+        if version != VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        if not records + count * _RECORD.size <= index <= index + count * _INDEX.size <= heap <= len(self._map):
+            self._map.close()
+            raise ValueError(f"Truncated library snapshot: {filename}")
+        self.has_year = bool(flags & FLAG_HAS_YEAR)
+        self._count = count
+        self._records = records
+        self._index = index
+        self._heap = heap
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._heap + offset
+        return str(self._map[start:start + length], "utf-8")
+
+    def _isbn_bytes(self, row: int) -> bytes:
+        offset, length = struct.unpack_from("<QI", self._map, self._records + row * _RECORD.size)
+        start = self._heap + offset
+        return self._map[start:start + length]
+
+    def _find(self, isbn: str) -> int | None:
+        """ISBN'in dosyadaki kayıt numarasını ikili aramayla bulur, yoksa None."""
+        key = isbn.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = _INDEX.unpack_from(self._map, self._index + mid * _INDEX.size)[0]
+            current = self._isbn_bytes(row)
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return row
+        return None
+
+    def _materialize(self, row: int) -> Any:
+        isbn_off, isbn_len, title_off, title_len, author_off, author_len, year = _RECORD.unpack_from(
+            self._map, self._records + row * _RECORD.size)
+        values = {
+            "title": self._string(title_off, title_len),
+            "author": self._string(author_off, author_len),
+            "isbn": self._string(isbn_off, isbn_len),
+        }
+        if self.has_year:
+            values["publication_year"] = None if year == _NO_YEAR else year
+        return self.factory(**values)
+
+    def _file_rows(self) -> Iterator[tuple[str, int]]:
+        """Dosyadaki silinmemiş kayıtları (ISBN, kayıt numarası) olarak eklenme sırasıyla üretir."""
+        for row in range(self._count):
+            isbn = str(self._isbn_bytes(row), "utf-8")
+            if isbn not in self._removed:
+                yield isbn, row
+
+    def __len__(self) -> int:
+        return self._count - len(self._removed) + len(self._added)
+
+    def __contains__(self, isbn: str) -> bool:
+        if isbn in self._added:
+            return True
+        return isbn not in self._removed and self._find(isbn) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for isbn, _ in self._file_rows():
+            yield isbn
+        yield from self._added
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def get(self, isbn: str, default: Any = None) -> Any:
+        book = self._added.get(isbn)
+        if book is not None:
+            return book
+        if isbn in self._removed:
+            return default
+        row = self._find(isbn)
+        return default if row is None else self._materialize(row)
+
+    def __getitem__(self, isbn: str) -> Any:
+        book = self.get(isbn)
+        if book is None:
+            raise KeyError(isbn)
+        return book
+
+    def __setitem__(self, isbn: str, book: Any):
+        if isbn not in self._removed and self._find(isbn) is not None:
+            self._removed.add(isbn)  # Dosyadaki eski kaydı gizle
+        self._added[isbn] = book
+
+    def pop(self, isbn: str, default: Any = None) -> Any:
+        if isbn in self._added:
+            return self._added.pop(isbn)
+        book = self.get(isbn)
+        if book is None:
+            return default
+        self._removed.add(isbn)
+        return book
+
+    def values(self) -> Iterator[Any]:
+        """Kitapları eklenme sırasıyla, ihtiyaç anında oluşturarak üretir."""
+        for _, row in self._file_rows():
+            yield self._materialize(row)
+        yield from self._added.values()
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        for isbn, row in self._file_rows():
+            yield isbn, self._materialize(row)
+        yield from self._added.items()
+
+    def clear(self):
+        self._removed.update(isbn for isbn, _ in self._file_rows())
+        self._added.clear()
+
+    def close(self):
+        """Dosya eşlemesini kapatır; dosyadaki kitaplara artık erişilemez."""
+        self._map.close()
+
+
+def json_to_binary(json_path: str, binary_path: str) -> int:
+    """JSON anlık görüntüsünü akış halinde okuyup ikili biçime çevirir; kitap sayısını döndürür."""
+    from shared.jsonstream import iter_array
+
+    with open(json_path, "rb") as f:
+        records = [data for _, _, data in iter_array(f)]
+    write_binary(binary_path, records)
+    return len(records)
+
+
+def binary_to_json(binary_path: str, json_path: str) -> int:
+    """İkili anlık görüntüyü `save_books` ile aynı JSON biçimine çevirir; kitap sayısını döndürür."""
+    from shared.journal import write_snapshot
+
+    snapshot = BinarySnapshot(binary_path, dict)
+    try:
+        records = list(snapshot.values())
+    finally:
+        snapshot.close()
+    write_snapshot(json_path, records)
+    return len(records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-binary", "to-json"):
+        print(__doc__)
+        sys.exit(1)
+    convert = json_to_binary if sys.argv[1] == "to-binary" else binary_to_json
+    print(f"{convert(sys.argv[2], sys.argv[3])} kitap {sys.argv[3]} dosyasına yazıldı.")
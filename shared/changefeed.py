@@ -0,0 +1,94 @@
+import gzip
+import heapq
+import json
+from operator import attrgetter
+from typing import Any, Iterable
+
+# gzip akışlarının ilk iki baytı
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def make_batch(since: int, latest: int, changes: list[dict], reset: bool = False,
+               source: str | None = None, after: str | None = None, cursor: str | None = None) -> dict:
+    """Kütüphaneler arasında taşınan bir değişiklik partisi kurar.
+
+    Her değişiklik `{"seq", "op": "add", "book"}` veya `{"seq", "op":
+    "remove", "isbn"}` biçimindedir. `sequence` bir sonraki istekte `since`
+    olarak verilecek değerdir: partideki son değişikliğin sıra numarası, tam
+    katalog partisinde (`reset`) ise katalog okunmadan önceki son sıra
+    numarası. `latest` kaynaktaki son sıra numarasıdır; `sequence < latest`
+    ise alınacak başka değişiklik vardır. `source` kaynağın kimliğidir;
+    değişirse sıra numaraları başka bir akışa aittir.
+
+    Tam katalog ISBN sırasıyla sayfalanır: sayfa ISBN'i `after`'dan büyük
+    kitapları içerir, `cursor` sayfanın son ISBN'idir ve son sayfada None
+    olur. Sonraki sayfa `since=sequence` ve `cursor` ile istenir; devam
+    sayfaları ilk sayfanın sıra numarasını taşır, böylece sayfalar
+    alınırken gelen değişiklikler sonradan tekrar alınır.
+    """
+    if reset:
+        sequence = latest if after is None else since
+    else:
+        sequence = changes[-1]["seq"] if changes else since
+    batch = {"since": since, "sequence": sequence, "latest": latest, "reset": reset, "changes": changes}
+    if reset:
+        batch["after"] = after
+        batch["cursor"] = cursor
+    if source is not None:
+        batch["source"] = source
+    return batch
+
+
+def reset_page(books: Iterable[Any], after: str | None = None, limit: int | None = None) -> tuple[list[Any], str | None]:
+    """Tam katalog partisinin bir sayfasını döndürür: (ISBN sıralı kitaplar, sonraki sayfa imleci).
+
+    Sayfada ISBN'i `after`'dan büyük en fazla `limit` kitap bulunur; imleç
+    son sayfada None olur.
+    """
+    books = (book for book in books if after is None or book.isbn > after)
+    if limit is None:
+        return sorted(books, key=attrgetter("isbn")), None
+    page = heapq.nsmallest(limit + 1, books, key=attrgetter("isbn"))
+    if len(page) > limit:
+        return page[:limit], page[limit - 1].isbn
+    return page, None
+
+
+def in_reset_page(batch: dict, isbn: str) -> bool:
+    """ISBN tam katalog partisinin kapsadığı `(after, cursor]` aralığında mı?
+
+    Uygulayan taraf yalnızca bu aralıkta olup partide bulunmayan kitapları
+    siler; diğer aralıklar kendi sayfalarıyla gelir.
+    """
+    after, cursor = batch.get("after"), batch.get("cursor")
+    return (after is None or isbn > after) and (cursor is None or isbn <= cursor)
+
+
+def squash(changes: list[dict]) -> list[dict]:
+    """Her ISBN için yalnızca son değişikliği, sıralarını koruyarak bırakır.
+
+    Partinin varacağı durum değişmez; ama aradaki ekle-sil çiftleri hiç
+    uygulanmaz ve aynı parti ikinci kez uygulandığında hiçbir şey değişmez.
+    """
+    last = {}
+    for change in changes:
+        isbn = change["book"]["isbn"] if change["op"] == "add" else change.get("isbn")
+        last.pop(isbn, None)
+        last[isbn] = change
+    return list(last.values())
+
+
+def encode_batch(batch: dict, compress: bool = True, level: int = 6) -> bytes:
+    """Partiyi JSON'a, istenirse gzip ile sıkıştırarak bayta çevirir."""
+    data = json.dumps(batch, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(data, compresslevel=level, mtime=0) if compress else data
+
+
+def decode_batch(data: bytes) -> dict:
+    """`encode_batch` çıktısını (sıkıştırılmış olsun olmasın) partiye çevirir."""
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    batch = json.loads(data)
+    if not isinstance(batch, dict) or not isinstance(batch.get("changes"), list):
+        raise ValueError("Invalid change batch")
+    return batch
@@ -0,0 +1,145 @@
+from array import array
+from typing import Any, Callable, Iterator
+
+# Yılı olmayan satırlar için işaret değeri
+_NO_YEAR = -(2 ** 31)
+
+
+class ColumnarTable:
+    """Kitapları sütunlar halinde saklayan, sözlük gibi kullanılabilen kompakt tablo.
+
+    Kitap başına bir Python nesnesi tutmak yerine:
+    - başlıklar tek bir UTF-8 bayt dizisinde (string heap), ofset/uzunluk
+      dizileriyle,
+    - yazarlar tekilleştirilmiş (interned) bir tabloda, satırda yalnızca
+      yazar numarasıyla,
+    - yayın yılları `array('i')` içinde saklanır.
+    `Book` nesneleri yalnızca erişildiğinde `factory` ile oluşturulur. Silinen
+    satırlar yeniden kullanılır; başlık yığınındaki çöp yarıyı geçince yığın
+    sıkıştırılır. ISBN -> kitap sözlüğünün arayüzünü (get, pop, values, ...)
+    taklit eder, böylece mevcut depolarda sözlüğün yerine geçebilir.
+    """
+
+    def __init__(self, factory: Callable[..., Any],
+                 fields: tuple[str, ...] = ("title", "author", "isbn", "publication_year")):
+        self.factory = factory
+        self.fields = fields
+        self._row_of: dict[str, int] = {}  # ISBN -> satır (eklenme sırasını korur)
+        self._isbns: list[str | None] = []
+        self._title_heap = bytearray()
+        self._title_offsets = array('Q')
+        self._title_lengths = array('I')
+        self._author_ids = array('I')
+        self._authors: list[str] = []
+        self._author_index: dict[str, int] = {}
+        self._years = array('i')
+        self._free_rows: list[int] = []
+        self._garbage = 0  # Yığında artık kullanılmayan bayt sayısı
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, isbn: str) -> bool:
+        return isbn in self._row_of
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._row_of)
+
+    def keys(self):
+        return self._row_of.keys()
+
+    def _intern_author(self, author: str) -> int:
+        author_id = self._author_index.get(author)
+        if author_id is None:
+            author_id = self._author_index[author] = len(self._authors)
+            self._authors.append(author)
+        return author_id
+
+    def _store_title(self, row: int, title: str):
+        data = title.encode('utf-8')
+        self._title_offsets[row] = len(self._title_heap)
+        self._title_lengths[row] = len(data)
+        self._title_heap += data
+
+    def _title(self, row: int) -> str:
+        offset = self._title_offsets[row]
+        return self._title_heap[offset:offset + self._title_lengths[row]].decode('utf-8')
+
+    def _materialize(self, row: int) -> Any:
+        values = {
+            "title": self._title(row),
+            "author": self._authors[self._author_ids[row]],
+            "isbn": self._isbns[row],
+        }
+        if "publication_year" in self.fields:
+            year = self._years[row]
+            values["publication_year"] = None if year == _NO_YEAR else year
+        return self.factory(**values)
+
+    def __getitem__(self, isbn: str) -> Any:
+        return self._materialize(self._row_of[isbn])
+
+    def get(self, isbn: str, default: Any = None) -> Any:
+        row = self._row_of.get(isbn)
+        return default if row is None else self._materialize(row)
+
+    def __setitem__(self, isbn: str, book: Any):
+        row = self._row_of.get(isbn)
+        if row is not None:
+            self._garbage += self._title_lengths[row]
+        elif self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = len(self._isbns)
+            self._isbns.append(None)
+            self._title_offsets.append(0)
+            self._title_lengths.append(0)
+            self._author_ids.append(0)
+            self._years.append(_NO_YEAR)
+        self._row_of[isbn] = row
+        self._isbns[row] = isbn
+        self._store_title(row, book.title)
+        self._author_ids[row] = self._intern_author(book.author)
+        year = getattr(book, "publication_year", None)
+        self._years[row] = _NO_YEAR if year is None else year
+
+    def pop(self, isbn: str, default: Any = None) -> Any:
+        row = self._row_of.pop(isbn, None)
+        if row is None:
+            return default
+        book = self._materialize(row)
+        self._isbns[row] = None
+        self._garbage += self._title_lengths[row]
+        self._title_lengths[row] = 0
+        self._free_rows.append(row)
+        if self._garbage > len(self._title_heap) // 2:
+            self._compact_titles()
+        return book
+
+    def _compact_titles(self):
+        """Silinen başlıkların bıraktığı boşlukları yığından temizler."""
+        heap = bytearray()
+        for row in self._row_of.values():
+            offset = self._title_offsets[row]
+            length = self._title_lengths[row]
+            self._title_offsets[row] = len(heap)
+            heap += self._title_heap[offset:offset + length]
+        self._title_heap = heap
+        self._garbage = 0
+
+    def values(self) -> Iterator[Any]:
+        """Kitapları eklenme sırasıyla, ihtiyaç anında oluşturarak üretir."""
+        return (self._materialize(row) for row in self._row_of.values())
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        return ((isbn, self._materialize(row)) for isbn, row in self._row_of.items())
+
+    def clear(self):
+        self.__init__(self.factory, self.fields)
+
+    def nbytes(self) -> int:
+        """Sütun dizilerinin kapladığı yaklaşık bayt sayısı (sözlük ve yazar tablosu hariç)."""
+        return (len(self._title_heap) + self._title_offsets.itemsize * len(self._title_offsets)
+                + self._title_lengths.itemsize * len(self._title_lengths)
+                + self._author_ids.itemsize * len(self._author_ids)
+                + self._years.itemsize * len(self._years))
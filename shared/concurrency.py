@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class KeyedLock:
+    """Anahtar (ör. ISBN) başına ayrı kilit; farklı anahtarlar birbirini beklemez.
+
+    Kilitler ilk ihtiyaçta oluşturulur ve son kullanan bıraktığında silinir;
+    bellek kullanımı o an tutulan veya beklenen anahtar sayısıyla sınırlıdır.
+    """
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        # Anahtar -> [kilit, tutan ve bekleyenlerin sayısı]
+        self._locks: dict[Hashable, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        """Blok süresince `key` anahtarının kilidini tutar."""
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+class VersionLock:
+    """Yazarları sıraya sokan, okuyucuları kilitsiz bırakan sürüm sayaçlı kilit (seqlock).
+
+    Yazarlar `write()` bloğuna girerken ve çıkarken sürümü artırır; yani
+    yazma sürerken sürüm tektir. `read(fn)` okumayı kilit almadan yapar ve
+    okuma boyunca sürüm değişmediyse sonucu döndürür; bir yazmayla
+    çakıştıysa (sürüm değiştiyse veya okuma yarım kalmış bir yapı yüzünden
+    hata verdiyse) okumayı yazar kilidi altında tekrarlar. Okuma yapan kod
+    veriyi değiştirmemelidir.
+
+    `snapshot(build)` yazarların değiştirdiği verinin değişmez bir kopyasını
+    sürüm başına bir kez kurar (copy-on-write); değişiklik olana kadar tüm
+    okuyucular aynı kopyayı kilitsiz paylaşır.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._depth = 0  # İç içe write() blokları sürümü yalnızca bir kez artırır
+        self.version = 0
+        self._snapshot: tuple[int, Any] = (-1, None)
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Blok süresince yazar kilidini tutar; aynı iş parçacığı iç içe girebilir."""
+        with self._lock:
+            self._depth += 1
+            if self._depth == 1:
+                self.version += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    self.version += 1
+
+    def _try_read(self, fn: Callable[..., T], *args) -> tuple[int, T] | None:
+        """Kilitsiz okur; okuma tutarlıysa (sürüm, sonuç), değilse None döndürür."""
+        version = self.version
+        if version & 1:
+            return None  # Yazma sürüyor
+        try:
+            result = fn(*args)
+        except Exception:
+            return None  # Yarım kalmış bir değişikliği görmüş olabilir; kilit altında tekrarlanır
+        return (version, result) if self.version == version else None
+
+    def read(self, fn: Callable[..., T], *args) -> T:
+        """`fn(*args)` sonucunu yazarlarla tutarlı olarak döndürür."""
+        attempt = self._try_read(fn, *args)
+        if attempt is not None:
+            return attempt[1]
+        with self._lock:
+            return fn(*args)
+
+    def snapshot(self, build: Callable[[], T]) -> T:
+        """`build()` ile kurulan değişmez kopyayı döndürür; kopya sürüm değişene kadar paylaşılır."""
+        version, value = self._snapshot
+        if version == self.version:
+            return value
+        attempt = self._try_read(build)
+        if attempt is not None:
+            self._snapshot = attempt
+            return attempt[1]
+        with self._lock:
+            value = build()
+            if not self._depth:  # Yazma bloğu içinden çağrılmadıysa sürüm kararlıdır
+                self._snapshot = (self.version, value)
+            return value
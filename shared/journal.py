@@ -0,0 +1,419 @@
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from shared.jsonstream import iter_array
+
+
+def _fsync_dir(path: str):
+    """Dosya adı değişikliğinin kalıcı olması için dizini diske yazar (destekleniyorsa)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # Windows gibi dizin açılamayan sistemlerde atla
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(filename: str, records: list[dict]):
+    """Kayıtları geçici dosyaya yazıp atomik olarak `filename` ile değiştirir.
+
+    Yazma yarıda kesilirse eski dosya olduğu gibi kalır.
+    """
+    tmp_path = filename + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filename)
+    _fsync_dir(filename)
+
+
+def iter_journal(path: str, start: int = 0) -> Iterator[tuple[int, dict]]:
+    """Günlükteki geçerli kayıtları `start` bayt ofsetinden başlayarak sırayla üretir.
+
+    Her kayıt için (satırın bittiği bayt ofseti, kayıt) döner. Çökme
+    sırasında yarım kalmış son satır ve sonrası yok sayılır.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        f.seek(start)
+        end = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return
+            end += len(line)
+            yield end, record
+
+
+def read_journal(path: str) -> tuple[list[dict], int]:
+    """Günlükteki geçerli kayıtları ve son geçerli kaydın bittiği konumu döndürür.
+
+    Çökme sırasında yarım kalmış son satır ve sonrası yok sayılır.
+    """
+    records = []
+    valid_end = 0
+    for valid_end, record in iter_journal(path):
+        records.append(record)
+    return records, valid_end
+
+
+def apply_record(store: Any, record: dict, factory: Callable[..., Any],
+                 key: Callable[[str], str] | None = None):
+    """Tek bir günlük kaydını `add`/`remove` metotları olan bir kitap deposuna uygular.
+
+    `key` verilirse kayıttaki ISBN depoya yazılmadan önce ondan geçirilir
+    (ör. eski günlüklerdeki tireli ISBN'leri kanonik biçime çevirmek için).
+    """
+    if record["op"] == "add":
+        book = record["book"]
+        if key is not None:
+            book = {**book, "isbn": key(book["isbn"])}
+        store.add(factory(**book))
+    elif record["op"] == "remove":
+        store.remove(record["isbn"] if key is None else key(record["isbn"]))
+
+
+class LibraryJournal:
+    """`library.json` anlık görüntüsü ile yalnızca sona eklenen bir değişiklik günlüğü.
+
+    Her ekleme/silme `<dosya>.journal` dosyasına tek bir JSON satırı olarak
+    yazılır, yani tek kitaplık değişikliğin G/Ç maliyeti kütüphanenin
+    boyutundan bağımsızdır. fsync her `sync_every` kayıtta veya `sync_interval`
+    saniyede bir toplu yapılır. Günlük `compact_every` kayda ulaşınca arka
+    planda yeni bir anlık görüntüye sıkıştırılır.
+
+    Yükleme sırası: anlık görüntü (`iter_snapshot`), sıkıştırılmakta olan eski
+    günlük (`.journal.old`) ve güncel günlük (`replay`). Kayıtlar ISBN bazında
+    idempotent olduğundan yarıda kalmış bir sıkıştırmanın ardından tekrar
+    uygulanabilir; böyle bir durumda (`recovering`) çağıran yeni bir anlık
+    görüntü yazmalıdır.
+
+    Birden çok iş parçacığından kullanılabilir: günlüğe ekleme ve döndürme
+    kısa bir kilitle korunur, anlık görüntü yazımları (kaydetme ve arka plan
+    sıkıştırması) sıraya girer; böylece eski bir anlık görüntü yenisinin
+    üzerine yazılamaz.
+
+    Her kayda artan bir sıra numarası (`seq`) verilir. Sıkıştırılan
+    günlüklerin kayıtları silinmek yerine `<dosya>.changes` değişiklik
+    akışına eklenir; akış en yeni `retain_changes` kayda kadar kısaltılır.
+    Böylece başka bir kütüphane kataloğun tamamı yerine yalnızca bir sıra
+    numarasından sonraki değişiklikleri (`changes_since`) alabilir. Akış için
+    her `INDEX_EVERY` kayıtta bir sıra numarası -> bayt ofseti indeksi
+    tutulur; okuma `since`'e en yakın noktadan başlar, akışın tamamı her
+    istekte yeniden çözülmez.
+    """
+
+    # Değişiklik akışı indeksinin seyrekliği (kayıt)
+    INDEX_EVERY = 256
+
+    def __init__(self, filename: str, sync_every: int = 32, sync_interval: float = 1.0,
+                 compact_every: int = 1000, writer: Callable[[str, list[dict]], None] = write_snapshot,
+                 retain_changes: int = 100_000):
+        self.filename = filename
+        # Anlık görüntüyü yazan fonksiyon (varsayılan JSON; ör. binsnap.write_binary)
+        self.writer = writer
+        self.journal_path = filename + ".journal"
+        self.rotated_path = filename + ".journal.old"
+        self.changes_path = filename + ".changes"
+        # En az bir kayıt tutulur: son sıra numarası yeniden açılışta oradan okunur
+        self.retain_changes = max(1, retain_changes)
+        # Son verilen sıra numarası
+        self.sequence = 0
+        self._archived: int | None = None  # Akıştaki kayıt sayısı; ilk arşivlemede sayılır
+        self._reset_changes_index()
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self.entries = 0
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._compaction: threading.Thread | None = None
+        # Günlük dosyasını ve sayaçları korur
+        self._lock = threading.Lock()
+        # Döndürmeden anlık görüntünün diske yazılmasına kadar tutulur
+        self._snapshot_lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Anlık görüntü veya günlük dosyalarından herhangi biri var mı?"""
+        return any(os.path.exists(path) for path in (self.filename, self.journal_path, self.rotated_path))
+
+    @property
+    def recovering(self) -> bool:
+        """Önceki bir sıkıştırma yarıda kaldıysa (`.journal.old` duruyorsa) True."""
+        return os.path.exists(self.rotated_path)
+
+    def iter_snapshot(self, chunk_size: int = 1 << 16) -> Iterator[tuple[int, int, dict]]:
+        """Anlık görüntüdeki kayıtları dosyayı bütünüyle belleğe almadan sırayla üretir.
+
+        Her kayıt için (bayt ofseti, bayt uzunluğu, kayıt) döner. Dosya bozuksa
+        `json.JSONDecodeError` fırlatır.
+        """
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'rb') as f:
+            yield from iter_array(f, chunk_size)
+
+    def replay(self) -> list[dict]:
+        """Anlık görüntünün üzerine uygulanacak günlük kayıtlarını sırayla döndürür.
+
+        Önce sıkıştırılmakta olan eski günlük, sonra güncel günlük okunur.
+        Güncel günlüğün yarım kalmış son satırı dosyadan kesilir. Sıra
+        numarası kaldığı yerden devam eder.
+        """
+        rotated, _ = read_journal(self.rotated_path)
+        current, valid_end = read_journal(self.journal_path)
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) != valid_end:
+            # Yarım kalmış son satırı kes ki yeni kayıtlar onun arkasına eklenmesin
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_end)
+        self.entries = len(current)
+        records = rotated + current
+        self.sequence = max([self._last_archived_sequence()] + [record.get("seq", 0) for record in records])
+        return records
+
+    def _last_archived_sequence(self, tail: int = 1 << 16) -> int:
+        """Değişiklik akışındaki son kaydın sıra numarası; akış boşsa 0."""
+        if not os.path.exists(self.changes_path):
+            return 0
+        with open(self.changes_path, 'rb') as f:
+            start = max(0, os.fstat(f.fileno()).st_size - tail)
+            f.seek(start)
+            lines = f.read().split(b"\n")
+        for line in reversed(lines[1:] if start else lines):  # Dosyanın ortasından başlayan ilk satır yarımdır
+            try:
+                return json.loads(line)["seq"]
+            except (ValueError, KeyError, TypeError):
+                continue
+        return 0
+
+    def append(self, record: dict) -> int:
+        """Kaydı sıra numarası vererek günlüğün sonuna ekler; fsync toplu olarak yapılır.
+
+        Verilen sıra numarasını döndürür.
+        """
+        with self._lock:
+            self.sequence += 1
+            line = (json.dumps({"seq": self.sequence, **record}, ensure_ascii=False, separators=(",", ":"))
+                    + "\n").encode('utf-8')
+            if self._file is None:
+                self._file = open(self.journal_path, 'ab')
+            self._file.write(line)
+            self._file.flush()
+            self.entries += 1
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+            return self.sequence
+
+    def sync(self):
+        """Bekleyen günlük kayıtlarını diske yazar (fsync)."""
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Günlük sıkıştırma eşiğine ulaştıysa ve sıkıştırma sürmüyorsa True."""
+        return self.entries >= self.compact_every and not self.compacting
+
+    @property
+    def compacting(self) -> bool:
+        compaction = self._compaction
+        return compaction is not None and compaction.is_alive()
+
+    def _rotate(self):
+        """Güncel günlüğü `.journal.old` olarak kenara alıp yenisine başlar."""
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.journal_path):
+                if os.path.exists(self.rotated_path):
+                    # Önceki sıkıştırma tamamlanamamış; eski günlüğün üzerine yazma, sonuna ekle
+                    with open(self.journal_path, 'rb') as src, open(self.rotated_path, 'ab') as dst:
+                        dst.write(src.read())
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.rotated_path)
+                _fsync_dir(self.journal_path)
+            self.entries = 0
+
+    def _write_snapshot(self, records: list[dict]):
+        self.writer(self.filename, records)
+        if os.path.exists(self.rotated_path):
+            self._archive_rotated()
+            os.remove(self.rotated_path)
+
+    def _archive_rotated(self):
+        """Anlık görüntüye işlenen eski günlüğün kayıtlarını değişiklik akışının sonuna ekler.
+
+        Akış `retain_changes` kaydın iki katını aşınca en yeni `retain_changes`
+        kayıt bırakılarak atomik olarak yeniden yazılır. Ekleme ile eski
+        günlüğün silinmesi arasında çökülürse kayıtlar akışa iki kez girer;
+        okurken sıra numarasına göre ayıklanır.
+        """
+        records, valid_end = read_journal(self.rotated_path)
+        if not records:
+            return
+        with open(self.rotated_path, 'rb') as src:
+            data = src.read(valid_end)
+        with open(self.changes_path, 'ab') as dst:
+            dst.write(data)
+            dst.flush()
+            os.fsync(dst.fileno())
+        if self._archived is None:
+            with open(self.changes_path, 'rb') as f:
+                self._archived = sum(1 for _ in f)
+        else:
+            self._archived += len(records)
+        if self._archived > 2 * self.retain_changes:
+            with open(self.changes_path, 'rb') as f:
+                kept = f.readlines()[-self.retain_changes:]
+            tmp_path = self.changes_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.writelines(kept)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.changes_path)
+            _fsync_dir(self.changes_path)
+            self._archived = len(kept)
+            self._reset_changes_index()
+
+    def _reset_changes_index(self):
+        # (önceki kayıtların en büyük sıra numarası, bayt ofseti); yinelenen kayıtlar
+        # olsa da ilk değer azalmaz, yani ikili arama yapılabilir
+        self._changes_index: list[tuple[int, int]] = []
+        self._indexed_end = 0  # İndekslenen son kaydın bittiği ofset
+        self._indexed_records = 0
+        self._indexed_max = 0
+        self._oldest_change: int | None = None
+
+    def _update_changes_index(self):
+        """Değişiklik akışı indeksini dosyanın yalnızca yeni eklenen kısmını okuyarak günceller.
+
+        `_snapshot_lock` altında çağrılmalıdır.
+        """
+        size = os.path.getsize(self.changes_path) if os.path.exists(self.changes_path) else 0
+        if size < self._indexed_end:
+            self._reset_changes_index()  # Dosya başka bir yoldan kısaltılmış
+        start = self._indexed_end
+        for end, record in iter_journal(self.changes_path, self._indexed_end):
+            seq = record.get("seq")
+            if seq is not None:
+                if self._indexed_records % self.INDEX_EVERY == 0:
+                    self._changes_index.append((self._indexed_max, start))
+                if self._oldest_change is None:
+                    self._oldest_change = seq
+                self._indexed_max = max(self._indexed_max, seq)
+                self._indexed_records += 1
+            start = self._indexed_end = end
+
+    def changes_since(self, since: int, limit: int | None = None) -> tuple[list[dict], int]:
+        """`since`'ten büyük sıra numaralı kayıtları sırayla döndürür.
+
+        Kayıtlar değişiklik akışından, sıkıştırılmakta olan eski günlükten ve
+        güncel günlükten okunur. İkinci değer okunabilen en küçük sıra
+        numarasıdır (hiç kayıt yoksa `sequence + 1`); `since` bundan küçükse
+        aradaki değişiklikler artık tutulmuyordur.
+
+        Akışta `since`'ten önceki kayıtlar indeks sayesinde atlanır ve okuma
+        `limit` kayda ulaşınca durur; maliyet akışın boyutuna değil döndürülen
+        kayıt sayısına bağlıdır.
+        """
+        changes = []
+        last = since
+        with self._snapshot_lock:  # Süren sıkıştırma dosyaları taşırken okuma yapılmaz
+            self._update_changes_index()
+            oldest = self._oldest_change
+            position = bisect.bisect_right(self._changes_index, since, key=lambda entry: entry[0]) - 1
+            start = self._changes_index[position][1] if position >= 0 else 0
+            for path, offset in ((self.changes_path, start), (self.rotated_path, 0), (self.journal_path, 0)):
+                for _, record in iter_journal(path, offset):
+                    seq = record.get("seq")
+                    if seq is None:
+                        continue  # Sıra numarası öncesinden kalma kayıt
+                    if oldest is None:
+                        oldest = seq
+                    if seq > last:
+                        changes.append(record)
+                        last = seq
+                        if limit is not None and len(changes) >= limit:
+                            return changes, oldest
+        return changes, self.sequence + 1 if oldest is None else oldest
+
+    def _finish_snapshot(self, books: list[Any]):
+        try:
+            self._write_snapshot([book.to_dict() for book in books])
+        finally:
+            self._snapshot_lock.release()
+
+    def compact_in_background(self, books: list[Any]):
+        """Verilen kitap listesinden arka planda yeni bir anlık görüntü yazar.
+
+        `books` çağıranın o anki durumunun bir kopyası olmalıdır; bu noktadan
+        sonraki değişiklikler yeni günlüğe yazılmaya devam eder. Başka bir
+        anlık görüntü yazılıyorsa hiçbir şey yapmaz.
+        """
+        if not self._snapshot_lock.acquire(blocking=False):
+            return
+        try:
+            self._rotate()
+            self._compaction = threading.Thread(
+                target=self._finish_snapshot, args=(books,), name="library-compaction", daemon=True
+            )
+            self._compaction.start()
+        except BaseException:
+            self._snapshot_lock.release()
+            raise
+
+    def snapshot(self, records: list[dict] | Callable[[], list[dict]]):
+        """Anlık görüntüyü hemen yazar ve günlükleri sıfırlar.
+
+        Başka iş parçacıkları günlüğe yazmaya devam ediyorsa `records` bir
+        fonksiyon olarak verilmelidir: kayıtlar günlük döndürüldükten sonra
+        alınır. Döndürmeyle kayıtların alınması arasındaki değişiklikler hem
+        anlık görüntüye hem yeni günlüğe girebilir; kayıtlar idempotent
+        olduğundan bu zararsızdır, ama hiçbir değişiklik kaybolmaz.
+        """
+        with self._snapshot_lock:  # Süren sıkıştırma veya kaydetme bitene kadar bekler
+            self._rotate()
+            self._write_snapshot(records() if callable(records) else records)
+
+    def wait(self):
+        """Süren arka plan sıkıştırmasının bitmesini bekler."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+            if self._compaction is compaction:
+                self._compaction = None
+
+    def close(self):
+        """Bekleyen kayıtları diske yazar ve günlük dosyasını kapatır."""
+        self.wait()
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
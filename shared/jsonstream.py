@@ -0,0 +1,168 @@
+import codecs
+import json
+import mmap
+import os
+import re
+from typing import Any, BinaryIO, Callable, Iterator
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_array(f: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[tuple[int, int, Any]]:
+    """Bir JSON dizisinin elemanlarını dosyayı parça parça okuyarak üretir.
+
+    Her eleman için (bayt ofseti, bayt uzunluğu, değer) döner. Bellekte
+    yalnızca o anki parça ve yarım kalmış son eleman tutulur, yani bellek
+    kullanımı dosya boyutundan bağımsızdır. Biçim bozuksa
+    `json.JSONDecodeError` fırlatır.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    byte_pos = 0  # buf[pos] karakterinin dosyadaki bayt ofseti
+    eof = False
+
+    def advance(to: int):
+        nonlocal pos, byte_pos
+        # Yalnızca ASCII içeren tamponda karakter sayısı bayt sayısına eşittir
+        byte_pos += (to - pos) if buf.isascii() else len(buf[pos:to].encode("utf-8"))
+        pos = to
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            buf = buf[pos:] + utf8.decode(b"", final=True)
+        else:
+            buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        """Boşlukları atlayıp sıradaki karakteri döndürür; dosya bittiyse ""."""
+        while True:
+            advance(_WHITESPACE.match(buf, pos).end())
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    if next_char() != "[":
+        raise json.JSONDecodeError("Expecting '['", buf, pos)
+    advance(pos + 1)
+    if next_char() == "]":
+        return
+
+    while True:
+        if not next_char():
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue  # Eleman parçanın sonunda kesilmiş olabilir
+                raise
+            if end == len(buf) and fill():
+                continue  # Sayı gibi değerler parça sınırında eksik kalmış olabilir
+            break
+        start = byte_pos
+        advance(end)
+        yield start, byte_pos - start, value
+
+        separator = next_char()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+        advance(pos + 1)
+
+
+class LazyTable:
+    """Kitapları anlık görüntü dosyasındaki konumlarıyla tutan, sözlük gibi tablo.
+
+    `load` dosyayı akış halinde bir kez tarar ve yalnızca ISBN -> (ofset,
+    uzunluk) indeksini bellekte tutar; dosya salt okunur olarak belleğe
+    eşlenir (mmap). `Book` nesneleri yalnızca erişildiğinde ilgili bayt
+    aralığından çözülerek `factory` ile oluşturulur. Sonradan eklenen
+    kitaplar nesne olarak saklanır. Dosya yerine yeni bir anlık görüntü
+    yazılsa da eşleme eski dosyayı göstermeye devam eder, yani indeks
+    geçerli kalır. ISBN -> kitap sözlüğünün arayüzünü taklit eder.
+    """
+
+    def __init__(self, factory: Callable[..., Any]):
+        self.factory = factory
+        # ISBN -> (ofset, uzunluk) veya bellekteki kitap (eklenme sırasını korur)
+        self._entries: dict[str, tuple[int, int] | Any] = {}
+        self._map: mmap.mmap | None = None
+
+    def load(self, path: str, chunk_size: int = 1 << 16):
+        """Anlık görüntü dosyasının ofset indeksini kurar.
+
+        Aynı ISBN birden çok kez geçiyorsa ilki geçerlidir. Dosya bozuksa
+        `json.JSONDecodeError`, ISBN alanı eksikse `KeyError` fırlatır.
+        """
+        self.close()
+        self._entries.clear()
+        with open(path, 'rb') as f:
+            for offset, length, data in iter_array(f, chunk_size):
+                self._entries.setdefault(data["isbn"], (offset, length))
+            if os.fstat(f.fileno()).st_size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _materialize(self, entry: Any) -> Any:
+        if type(entry) is not tuple:
+            return entry
+        offset, length = entry
+        return self.factory(**json.loads(self._map[offset:offset + length]))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, isbn: str) -> bool:
+        return isbn in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def keys(self):
+        return self._entries.keys()
+
+    def __getitem__(self, isbn: str) -> Any:
+        return self._materialize(self._entries[isbn])
+
+    def get(self, isbn: str, default: Any = None) -> Any:
+        entry = self._entries.get(isbn)
+        return default if entry is None else self._materialize(entry)
+
+    def __setitem__(self, isbn: str, book: Any):
+        self._entries[isbn] = book
+
+    def pop(self, isbn: str, default: Any = None) -> Any:
+        entry = self._entries.pop(isbn, None)
+        return default if entry is None else self._materialize(entry)
+
+    def values(self) -> Iterator[Any]:
+        """Kitapları eklenme sırasıyla, ihtiyaç anında oluşturarak üretir."""
+        return (self._materialize(entry) for entry in self._entries.values())
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        return ((isbn, self._materialize(entry)) for isbn, entry in self._entries.items())
+
+    @property
+    def materialized(self) -> int:
+        """Dosyada değil, bellekte nesne olarak tutulan kitap sayısı."""
+        return sum(1 for entry in self._entries.values() if type(entry) is not tuple)
+
+    def clear(self):
+        self._entries.clear()
+
+    def close(self):
+        """Dosya eşlemesini kapatır; dosyadaki kitaplara artık erişilemez."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
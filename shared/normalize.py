@@ -0,0 +1,117 @@
+"""Open Library kayıtlarını kitap alanlarına çeviren normalleştirme aşaması.
+
+Aşama 2 ve 3 bu modülü birlikte kullanır; böylece bir kayıt iki aşamada da
+aynı kitaba dönüşür. Kayıt başına maliyet küçüktür: düzenli ifadeler modül
+yüklenirken derlenir, tekrar eden tarih metinlerinin yılı önbellekten gelir
+ve toplu aktarımlarda kayıtlar `normalize_records` ile tek geçişte işlenir
+(ölçüm: `benchmarks/bench_normalize.py`).
+
+- Tarih: metindeki ilk dört haneli yıl (1000-2099) alınır; "July 2006",
+  "2005-03-01", "c1999", "[1985?]" gibi biçimlerin hepsi desteklenir.
+- Yazarlar: boşluklar sadeleştirilir, aynı yazar (harf duyarsız) bir kez yazılır.
+- ISBN: tire/boşluklu ISBN-10 ve ISBN-13 biçimleri kontrol hanesiyle
+  doğrulanır ve 13 haneli kanonik biçime çevrilir; kitaplar bu biçimle
+  saklanır, böylece "0-13-449416-4" ile "978-0134494166" aynı kitaptır.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Iterable
+
+_YEAR = re.compile(r"(?<!\d)(1\d{3}|20\d{2})(?!\d)")
+_ISBN_SEPARATORS = str.maketrans("", "", "- ")
+
+
+@lru_cache(maxsize=4096)
+def parse_year(publish_date: str) -> int | None:
+    """Yayın tarihi metnindeki yılı döndürür; yıl bulunamazsa None."""
+    match = _YEAR.search(publish_date)
+    return int(match.group()) if match else None
+
+
+def normalize_authors(authors: Iterable[Any]) -> list[str]:
+    """Open Library yazar listesini (`{"name": ...}` sözlükleri veya dizeler) sade adlar listesine çevirir."""
+    names = []
+    seen = set()
+    for author in authors:
+        name = author.get("name") if isinstance(author, dict) else author
+        if not isinstance(name, str):
+            continue
+        name = " ".join(name.split())
+        key = name.casefold()
+        if name and key not in seen:
+            seen.add(key)
+            names.append(name)
+    return names
+
+
+def normalize_record(isbn: str, data: dict, default_author: str = "N/A") -> dict:
+    """Tek bir Open Library kaydını `isbn`, `title`, `author`, `publication_year` alanlarına çevirir.
+
+    ISBN kanonik ISBN-13 biçimine çevrilir; geçersizse ValueError fırlatılır.
+    Eksik başlık "N/A", eksik yazar `default_author` olur; tarihten yıl
+    çıkarılamazsa yıl None kalır.
+    """
+    title = data.get("title")
+    title = " ".join(title.split()) if isinstance(title, str) else ""
+    publish_date = data.get("publish_date")
+    return {
+        "isbn": normalize_isbn(isbn),
+        "title": title or "N/A",
+        "author": ", ".join(normalize_authors(data.get("authors") or ())) or default_author,
+        "publication_year": parse_year(publish_date) if isinstance(publish_date, str) else None,
+    }
+
+
+def normalize_records(records: Iterable[tuple[str, dict]], default_author: str = "N/A") -> list[dict]:
+    """(ISBN, Open Library kaydı) çiftlerini sırayla normalleştirir."""
+    return [normalize_record(isbn, data, default_author) for isbn, data in records]
+
+
+def _isbn13_check_digit(digits: str) -> str:
+    # Rakamların ASCII kodları toplanır; 12 rakamın ağırlıklı "0" payı (48 * 24) çıkarılır
+    codes = digits.encode("ascii")
+    total = sum(codes[0:12:2]) + 3 * sum(codes[1:12:2]) - 48 * 24
+    return str(-total % 10)
+
+
+def canonical_isbn(value: str) -> str | None:
+    """ISBN-10 veya ISBN-13'ü doğrular ve 13 haneli kanonik biçimini döndürür; geçersizse None.
+
+    Tireler ve boşluklar yok sayılır, ISBN-10'un kontrol hanesi `X` olabilir.
+    """
+    digits = value.translate(_ISBN_SEPARATORS).upper() if not value.isdigit() else value
+    if not digits.isascii():
+        return None
+    if len(digits) == 10 and digits[:9].isdigit() and (digits[9].isdigit() or digits[9] == "X"):
+        total = sum((10 - index) * int(digit) for index, digit in enumerate(digits[:9]))
+        total += 10 if digits[9] == "X" else int(digits[9])
+        if total % 11:
+            return None
+        core = "978" + digits[:9]
+        return core + _isbn13_check_digit(core)
+    if len(digits) == 13 and digits.isdigit() and digits[:3] in ("978", "979"):
+        return digits if _isbn13_check_digit(digits) == digits[12] else None
+    return None
+
+
+def is_valid_isbn(value: str) -> bool:
+    """Değer kontrol hanesi doğru bir ISBN-10 veya ISBN-13 mü?"""
+    return canonical_isbn(value) is not None
+
+
+def canonical_key(value: str) -> str:
+    """Saklanan ISBN anahtarının kanonik biçimini döndürür; geçersiz anahtarlar olduğu gibi kalır.
+
+    Kanonikleştirmeden önce yazılmış kataloglar ve günlükler yüklenirken kullanılır.
+    """
+    if len(value) == 13 and value.isdigit():
+        return value  # Zaten kanonik ya da geçersiz; ikisinde de değişmez
+    return canonical_isbn(value) or value
+
+
+def normalize_isbn(value: str) -> str:
+    """ISBN'in kanonik ISBN-13 biçimini döndürür; geçersizse ValueError fırlatır."""
+    isbn = canonical_isbn(value)
+    if isbn is None:
+        raise ValueError(f"Invalid ISBN: {value!r}")
+    return isbn
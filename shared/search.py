@@ -0,0 +1,193 @@
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from typing import Hashable
+
+_TOKEN_RE = re.compile(r"\w+")
+# Ayrışmayan ve büyük/küçük harf dönüşümünde kaybolmayan özel harfler
+_FOLD_TABLE = str.maketrans({"ı": "i", "ß": "ss", "æ": "ae", "ø": "o", "œ": "oe", "đ": "d", "ł": "l"})
+
+
+def normalize(text: str) -> str:
+    """Metni aramaya uygun hale getirir: harf duyarsız ve aksan duyarsız.
+
+    Türkçe İ/ı doğru ele alınır: "İstanbul", "ISTANBUL", "istanbul" ve
+    "ıstanbul" aynı terime dönüşür; ş, ğ, ç, ö, ü gibi harfler de
+    aksansız karşılıklarıyla eşleşir.
+    """
+    text = unicodedata.normalize("NFKD", text.translate(_FOLD_TABLE))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.casefold().translate(_FOLD_TABLE)
+
+
+def tokenize(text: str) -> list[str]:
+    """Metni normalleştirilmiş kelimelere ayırır."""
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _deletes(term: str) -> set[str]:
+    """Terimden tek bir harf silinerek elde edilen tüm varyantlar."""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """İki terim arasında en fazla bir düzenleme (ekleme, silme, değiştirme, yer değiştirme) var mı?"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diffs = [i for i in range(la) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        i, j = diffs[0], diffs[-1]
+        return len(diffs) == 2 and j == i + 1 and a[i] == b[j] and a[j] == b[i]
+    if la > lb:
+        a, b = b, a
+    # b, a'dan bir harf fazla
+    for i in range(len(a)):
+        if a[i] != b[i]:
+            return a[i:] == b[i + 1:]
+    return True
+
+
+class SearchIndex:
+    """Başlık ve yazar üzerinde, artımlı güncellenen ters indeks (BM25 sıralamalı).
+
+    - Her terim için belge -> terim frekansı listesi tutulur.
+    - Önek araması sıralı terim listesi üzerinde ikili arama ile yapılır.
+    - Bulanık arama, bir harf silinmiş terim varyantlarının indeksiyle
+      (SymSpell yöntemi) tek düzenleme mesafesindeki terimleri bulur.
+    Çok kelimeli sorgularda her kelimenin (veya açılımlarından birinin)
+    belgede geçmesi gerekir.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    PREFIX_WEIGHT = 0.8
+    FUZZY_WEIGHT = 0.6
+    MAX_EXPANSIONS = 50
+    MIN_FUZZY_LENGTH = 4
+
+    def __init__(self):
+        self._postings: dict[str, dict[Hashable, int]] = {}
+        self._doc_terms: dict[Hashable, list[str]] = {}
+        self._terms: list[str] = []
+        self._deletes: dict[str, set[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: Hashable, *texts: str):
+        """Belgeyi (ör. başlık ve yazar metinleriyle) indekse ekler; varsa günceller."""
+        if doc_id in self._doc_terms:
+            self.remove(doc_id)
+        terms = [term for text in texts for term in tokenize(text)]
+        self._doc_terms[doc_id] = terms
+        self._total_length += len(terms)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+                for variant in _deletes(term):
+                    self._deletes.setdefault(variant, set()).add(term)
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+
+    def remove(self, doc_id: Hashable):
+        """Belgeyi indeksten çıkarır; boşalan terimleri de siler."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= len(terms)
+        for term in set(terms):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if postings:
+                continue
+            del self._postings[term]
+            del self._terms[bisect.bisect_left(self._terms, term)]
+            for variant in _deletes(term):
+                variants = self._deletes.get(variant)
+                if variants is not None:
+                    variants.discard(term)
+                    if not variants:
+                        del self._deletes[variant]
+
+    def clear(self):
+        """İndeksi tamamen boşaltır."""
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._terms.clear()
+        self._deletes.clear()
+        self._total_length = 0
+
+    def _expand(self, token: str, prefix: bool, fuzzy: bool) -> dict[str, float]:
+        """Sorgu kelimesini indeksteki terimlere ve ağırlıklarına açar."""
+        expansions = {}
+        if token in self._postings:
+            expansions[token] = 1.0
+        if prefix:
+            start = bisect.bisect_left(self._terms, token)
+            for term in self._terms[start:start + self.MAX_EXPANSIONS]:
+                if not term.startswith(token):
+                    break
+                expansions.setdefault(term, self.PREFIX_WEIGHT)
+        if fuzzy and len(token) >= self.MIN_FUZZY_LENGTH:
+            candidates = set(self._deletes.get(token, ()))
+            for variant in _deletes(token) | {token}:
+                if variant in self._postings:
+                    candidates.add(variant)
+                candidates.update(self._deletes.get(variant, ()))
+            for term in candidates:
+                if term not in expansions and _within_one_edit(token, term):
+                    expansions[term] = self.FUZZY_WEIGHT
+        return expansions
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings[term])
+        return math.log(1 + (len(self._doc_terms) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, limit: int = 10, prefix: bool = True,
+               fuzzy: bool = True) -> list[tuple[Hashable, float]]:
+        """Sorguya en uygun belgeleri (belge kimliği, BM25 skoru) olarak döndürür."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_terms:
+            return []
+        avg_length = self._total_length / len(self._doc_terms) or 1.0
+
+        expanded = [self._expand(token, prefix, fuzzy) for token in tokens]
+        # En seçici kelimeden başla; sonraki kelimeler yalnızca aday belgelere bakar
+        expanded.sort(key=lambda terms: sum(len(self._postings[term]) for term in terms))
+
+        scores: dict[Hashable, float] | None = None
+        for terms in expanded:
+            token_scores: dict[Hashable, float] = {}
+            for term, weight in terms.items():
+                idf = self._idf(term)
+                postings = self._postings[term]
+                if scores is None:
+                    matches = postings.items()
+                elif len(scores) < len(postings):
+                    matches = ((doc_id, postings[doc_id]) for doc_id in scores if doc_id in postings)
+                else:
+                    matches = ((doc_id, tf) for doc_id, tf in postings.items() if doc_id in scores)
+                for doc_id, tf in matches:
+                    norm = self.K1 * (1 - self.B + self.B * len(self._doc_terms[doc_id]) / avg_length)
+                    score = weight * idf * tf * (self.K1 + 1) / (tf + norm)
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: scores[doc_id] + score for doc_id, score in token_scores.items()}
+            if not scores:
+                return []
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
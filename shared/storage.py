@@ -0,0 +1,156 @@
+import bisect
+from typing import Any, Iterable, Iterator
+
+from shared.search import SearchIndex
+
+
+def normalize_author(name: str) -> str:
+    """Yazar adını indeks anahtarına çevirir (boşlukları kırpar, harf duyarsız)."""
+    return " ".join(name.split()).casefold()
+
+
+def split_authors(author: str) -> list[str]:
+    """Virgülle ayrılmış yazar alanını normalleştirilmiş ayrı isimlere böler."""
+    return [name for name in (normalize_author(part) for part in author.split(",")) if name]
+
+
+class BookStore:
+    """Kitapları ISBN hash indeksi ve ikincil indekslerle tutan bellek içi depo.
+
+    ISBN ile arama, ekleme, silme ve tekrar kontrolü O(1)'dir. Yazar, yayın
+    yılı ve başlık/yazar tam metin indeksleri her değişiklikte güncellenir;
+    yıl aralığı sorguları sıralı yıl listesi üzerinde ikili arama ile yapılır. Kitapların `isbn` ve `author`
+    alanları olmalıdır, `publication_year` alanı isteğe bağlıdır.
+
+    Ana tablo varsayılan olarak bir sözlüktür; bellek kullanımını azaltmak için
+    yerine bir `ColumnarTable` veya önceden doldurulmuş bir `LazyTable`
+    verilebilir. `lazy_indexes=True` ile ikincil indeksler ancak ilk yazar,
+    yıl veya metin sorgusunda kurulur; böylece yalnızca ISBN ile erişilen
+    kitaplar hiç oluşturulmaz.
+    """
+
+    def __init__(self, books: Iterable[Any] = (), table: Any = None, lazy_indexes: bool = False):
+        # Eklenme sırasını koruyan ana indeks: ISBN -> kitap
+        self._by_isbn = table if table is not None else {}
+        # İkincil indeksler kuruldu mu? (tembel kipte ilk sorguya kadar False)
+        self._indexed = not lazy_indexes
+        # İkincil indeksler: anahtar -> ISBN kümesi (sıralı olması için dict)
+        self._by_author: dict[str, dict[str, None]] = {}
+        self._by_year: dict[int, dict[str, None]] = {}
+        # Kitabı olan yılların sıralı listesi
+        self._years: list[int] = []
+        # Başlık ve yazar üzerinde tam metin indeksi
+        self._text = SearchIndex()
+        if self._indexed:
+            for book in self._by_isbn.values():
+                self._index(book)
+        for book in books:
+            self.add(book)
+
+    def __len__(self) -> int:
+        return len(self._by_isbn)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._by_isbn.values())
+
+    def __contains__(self, isbn: str) -> bool:
+        return isbn in self._by_isbn
+
+    def get(self, isbn: str) -> Any | None:
+        """ISBN'e göre kitabı döndürür, yoksa None."""
+        return self._by_isbn.get(isbn)
+
+    def add(self, book: Any) -> bool:
+        """Kitabı ekler; aynı ISBN zaten varsa eklemez ve False döndürür."""
+        if book.isbn in self._by_isbn:
+            return False
+        self._by_isbn[book.isbn] = book
+        if self._indexed:
+            self._index(book)
+        return True
+
+    def _index(self, book: Any):
+        """Kitabı ikincil indekslere ekler."""
+        for author in split_authors(book.author):
+            self._by_author.setdefault(author, {})[book.isbn] = None
+        year = getattr(book, "publication_year", None)
+        if year is not None:
+            bucket = self._by_year.get(year)
+            if bucket is None:
+                bucket = self._by_year[year] = {}
+                bisect.insort(self._years, year)
+            bucket[book.isbn] = None
+        self._text.add(book.isbn, book.title, book.author)
+
+    def remove(self, isbn: str) -> Any | None:
+        """ISBN'e göre kitabı siler ve silinen kitabı döndürür, yoksa None."""
+        book = self._by_isbn.pop(isbn, None)
+        if book is None or not self._indexed:
+            return book
+        for author in split_authors(book.author):
+            self._discard(self._by_author, author, isbn)
+        year = getattr(book, "publication_year", None)
+        if year is not None and self._discard(self._by_year, year, isbn):
+            del self._years[bisect.bisect_left(self._years, year)]
+        self._text.remove(isbn)
+        return book
+
+    @staticmethod
+    def _discard(index: dict, key: Any, isbn: str) -> bool:
+        """ISBN'i indeks kovasından çıkarır; kova boşaldıysa silip True döndürür."""
+        bucket = index.get(key)
+        if bucket is None:
+            return False
+        bucket.pop(isbn, None)
+        if not bucket:
+            del index[key]
+            return True
+        return False
+
+    @property
+    def indexed(self) -> bool:
+        """İkincil indeksler kurulu mu? (tembel kipte ilk sorguya kadar False)"""
+        return self._indexed
+
+    def ensure_indexes(self):
+        """Tembel kipte ikincil indeksleri ilk ihtiyaçta tüm kitaplardan kurar."""
+        if not self._indexed:
+            for book in self._by_isbn.values():
+                self._index(book)
+            self._indexed = True
+
+    def clear(self):
+        """Depodaki tüm kitapları ve indeksleri temizler."""
+        self._by_isbn.clear()
+        self._by_author.clear()
+        self._by_year.clear()
+        self._years.clear()
+        self._text.clear()
+
+    def close(self):
+        """Ana tablonun kaynaklarını (ör. `LazyTable` dosya eşlemesi) serbest bırakır."""
+        close = getattr(self._by_isbn, "close", None)
+        if close is not None:
+            close()
+
+    def find_by_author(self, author: str) -> list[Any]:
+        """Yazar adına göre (harf duyarsız, tam eşleşme) kitapları döndürür."""
+        self.ensure_indexes()
+        bucket = self._by_author.get(normalize_author(author), {})
+        return [self._by_isbn[isbn] for isbn in bucket]
+
+    def find_by_year_range(self, start: int | None = None, end: int | None = None) -> list[Any]:
+        """Yayın yılı [start, end] aralığındaki kitapları yıla göre sıralı döndürür."""
+        self.ensure_indexes()
+        lo = 0 if start is None else bisect.bisect_left(self._years, start)
+        hi = len(self._years) if end is None else bisect.bisect_right(self._years, end)
+        return [
+            self._by_isbn[isbn]
+            for year in self._years[lo:hi]
+            for isbn in self._by_year[year]
+        ]
+
+    def search(self, query: str, limit: int = 10) -> list[Any]:
+        """Başlık ve yazarda tam metin araması yapar; en ilgili kitaplar önce gelir."""
+        self.ensure_indexes()
+        return [self._by_isbn[isbn] for isbn, _ in self._text.search(query, limit=limit)]
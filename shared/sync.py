@@ -0,0 +1,143 @@
+"""Kütüphaneler arasında değişiklik akışıyla artımlı eşitleme.
+
+Kataloğun tamamı yerine yalnızca bir sıra numarasından sonraki ekleme ve
+silmeler, gzip ile sıkıştırılmış partiler halinde aktarılır.
+
+- `export`: kütüphanenin `--since`'ten sonraki değişikliklerini bir parti
+  dosyasına yazar (ör. yedekleme için).
+- `import`: bir parti dosyasını kütüphaneye uygular.
+- `pull`: FastAPI_3 sunucusunun `GET /changes` uç noktasından yeni
+  değişiklikleri sayfa sayfa çekip uygular. Kalınan sıra numarası ve
+  kaynağın kimliği durum dosyasında saklanır; sonraki çalıştırma yalnızca
+  yeni değişiklikleri alır. Kaynak değiştiyse tam katalog istenir. Tam
+  katalog da sayfalarla gelir; yarıda kalan bir tam katalog aktarımı durum
+  dosyasındaki imleçten devam eder.
+
+Aşama 1 ve 2 bu modülü kendi `Library` sınıflarıyla kullanır; komut satırı
+her aşamanın `sync.py` dosyasındadır.
+
+Kullanım (aşama dizininde):
+    python sync.py export changes.json.gz --since 120 [--library library.json] [--limit 1000] [--cursor ISBN]
+    python sync.py import changes.json.gz [--library replica.json]
+    python sync.py pull http://127.0.0.1:8000 [--library replica.json] [--state replica.json.sync]
+"""
+import argparse
+import json
+import os
+import urllib.parse
+import urllib.request
+from typing import Callable, Protocol
+
+from shared.changefeed import decode_batch, encode_batch
+
+
+class ChangeFeedLibrary(Protocol):
+    """Değişiklik akışını destekleyen kütüphane (Aşama 1 veya 2'nin `Library` sınıfı)."""
+
+    def changes_since(self, since: int = 0, limit: int | None = None, cursor: str | None = None) -> dict: ...
+
+    def apply_changes(self, batch: dict) -> int: ...
+
+    def close(self): ...
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def export_changes(library: ChangeFeedLibrary, path: str, since: int = 0, limit: int | None = None,
+                   cursor: str | None = None) -> dict:
+    """`since`'ten sonraki değişiklikleri sıkıştırılmış parti olarak `path` dosyasına yazar."""
+    batch = library.changes_since(since, limit, cursor)
+    _write_atomic(path, encode_batch(batch))
+    return batch
+
+
+def import_changes(library: ChangeFeedLibrary, path: str) -> tuple[dict, int]:
+    """Parti dosyasını kütüphaneye uygular; (parti, uygulanan değişiklik sayısı) döndürür."""
+    with open(path, 'rb') as f:
+        batch = decode_batch(f.read())
+    return batch, library.apply_changes(batch)
+
+
+def load_state(path: str) -> dict:
+    """Eşitleme durumunu (kaynak kimliği ve son alınan sıra numarası) okur."""
+    if not os.path.exists(path):
+        return {"source": None, "sequence": 0, "cursor": None}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fetch_changes(url: str, since: int, limit: int, cursor: str | None = None, timeout: float = 30.0) -> dict:
+    """Kaynağın `GET /changes` uç noktasından bir parti çeker (gzip ile sıkıştırılmış olarak)."""
+    params = {"since": since, "limit": limit}
+    if cursor is not None:
+        params["cursor"] = cursor  # Tam katalog partisinin sonraki sayfası
+    query = urllib.parse.urlencode(params)
+    request = urllib.request.Request(f"{url.rstrip('/')}/changes?{query}", headers={"Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return decode_batch(response.read())
+
+
+def pull(library: ChangeFeedLibrary, url: str, state_path: str, limit: int = 1000, fetch=fetch_changes) -> int:
+    """Kaynaktaki yeni değişiklikleri çekip uygular; uygulanan değişiklik sayısını döndürür.
+
+    Durum her partiden sonra kaydedilir. Uygulama ile kaydetme arasında
+    kesilen bir çalıştırma aynı partiyi tekrar alır; değişiklikler idempotent
+    olduğundan bu zararsızdır. Tam katalog partisinin `cursor` değeri de
+    saklanır ve sonraki sayfa onunla istenir.
+    """
+    state = load_state(state_path)
+    applied = 0
+    while True:
+        batch = fetch(url, state["sequence"], limit, state.get("cursor"))
+        if state["source"] is not None and batch.get("source") != state["source"]:
+            # Başka bir akış (ör. yeniden kurulmuş katalog); eski sıra numarası anlamsız
+            batch = fetch(url, -1, limit, None)
+        applied += library.apply_changes(batch)
+        state = {"source": batch.get("source"), "sequence": batch["sequence"], "cursor": batch.get("cursor")}
+        _write_atomic(state_path, json.dumps(state).encode("utf-8"))
+        if state["cursor"] is None and (not batch["changes"] or batch["sequence"] >= batch["latest"]):
+            return applied
+
+
+def main(library_class: Callable[..., ChangeFeedLibrary]):
+    """Komut satırı; kütüphane `library_class(filename=...)` ile açılır."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--library", default="library.json")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Değişiklikleri parti dosyasına yazar")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--since", type=int, default=0, help="Son alınan sıra numarası (-1: tüm katalog)")
+    export_parser.add_argument("--limit", type=int, help="Partideki en fazla değişiklik (tam katalogda kitap)")
+    export_parser.add_argument("--cursor", help="Tam katalog partisinin sonraki sayfası için önceki partinin imleci")
+    import_parser = commands.add_parser("import", help="Parti dosyasını kütüphaneye uygular")
+    import_parser.add_argument("path")
+    pull_parser = commands.add_parser("pull", help="Sunucudan yeni değişiklikleri çeker")
+    pull_parser.add_argument("url", help="Kaynak sunucu, ör. http://127.0.0.1:8000")
+    pull_parser.add_argument("--state", help="Durum dosyası (varsayılan: <library>.sync)")
+    pull_parser.add_argument("--limit", type=int, default=1000, help="İstek başına en fazla değişiklik")
+    args = parser.parse_args()
+
+    library = library_class(filename=args.library)
+    try:
+        if args.command == "export":
+            batch = export_changes(library, args.path, args.since, args.limit, args.cursor)
+            kind = "tam katalog" if batch["reset"] else "değişiklik"
+            print(f"{len(batch['changes'])} {kind} kaydı {args.path} dosyasına yazıldı "
+                  f"(sıra numarası {batch['sequence']}/{batch['latest']}).")
+            if batch.get("cursor") is not None:
+                print(f"Sonraki sayfa: --since {batch['sequence']} --cursor {batch['cursor']}")
+        elif args.command == "import":
+            batch, applied = import_changes(library, args.path)
+            print(f"{applied} değişiklik uygulandı; kaynağın sıra numarası {batch['sequence']}.")
+        else:
+            applied = pull(library, args.url, args.state or args.library + ".sync", args.limit)
+            print(f"{applied} değişiklik uygulandı.")
+    finally:
+        library.close()